@@ -0,0 +1,271 @@
+import numpy as np
+
+
+def polyval_rows(coeffs, x):
+    """evaluates a different polynomial for each row of x using Horner's method.
+
+    Args:
+        coeffs (array): array with shape (n, deg + 1) of polynomial coefficients,
+        highest power first (as returned by np.polyfit)
+        x (array): array with shape (n,) or (n, k) of values to evaluate row i's
+        polynomial at
+
+    Returns:
+        array: array with the same shape as x of polynomial values
+    """
+    x = np.asarray(x, dtype=float)
+    coeffs = np.asarray(coeffs, dtype=float)
+    column_shape = (len(coeffs),) + (1,) * (x.ndim - 1)
+    result = np.zeros(np.broadcast_shapes(x.shape, column_shape))
+    for column in coeffs.T:
+        result = result * x + column.reshape(column_shape)
+    return result
+
+
+def polyder_rows(coeffs):
+    """differentiates a stack of polynomials
+
+    Args:
+        coeffs (array): array with shape (n, deg + 1) of polynomial coefficients,
+        highest power first
+
+    Returns:
+        array: array with shape (n, deg) of the derivative coefficients
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    powers = np.arange(coeffs.shape[1] - 1, 0, -1)
+    return coeffs[:, :-1] * powers
+
+
+def real_roots_rows(coeffs, imag_tol=1e-9):
+    """finds the real roots of a stack of polynomials in a single call, using the
+    eigenvalues of a stacked array of companion matrices.
+
+    Args:
+        coeffs (array): array with shape (n, deg + 1) of polynomial coefficients,
+        highest power first
+        imag_tol (float, optional): relative size of the imaginary part below which a
+        root is treated as real. Defaults to 1e-9.
+
+    Returns:
+        array: array with shape (n, deg) of real roots, padded with NaN where a
+        polynomial has complex roots
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    n, degree = coeffs.shape[0], coeffs.shape[1] - 1
+    roots = np.full((n, degree), np.nan)
+    if degree < 1:
+        return roots
+    leading = coeffs[:, 0]
+    full_degree = leading != 0
+    companion = np.zeros((np.count_nonzero(full_degree), degree, degree))
+    companion[:, 0, :] = -coeffs[full_degree, 1:] / leading[full_degree, np.newaxis]
+    companion[:, np.arange(1, degree), np.arange(degree - 1)] = 1
+    eigenvalues = np.linalg.eigvals(companion)
+    roots[full_degree] = np.where(
+        np.abs(eigenvalues.imag) <= imag_tol * np.maximum(1, np.abs(eigenvalues)),
+        eigenvalues.real,
+        np.nan,
+    )
+    # the rare rows with a zero leading coefficient have a lower degree
+    for i in np.flatnonzero(~full_degree):
+        row_roots = np.roots(coeffs[i])
+        row_roots = row_roots[np.abs(row_roots.imag) <= imag_tol].real
+        roots[i, : len(row_roots)] = row_roots
+    return roots
+
+
+def batch_BEP(efficiency_coeffs, flow_min, flow_max, head_coeffs=None):
+    """finds the continuous best efficiency point of many pumps at once. The maximum
+    of each fitted efficiency curve is taken from its turning points inside the flow
+    range, or the range end points if the maximum is on the boundary.
+
+    Args:
+        efficiency_coeffs (array): array with shape (n, deg + 1) of fitted
+        flow/efficiency polynomial coefficients, highest power first
+        flow_min (array): array with shape (n,) of the lowest flow of each curve
+        flow_max (array): array with shape (n,) of the highest flow of each curve
+        head_coeffs (array, optional): array with shape (n, deg + 1) of fitted
+        flow/head polynomial coefficients, highest power first. If None, the BEP head
+        is not calculated. Defaults to None.
+
+    Returns:
+        dict: dictionary of arrays with one element per pump. Structure:
+        {"Efficiency": [], "Flow": [], "Head": []}
+    """
+    flow_min = np.asarray(flow_min, dtype=float)
+    flow_max = np.asarray(flow_max, dtype=float)
+    turning_points = real_roots_rows(polyder_rows(efficiency_coeffs))
+    in_range = (turning_points >= flow_min[:, np.newaxis]) & (
+        turning_points <= flow_max[:, np.newaxis]
+    )
+    candidate_flows = np.column_stack(
+        [
+            np.where(in_range, turning_points, flow_min[:, np.newaxis]),
+            flow_min,
+            flow_max,
+        ]
+    )
+    candidate_efficiencies = polyval_rows(efficiency_coeffs, candidate_flows)
+    best = np.argmax(candidate_efficiencies, axis=1)
+    rows = np.arange(len(best))
+    BEP_dict = {
+        "Efficiency": candidate_efficiencies[rows, best],
+        "Flow": candidate_flows[rows, best],
+    }
+    if head_coeffs is not None:
+        BEP_dict["Head"] = polyval_rows(head_coeffs, BEP_dict["Flow"])
+    return BEP_dict
+
+
+def catalog_BEP(pumps, deg=3):
+    """finds the continuous best efficiency point of every pump in a catalog. The
+    efficiency and head curves of every pump are fitted with batch_polyfit and the
+    BEPs found with a single call to batch_BEP. The fits are seeded into each pump's
+    fit cache.
+
+    Args:
+        pumps (list): Pump objects, each with efficiency assigned
+        deg (int, optional): degree of the fitted efficiency and head curves.
+        Defaults to 3.
+
+    Returns:
+        dict: dictionary of arrays with one element per pump. Structure:
+        {"Efficiency": [], "Flow": [], "Head": []}
+    """
+    efficiency_flows = [pump.efficiency_flow for pump in pumps]
+    efficiency_coeffs = batch_polyfit(
+        efficiency_flows, [pump.efficiency for pump in pumps], deg
+    ).reshape(len(pumps), deg + 1)
+    head_coeffs = batch_polyfit(
+        [pump.flow for pump in pumps], [pump.head for pump in pumps], deg
+    ).reshape(len(pumps), deg + 1)
+    for pump, efficiency_row, head_row in zip(pumps, efficiency_coeffs, head_coeffs):
+        pump.seed_fit(efficiency_row, x="efficiency_flow", y="efficiency")
+        pump.seed_fit(head_row, x="flow", y="head")
+    flow_min = [np.min(flows) for flows in efficiency_flows]
+    flow_max = [np.max(flows) for flows in efficiency_flows]
+    return batch_BEP(efficiency_coeffs, flow_min, flow_max, head_coeffs=head_coeffs)
+
+
+def stack_piecewise(curves):
+    """stacks piecewise polynomials with different numbers of segments and orders
+    into padded arrays for piecewise_rows.
+
+    Args:
+        curves (list): list of PiecewisePolynomial objects, see models
+
+    Returns:
+        (tuple): Tuple of a (n, max segments + 1) array of breaks padded with inf and
+        a (n, max segments, max order + 1) array of coefficients padded with zeros
+    """
+    n_breaks = max((len(curve.breaks) for curve in curves), default=2)
+    order = max((curve.coeffs.shape[1] for curve in curves), default=1)
+    breaks = np.full((len(curves), n_breaks), np.inf)
+    coeffs = np.zeros((len(curves), n_breaks - 1, order))
+    for i, curve in enumerate(curves):
+        n_segments, n_coeffs = curve.coeffs.shape
+        breaks[i, : n_segments + 1] = curve.breaks
+        coeffs[i, :n_segments, order - n_coeffs :] = curve.coeffs
+    return breaks, coeffs
+
+
+def piecewise_rows(breaks, coeffs, x):
+    """evaluates a different piecewise polynomial at each element of x. Values
+    outside the breaks are extrapolated from the end segments, as in
+    PiecewisePolynomial.
+
+    Args:
+        breaks (array): array with shape (n, max segments + 1) of segment boundaries,
+        padded with inf, as returned by stack_piecewise
+        coeffs (array): array with shape (n, max segments, order + 1) of local
+        polynomial coefficients, as returned by stack_piecewise
+        x (array): array with shape (n,) of values to evaluate row i's curve at
+
+    Returns:
+        array: array with shape (n,) of curve values
+    """
+    x = np.asarray(x, dtype=float)
+    n_segments = np.count_nonzero(np.isfinite(breaks), axis=1) - 1
+    segment = np.clip(
+        np.count_nonzero(breaks <= x[:, np.newaxis], axis=1) - 1, 0, n_segments - 1
+    )
+    rows = np.arange(len(x))
+    return polyval_rows(coeffs[rows, segment], x - breaks[rows, segment])
+
+
+def pad_ragged(values, offsets):
+    """pads a flat array of concatenated curves (as stored in a catalog) into a 2d
+    array with one curve per row.
+
+    Args:
+        values (array): flat array of all the curves' values
+        offsets (array): array with shape (n + 1,) of where each curve starts and ends
+
+    Returns:
+        (tuple): Tuple of a (n, max points) array of values padded with zeros, and a
+        boolean mask of the same shape which is True for real values
+    """
+    values = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets)
+    lengths = np.diff(offsets)
+    columns = np.arange(lengths.max(initial=0))
+    mask = columns < lengths[:, np.newaxis]
+    index = np.where(mask, offsets[:-1, np.newaxis] + columns, 0)
+    padded = values[index] if len(values) else np.zeros(mask.shape)
+    return np.where(mask, padded, 0.0), mask
+
+
+def pad_curves(curves):
+    """pads a list of different length curves into a 2d array with one curve per row.
+
+    Args:
+        curves (list): list of 1d arrays or lists
+
+    Returns:
+        (tuple): Tuple of a (n, max points) array of values padded with zeros, and a
+        boolean mask of the same shape which is True for real values
+    """
+    lengths = [len(curve) for curve in curves]
+    offsets = np.zeros(len(curves) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    values = np.concatenate([np.asarray(curve, dtype=float) for curve in curves])
+    return pad_ragged(values, offsets)
+
+
+def batch_polyfit(x, y, deg=3, mask=None):
+    """least squares polynomial fit of many curves in a single stacked solve.
+    Equivalent to calling np.polyfit on each curve. Curves may have different numbers
+    of points, either passed as lists of arrays or as padded 2d arrays with a mask.
+
+    Args:
+        x (array or list): array with shape (n, points) of x values, or a list of n
+        1d arrays of varying length
+        y (array or list): y values, the same shape as x
+        deg (int, optional): degree of the polynomials. Defaults to 3.
+        mask (array, optional): boolean array the same shape as x which is False for
+        padding. Non finite values are always treated as padding. Defaults to None.
+
+    Returns:
+        array: array with shape (n, deg + 1) of polynomial coefficients, highest power
+        first. Evaluate with polyval_rows.
+    """
+    if isinstance(x, (list, tuple)):
+        x, mask = pad_curves(x)
+        y, _ = pad_curves(y)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    if mask is not None:
+        valid &= mask
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+
+    vandermonde = x[..., np.newaxis] ** np.arange(deg, -1, -1)
+    vandermonde *= valid[..., np.newaxis]  # padding rows don't contribute to the fit
+    # scaling the columns improves the conditioning, as done by np.polyfit
+    scale = np.sqrt(np.sum(vandermonde**2, axis=1))
+    scale[scale == 0] = 1
+    vandermonde /= scale[:, np.newaxis, :]
+    coeffs = np.linalg.pinv(vandermonde) @ y[..., np.newaxis]
+    return coeffs[..., 0] / scale
@@ -0,0 +1,450 @@
+"""Benchmark suite for the Pumps package.
+
+Times the pump analytics, curve parsing and plotting methods against a synthetic
+catalog of pumps, and saves the results as JSON so runs can be compared.
+
+    python benchmarks.py --pumps 200 --points 25 --output results.json
+    python benchmarks.py --compare results.json --output new_results.json
+    python benchmarks.py --select --startup --import-target 0.3
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from parameters import Pump, SystemCurve
+
+BENCHMARKS = {}
+# modules the numeric core must not import, they are only loaded for plotting/parsing
+LAZY_MODULES = ("matplotlib", "pandas")
+STARTUP_MODULES = ("parameters", "operating_point", "selection", "catalog")
+
+
+def benchmark(name):
+    """registers a benchmark. The decorated function receives the benchmark context
+    dict and returns a zero argument callable that runs one iteration."""
+
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def synthetic_curve_data(n_points=25, seed=None):
+    """generates a realistic looking 100% speed pump curve.
+
+    Args:
+        n_points (int, optional): number of points on the curve. Defaults to 25.
+        seed (int, optional): random seed. Defaults to None.
+
+    Returns:
+        dict: dictionary with structure
+        {"Flow [l/s]": [], "Head [m]": [], "Overall Efficiency [%]": [],
+        "NPSHR-values [m]": []}
+    """
+    rng = np.random.default_rng(seed)
+    max_flow = rng.uniform(20, 800)
+    shutoff_head = rng.uniform(5, 80)
+    flow = np.linspace(0, max_flow, n_points)
+    fraction = flow / max_flow
+    head = shutoff_head * (1 - 0.25 * fraction - 0.6 * fraction**2)
+    BEP_fraction = rng.uniform(0.55, 0.75)
+    efficiency = rng.uniform(65, 85) * (
+        1 - ((fraction - BEP_fraction) / BEP_fraction) ** 2
+    )
+    npshr = rng.uniform(1, 4) * (1 + 2 * fraction**2)
+    return {
+        "Flow [l/s]": flow.tolist(),
+        "Head [m]": head.tolist(),
+        "Overall Efficiency [%]": np.clip(efficiency, 0, None).tolist(),
+        "NPSHR-values [m]": npshr.tolist(),
+    }
+
+
+def synthetic_pump(n_points=25, seed=None):
+    """generates a Pump with synthetic pump, efficiency and npshr curves
+
+    Args:
+        n_points (int, optional): number of points on each curve. Defaults to 25.
+        seed (int, optional): random seed. Defaults to None.
+
+    Returns:
+        Pump: synthetic pump object
+    """
+    curve_data = synthetic_curve_data(n_points, seed)
+    pump = Pump(make="Synthetic", model=f"Pump {seed}")
+    pump.define_pumpcurve(curve_data["Flow [l/s]"], curve_data["Head [m]"])
+    pump.define_efficiency(curve_data["Overall Efficiency [%]"])
+    pump.define_npshr(curve_data["NPSHR-values [m]"])
+    return pump
+
+
+def synthetic_system(pump, n_points=25, static_fraction=0.3):
+    """generates a SystemCurve which crosses the pump curve near its BEP
+
+    Args:
+        pump (Pump): pump the system curve is generated for
+        n_points (int, optional): number of points on the curve. Defaults to 25.
+        static_fraction (float, optional): static head as a fraction of the BEP head.
+        Defaults to 0.3.
+
+    Returns:
+        SystemCurve: synthetic system curve object
+    """
+    _, BEP_flow, BEP_head = pump.BEP()
+    static_head = static_fraction * BEP_head
+    flow = np.linspace(0, max(pump.flow), n_points)
+    head = static_head + (BEP_head - static_head) * (flow / BEP_flow) ** 2
+    return SystemCurve(name=f"System for {pump.model}", flow=flow, head=head)
+
+
+def write_xylect_file(filepath, curve_data, model="Synthetic"):
+    """writes curve data to an excel file laid out like a Xylect export"""
+    import pandas as pd
+
+    headings = list(curve_data)
+    rows = [
+        [None] * len(headings),
+        ["Pump", model] + [None] * (len(headings) - 2),
+        ["Motor", "Synthetic motor"] + [None] * (len(headings) - 2),
+        ["Impeller", "Synthetic impeller"] + [None] * (len(headings) - 2),
+        [None] * len(headings),
+        headings,
+    ]
+    rows += np.column_stack([curve_data[heading] for heading in headings]).tolist()
+    pd.DataFrame(rows).to_excel(filepath, header=False, index=False)
+
+
+def write_excel_file(filepath, curve_data):
+    """writes curve data to a general excel file readable by parse_excel_curve"""
+    import pandas as pd
+
+    headings = ["Flow", "Head", "Efficiency", "NPSHr"]
+    rows = [[None] * len(headings), headings]
+    rows += np.column_stack(list(curve_data.values())).tolist()
+    pd.DataFrame(rows).to_excel(filepath, header=False, index=False)
+
+
+@benchmark("BEP (cached fits)")
+def bench_BEP(context):
+    pumps = context["pumps"]
+    return lambda: [pump.BEP() for pump in pumps]
+
+
+@benchmark("BEP (cold fits)")
+def bench_BEP_cold(context):
+    pumps = context["pumps"]
+
+    def run():
+        for pump in pumps:
+            pump._reset_fit_cache()
+            pump.BEP()
+
+    return run
+
+
+@benchmark("POR (cached fits)")
+def bench_POR(context):
+    pumps = context["pumps"]
+    return lambda: [pump.POR() for pump in pumps]
+
+
+@benchmark("POR (cold fits)")
+def bench_POR_cold(context):
+    pumps = context["pumps"]
+
+    def run():
+        for pump in pumps:
+            pump._reset_fit_cache()
+            pump.POR()
+
+    return run
+
+
+@benchmark("generate_speed_curves")
+def bench_speed_curves(context):
+    pumps, speeds = context["pumps"], context["speeds"]
+    return lambda: [pump.generate_speed_curves(speeds) for pump in pumps]
+
+
+@benchmark("generate_speeds_POR")
+def bench_speeds_POR(context):
+    pumps, speeds = context["pumps"], context["speeds"]
+    return lambda: [pump.generate_speeds_POR(speeds) for pump in pumps]
+
+
+@benchmark("solve_duty_point")
+def bench_duty_point(context):
+    from operating_point import solve_duty_point
+
+    pairs = [(pump, synthetic_system(pump)) for pump in context["pumps"]]
+    speeds = context["speeds"]
+    return lambda: [solve_duty_point(pump, system, speeds) for pump, system in pairs]
+
+
+@benchmark("PumpTable.query (scalar)")
+def bench_table_query(context):
+    from lookup import PumpTable
+
+    pump = context["pumps"][0]
+    table = PumpTable.from_pump(pump)
+    flow = 0.5 * max(pump.flow)
+    return lambda: table.query(85.0, flow)
+
+
+@benchmark("PumpTable.lookup (batched)")
+def bench_table_lookup(context):
+    from lookup import PumpTable
+
+    pump = context["pumps"][0]
+    table = PumpTable.from_pump(pump)
+    rng = np.random.default_rng(0)
+    speeds = rng.uniform(50, 100, 10000)
+    flows = rng.uniform(0, max(pump.flow), 10000)
+    return lambda: table.lookup(speeds, flows)
+
+
+@benchmark("plot_speeds")
+def bench_plot_speeds(context):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    pump = context["pumps"][0]
+
+    def run():
+        pump.generate_plot(BEP=True, POR=True)
+        pump.plot_speeds(BEP=True, POR="fill")
+        pump.fig.canvas.draw()
+        pump.close_plot()
+
+    return run
+
+
+@benchmark("parse_xylect_curve")
+def bench_parse_xylect(context):
+    from parse_curve import parse_xylect_curve
+
+    filepath = Path(context["tempdir"]) / "xylect.xlsx"
+    write_xylect_file(filepath, synthetic_curve_data(context["n_points"], seed=0))
+    return lambda: parse_xylect_curve(filepath)
+
+
+@benchmark("parse_excel_curve")
+def bench_parse_excel(context):
+    from parse_curve import parse_excel_curve
+
+    filepath = Path(context["tempdir"]) / "excel.xlsx"
+    write_excel_file(filepath, synthetic_curve_data(context["n_points"], seed=0))
+    return lambda: parse_excel_curve(
+        filepath, flow="Flow", head="Head", efficiency="Efficiency", npshr="NPSHr"
+    )
+
+
+def time_callable(func, repeat=5):
+    """times a callable, automatically choosing how many calls make up one run.
+
+    Args:
+        func (callable): zero argument callable to time
+        repeat (int, optional): number of timed runs. Defaults to 5.
+
+    Returns:
+        dict: per call timings (s) with structure
+        {"Min": float, "Median": float, "Mean": float, "Calls": int, "Repeat": int}
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = np.array(timer.repeat(repeat=repeat, number=number)) / number
+    return {
+        "Min": float(times.min()),
+        "Median": float(np.median(times)),
+        "Mean": float(times.mean()),
+        "Calls": number,
+        "Repeat": repeat,
+    }
+
+
+def time_startup(modules=STARTUP_MODULES, repeat=5):
+    """times a cold import of the numeric core, each run in a fresh interpreter.
+
+    Args:
+        modules (tuple, optional): modules imported in each run.
+        Defaults to STARTUP_MODULES.
+        repeat (int, optional): number of timed runs. Defaults to 5.
+
+    Returns:
+        dict: import timings (s) with structure {"Min": float, "Median": float,
+        "Mean": float, "Calls": int, "Repeat": int, "Lazy Modules Loaded": []}
+    """
+    script = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {', '.join(modules)}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"loaded = [m for m in {LAZY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'Time': elapsed, 'Loaded': loaded}))\n"
+    )
+    times, loaded = [], set()
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        run = json.loads(output)
+        times.append(run["Time"])
+        loaded.update(run["Loaded"])
+    times = np.array(times)
+    return {
+        "Min": float(times.min()),
+        "Median": float(np.median(times)),
+        "Mean": float(times.mean()),
+        "Calls": 1,
+        "Repeat": repeat,
+        "Lazy Modules Loaded": sorted(loaded),
+    }
+
+
+def run_benchmarks(
+    n_pumps=100, n_points=25, speeds=None, repeat=5, select=None, startup=False
+):
+    """runs the registered benchmarks against a synthetic pump catalog
+
+    Args:
+        n_pumps (int, optional): number of pumps in the synthetic catalog.
+        Defaults to 100.
+        n_points (int, optional): number of points on each pump curve. Defaults to 25.
+        speeds (list, optional): speeds used by the speed benchmarks. If None,
+        Pump.default_speeds is used. Defaults to None.
+        repeat (int, optional): number of timed runs per benchmark. Defaults to 5.
+        select (list, optional): names of the benchmarks to run. If None, all are run.
+        Defaults to None.
+        startup (bool, optional): Also time a cold import of the numeric core, see
+        time_startup. Defaults to False.
+
+    Returns:
+        dict: dictionary with structure {"Meta": {...}, "Results": {name: timings}}
+    """
+    if speeds is None:
+        speeds = Pump.default_speeds
+    results = {}
+    with tempfile.TemporaryDirectory() as tempdir:
+        context = {
+            "pumps": [synthetic_pump(n_points, seed) for seed in range(n_pumps)],
+            "n_points": n_points,
+            "speeds": speeds,
+            "tempdir": tempdir,
+        }
+        for name, setup in BENCHMARKS.items():
+            if select is not None and name not in select:
+                continue
+            results[name] = time_callable(setup(context), repeat=repeat)
+            print(f"{name:<30} {results[name]['Median'] * 1000:10.3f} ms")
+    if startup:
+        results["startup import"] = time_startup(repeat=repeat)
+        print(
+            f"{'startup import':<30} {results['startup import']['Min'] * 1000:10.3f} ms"
+        )
+    return {
+        "Meta": {
+            "Date": datetime.now().isoformat(timespec="seconds"),
+            "Python": platform.python_version(),
+            "NumPy": np.__version__,
+            "Machine": platform.machine(),
+            "Pumps": n_pumps,
+            "Points": n_points,
+            "Speeds": list(speeds),
+        },
+        "Results": results,
+    }
+
+
+def compare_results(results, baseline, threshold=1.2):
+    """compares benchmark results against a baseline run
+
+    Args:
+        results (dict): results from run_benchmarks
+        baseline (dict): earlier results from run_benchmarks
+        threshold (float, optional): slowdown ratio above which a benchmark counts as
+        a regression. Defaults to 1.2.
+
+    Returns:
+        dict: dictionary of regressed benchmarks with structure {name: slowdown ratio}
+    """
+    regressions = {}
+    for name, timings in results["Results"].items():
+        if name not in baseline["Results"]:
+            continue
+        ratio = timings["Median"] / baseline["Results"][name]["Median"]
+        print(f"{name:<30} {ratio:6.2f}x baseline")
+        if ratio > threshold:
+            regressions[name] = ratio
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pumps", type=int, default=100, help="catalog size")
+    parser.add_argument("--points", type=int, default=25, help="points per curve")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs")
+    parser.add_argument("--select", nargs="*", help="benchmark names to run")
+    parser.add_argument("--output", help="save results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=1.2, help="regression slowdown ratio"
+    )
+    parser.add_argument(
+        "--startup", action="store_true", help="time a cold import of the core"
+    )
+    parser.add_argument(
+        "--import-target",
+        type=float,
+        default=0.5,
+        help="fastest allowed cold import time (s), checked with --startup",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        n_pumps=args.pumps,
+        n_points=args.points,
+        repeat=args.repeat,
+        select=args.select,
+        startup=args.startup,
+    )
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=4)
+        print(f"Benchmark results saved as {args.output}")
+    if args.startup:
+        startup = results["Results"]["startup import"]
+        if startup["Lazy Modules Loaded"]:
+            print(f"Startup imports {', '.join(startup['Lazy Modules Loaded'])}")
+            return 1
+        if startup["Min"] > args.import_target:
+            print(
+                f"Startup import took {startup['Min']:.3f} s, "
+                f"target is {args.import_target:.3f} s"
+            )
+            return 1
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+        regressions = compare_results(results, baseline, threshold=args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from batch import batch_polyfit, pad_ragged
+from ingest import CURVE_SERIES, ingest_files, record_to_pump
+from npz_store import pack_series, read_npz, write_npz
+
+CATALOG_SCHEMA_VERSION = 1
+
+
+def file_hash(filepath):
+    """returns the sha1 hash of a file's contents
+
+    Args:
+        filepath (str or Path): file to hash
+
+    Returns:
+        str: hex digest of the file contents
+    """
+    sha1 = hashlib.sha1()
+    with open(filepath, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def _read_catalog(catalog_path):
+    """reads the raw arrays of an existing catalog into a dict"""
+    return read_npz(catalog_path, CATALOG_SCHEMA_VERSION, description="Catalog")
+
+
+def _catalog_records(catalog, indices=None):
+    """splits the flat arrays of a catalog back into one record per pump"""
+    if indices is None:
+        indices = range(len(catalog["files"]))
+    records = []
+    for i in indices:
+        record = {
+            "Make": str(catalog["makes"][i]),
+            "Model": str(catalog["models"][i]),
+            "Motor": str(catalog["motors"][i]) or None,
+            "Impeller": str(catalog["impellers"][i]) or None,
+        }
+        for series in CURVE_SERIES:
+            offsets = catalog[f"{series}_offsets"]
+            record[series] = catalog[f"{series}_values"][offsets[i] : offsets[i + 1]]
+        records.append(record)
+    return records
+
+
+def write_catalog(catalog_path, files, records):
+    """writes pump records to a single uncompressed .npz catalog.
+    Every data series is stored as one flat float array with an offsets array marking
+    where each pump's values start and end.
+
+    Args:
+        catalog_path (str or Path): location of the catalog file
+        files (list): list of dicts with the "File", "Mtime", "Size" and "Hash" of the
+        source file for each record
+        records (list): list of catalog records, as returned by parse_curve_file
+    """
+    arrays = {
+        "files": np.array([file["File"] for file in files], dtype=str),
+        "mtimes": np.array([file["Mtime"] for file in files], dtype=float),
+        "sizes": np.array([file["Size"] for file in files], dtype=np.int64),
+        "hashes": np.array([file["Hash"] for file in files], dtype=str),
+        "makes": np.array([record["Make"] or "" for record in records], dtype=str),
+        "models": np.array([record["Model"] or "" for record in records], dtype=str),
+        "motors": np.array([record["Motor"] or "" for record in records], dtype=str),
+        "impellers": np.array(
+            [record["Impeller"] or "" for record in records], dtype=str
+        ),
+    }
+    for series in CURVE_SERIES:
+        arrays[f"{series}_values"], arrays[f"{series}_offsets"] = pack_series(
+            records, series
+        )
+    write_npz(catalog_path, arrays, CATALOG_SCHEMA_VERSION)
+
+
+def build_catalog(
+    directory,
+    catalog_path,
+    pattern="*.xls",
+    kind="xylect",
+    make="Xylem",
+    workers=None,
+    **columns,
+):
+    """builds or updates a pump catalog from a directory of pump curve files.
+    If the catalog already exists, only files whose modification time or size has
+    changed are checked, and only those whose contents hash has also changed are
+    re-parsed. Files removed from the directory are removed from the catalog.
+
+    Args:
+        directory (str or Path): directory holding the pump curve files
+        catalog_path (str or Path): location of the catalog file (.npz)
+        pattern (str, optional): glob pattern of files to ingest. Defaults to "*.xls".
+        kind (str, optional): "xylect" or "excel", see parse_curve_file.
+        Defaults to "xylect".
+        make (str, optional): pump make to record. Defaults to "Xylem".
+        workers (int, optional): number of processes used to parse changed files, see
+        ingest_files. Defaults to None.
+        **columns: column name arguments passed through to parse_excel_curve
+
+    Returns:
+        dict: summary of the build with structure
+        {"Parsed": [files], "Unchanged": [files], "Removed": [files],
+        "Errors": {file: error message}}. Files that fail to parse are left out of
+        the catalog.
+    """
+    existing = {}
+    if Path(catalog_path).exists():
+        catalog = _read_catalog(catalog_path)
+        for i, record in enumerate(_catalog_records(catalog)):
+            file = {
+                "File": str(catalog["files"][i]),
+                "Mtime": float(catalog["mtimes"][i]),
+                "Size": int(catalog["sizes"][i]),
+                "Hash": str(catalog["hashes"][i]),
+            }
+            existing[file["File"]] = (file, record)
+
+    files, records = {}, {}
+    summary = {"Parsed": [], "Unchanged": [], "Removed": [], "Errors": {}}
+    to_parse = []
+    for filepath in sorted(Path(directory).glob(pattern)):
+        stat = filepath.stat()
+        file = {
+            "File": filepath.name,
+            "Mtime": stat.st_mtime,
+            "Size": stat.st_size,
+            "Hash": None,
+        }
+        previous_file, record = existing.pop(filepath.name, (None, None))
+        if previous_file is not None and (
+            previous_file["Mtime"] == file["Mtime"]
+            and previous_file["Size"] == file["Size"]
+        ):
+            file["Hash"] = previous_file["Hash"]
+        else:
+            file["Hash"] = file_hash(filepath)
+            if previous_file is None or previous_file["Hash"] != file["Hash"]:
+                record = None
+        files[filepath] = file
+        if record is None:
+            to_parse.append(filepath)
+        else:
+            records[filepath] = record
+            summary["Unchanged"].append(filepath.name)
+    summary["Removed"] = sorted(existing)
+
+    if to_parse:
+        ingested = ingest_files(
+            to_parse, kind=kind, workers=workers, records=True, make=make, **columns
+        )
+        records.update(ingested["Results"])
+        summary["Parsed"] = [filepath.name for filepath in ingested["Results"]]
+        summary["Errors"] = {
+            filepath.name: error for filepath, error in ingested["Errors"].items()
+        }
+
+    files = [file for filepath, file in files.items() if filepath in records]
+    records = [records[filepath] for filepath in sorted(records)]
+    write_catalog(catalog_path, files, records)
+    return summary
+
+
+def fit_catalog(catalog_path, deg=3):
+    """fits the head, efficiency and npshr curves of every pump in a catalog with one
+    stacked least squares solve per curve type (see batch_polyfit).
+
+    Args:
+        catalog_path (str or Path): location of the catalog file (.npz)
+        deg (int, optional): degree of the fitted polynomials. Defaults to 3.
+
+    Returns:
+        dict: dictionary of (n pumps, deg + 1) coefficient arrays, keyed by the
+        (x, y) data series names used by Pump.fit_curve, e.g. ("flow", "head").
+        Rows for pumps without that curve are NaN.
+    """
+    return _fit_catalog(_read_catalog(catalog_path), deg)
+
+
+def _fit_catalog(catalog, deg):
+    """batch fits the curves of an already read catalog, see fit_catalog"""
+    fits = {}
+    for x, y in (
+        ("flow", "head"),
+        ("efficiency_flow", "efficiency"),
+        ("npshr_flow", "npshr"),
+    ):
+        x_values, mask = pad_ragged(catalog[f"{x}_values"], catalog[f"{x}_offsets"])
+        y_values, _ = pad_ragged(catalog[f"{y}_values"], catalog[f"{y}_offsets"])
+        coeffs = batch_polyfit(x_values, y_values, deg=deg, mask=mask)
+        coeffs[np.count_nonzero(mask, axis=1) == 0] = np.nan
+        fits[(x, y)] = coeffs
+    return fits
+
+
+def load_catalog(catalog_path, fit_deg=None):
+    """loads every pump in a catalog as a Pump object, without using pandas
+
+    Args:
+        catalog_path (str or Path): location of the catalog file (.npz)
+        fit_deg (int, optional): If provided, the curves of every pump are batch
+        fitted with this degree (see fit_catalog) and stored in each pump's fit
+        cache. Defaults to None.
+
+    Returns:
+        dict: dictionary of pumps with structure {file name: Pump}
+    """
+    catalog = _read_catalog(catalog_path)
+    pumps = {
+        str(file): record_to_pump(record)
+        for file, record in zip(catalog["files"], _catalog_records(catalog))
+    }
+    if fit_deg is not None:
+        for (x, y), coeffs in _fit_catalog(catalog, fit_deg).items():
+            for pump, row in zip(pumps.values(), coeffs):
+                if np.all(np.isfinite(row)):
+                    pump.seed_fit(row, x=x, y=y)
+    return pumps
+
+
+def load_pump(catalog_path, file):
+    """loads a single pump from a catalog
+
+    Args:
+        catalog_path (str or Path): location of the catalog file (.npz)
+        file (str): name of the source file the pump was parsed from
+
+    Returns:
+        Pump: pump object
+    """
+    catalog = _read_catalog(catalog_path)
+    index = np.flatnonzero(catalog["files"] == file)
+    if not len(index):
+        raise KeyError(f"{file} is not in catalog {catalog_path}")
+    return record_to_pump(_catalog_records(catalog, indices=index[:1])[0])
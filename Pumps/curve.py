@@ -0,0 +1,43 @@
+import numpy as np
+
+
+class Curve:
+    """Pair of x/y data series (e.g. flow/head) held as contiguous NumPy arrays.
+    Uses __slots__ so many thousands of curves can be held without a per instance
+    __dict__.
+    """
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y, dtype=np.float64):
+        """
+        Args:
+            x (array like): x values, lists are converted to arrays
+            y (array like): y values corresponding to x
+            dtype (np.dtype, optional): float type the values are stored as.
+            Defaults to np.float64.
+
+        Raises:
+            ValueError: Raises error if x and y are different lengths
+        """
+        self.x = np.ascontiguousarray(x, dtype=dtype)
+        self.y = np.ascontiguousarray(y, dtype=dtype)
+        if self.x.shape != self.y.shape:
+            raise ValueError(
+                "Error: x and y must be the same length, "
+                f"got {len(self.x)} and {len(self.y)}"
+            )
+
+    def __repr__(self):
+        return f"Curve({len(self)} points, {self.x.dtype})"
+
+    def __len__(self):
+        return len(self.x)
+
+    def nbytes(self):
+        """returns the memory used by the curve data
+
+        Returns:
+            int: number of bytes used by the x and y arrays
+        """
+        return self.x.nbytes + self.y.nbytes
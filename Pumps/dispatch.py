@@ -0,0 +1,207 @@
+from itertools import combinations
+
+import numpy as np
+
+from instrumentation import instrument
+from operating_point import bisect_roots, shaft_power
+from station import invert_head_curve
+
+
+def _pump_flow(pump, head, ratio):
+    """flow delivered by a pump at a head and speed ratio in a parallel station.
+    Heads above the pump's shut off head give no flow and heads below the end of its
+    curve are capped at the end of the curve, so the flow rises monotonically with
+    speed. Returns the flows and a boolean array that is True where the flow was
+    capped, as the pump can't actually operate at that head."""
+    flow_multiplier, head_multiplier = pump.affinity_ratio(ratio * 100)
+    flows = invert_head_curve(pump, head, ratio * 100)
+    shutoff_head = head_multiplier * pump.fit_curve("flow", "head")(np.min(pump.flow))
+    flows = np.where(head > shutoff_head, 0.0, flows)
+    capped = np.isnan(flows)
+    return np.where(capped, flow_multiplier * np.max(pump.flow), flows), capped
+
+
+class DispatchTable:
+    """Minimum power dispatch of a parallel pump station against a system curve,
+    tabulated over a uniform grid of station flows. Every combination of running
+    pumps is solved at a common speed for every table flow, points where any running
+    pump is outside its POR, beyond its curve data or short of NPSH are discarded,
+    and the lowest power combination is kept. Demand time series are then resolved
+    with array lookups into the table.
+    """
+
+    __slots__ = ("combinations", "flows", "best", "speed", "power")
+
+    def __init__(self, combinations, flows, best, speed, power):
+        """
+        Args:
+            combinations (list): tuples of the pump indices running in each combination
+            flows (array): uniformly spaced station flows of the table (L/s)
+            best (array): index of the lowest power combination at each table flow,
+            -1 where no combination can deliver the flow
+            speed (array): array with shape (n_combinations, n_flows) of the common
+            pump speed (%), NaN where the combination can't deliver the flow
+            power (array): array with shape (n_combinations, n_flows) of the total
+            shaft power (kW), NaN where the combination can't deliver the flow
+        """
+        self.combinations = combinations
+        self.flows = flows
+        self.best = best
+        self.speed = speed
+        self.power = power
+
+    def __repr__(self):
+        return (
+            f"DispatchTable({len(self.combinations)} combinations x "
+            f"{len(self.flows)} flows)"
+        )
+
+    @classmethod
+    @instrument
+    def from_station(
+        cls,
+        station,
+        system,
+        n_flows=201,
+        max_flow=None,
+        min_speed=50,
+        max_speed=100,
+        npsha=None,
+        POR=True,
+        density=1000,
+    ):
+        """builds the dispatch table of a parallel station. Every pump in the station
+        is available for dispatch and the running speeds are optimised here, so the
+        station's assigned speeds are ignored, including standby pumps set to 0%.
+
+        Args:
+            station (PumpStation or list): parallel station whose pumps are
+            dispatched, or a list of Pump objects with pump and efficiency curves at
+            100% speed
+            system (SystemCurve): system curve the station operates against
+            n_flows (int, optional): number of table flows. Defaults to 201.
+            max_flow (float, optional): highest table flow (L/s). If None, the sum of
+            the pumps' maximum flows at max_speed. Defaults to None.
+            min_speed (float, optional): minimum allowable speed (%). Defaults to 50.
+            max_speed (float, optional): maximum allowable speed (%). Defaults to 100.
+            npsha (float or array, optional): NPSH available (m), either a single
+            value or one value per table flow. Running pumps must have an NPSHr below
+            it, pumps without NPSHr data aren't checked. If None, NPSH isn't checked.
+            Defaults to None.
+            POR (bool, optional): Only allow running pumps to operate within their
+            preferred operating region. Defaults to True.
+            density (float, optional): fluid density (kg/m3). Defaults to 1000.
+
+        Raises:
+            ValueError: Raises error if the station isn't a parallel arrangement
+
+        Returns:
+            DispatchTable: the dispatch table
+        """
+        arrangement = getattr(station, "arrangement", "parallel")
+        if arrangement != "parallel":
+            raise ValueError(
+                "Error: dispatch tables are only built for parallel stations, "
+                f"got {arrangement}"
+            )
+        pumps = list(getattr(station, "pumps", station))
+        if max_flow is None:
+            max_flow = sum(np.max(pump.flow) for pump in pumps) * max_speed / 100
+        flows = np.linspace(0, max_flow, n_flows)
+        heads = system.fit_curve("flow", "head")(flows)
+        ratio_min = max(min_speed / 100, 1e-3)  # avoids dividing by a zero speed
+
+        running_combinations = [
+            combination
+            for n_running in range(1, len(pumps) + 1)
+            for combination in combinations(range(len(pumps)), n_running)
+        ]
+        speed = np.full((len(running_combinations), n_flows), np.nan)
+        power = np.full((len(running_combinations), n_flows), np.nan)
+        for row, combination in enumerate(running_combinations):
+            running = [pumps[i] for i in combination]
+            ratio = bisect_roots(
+                lambda ratio: sum(_pump_flow(pump, heads, ratio)[0] for pump in running)
+                - flows,
+                lower=np.full(n_flows, ratio_min),
+                upper=np.full(n_flows, max_speed / 100),
+            )
+            feasible = np.isfinite(ratio)
+            ratio = np.where(feasible, ratio, 1.0)
+            total_power = np.zeros(n_flows)
+            for pump in running:
+                flow, capped = _pump_flow(pump, heads, ratio)
+                reduced_flow = flow / ratio  # equivalent flow at 100% speed
+                feasible &= (flow > 0) & ~capped
+                if POR:
+                    POR_dict = pump.POR()
+                    feasible &= (reduced_flow >= POR_dict["Lower Flow"]) & (
+                        reduced_flow <= POR_dict["Upper Flow"]
+                    )
+                if npsha is not None and hasattr(pump, "npshr"):
+                    # NPSHr scales with the square of speed
+                    npshr = ratio**2 * pump.fit_curve("npshr_flow", "npshr")(
+                        reduced_flow
+                    )
+                    feasible &= npshr <= npsha
+                efficiency = pump.fit_curve("efficiency_flow", "efficiency")(
+                    reduced_flow
+                )
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    total_power += shaft_power(flow, heads, efficiency, density)
+            speed[row] = np.where(feasible, 100 * ratio, np.nan)
+            power[row] = np.where(feasible, total_power, np.nan)
+
+        best = np.argmin(np.where(np.isnan(power), np.inf, power), axis=0)
+        best = np.where(np.all(np.isnan(power), axis=0), -1, best)
+        return cls(running_combinations, flows, best, speed, power)
+
+    def lookup(self, demand_flows):
+        """resolves the dispatch for each demand flow. The combination is taken from
+        the nearest table flow and its speed and power are linearly interpolated
+        between the neighbouring table flows.
+
+        Args:
+            demand_flows (array like): station demand flows (L/s), e.g. 8760 hourly
+            values for a year
+
+        Returns:
+            dict: dictionary of arrays with one element per demand flow. Structure:
+            {"Flow": [], "Combination": [], "Pumps Running": [], "Speed": [],
+            "Power": [], "Unmet": []}. Combination indexes self.combinations and is -1
+            where no pumps run. Speed is the common speed (%) of the running pumps
+            and Power the total shaft power (kW). Zero demands run no pumps, demands
+            that no combination can deliver are Unmet with NaN speed and power.
+        """
+        flow = np.asarray(demand_flows, dtype=float)
+        n_flows = len(self.flows)
+        step = self.flows[1] - self.flows[0]
+        position = (flow - self.flows[0]) / step
+        inside = (position >= 0) & (position <= n_flows - 1)
+        position = np.clip(np.nan_to_num(position), 0, n_flows - 1)
+
+        combination = self.best[np.rint(position).astype(int)]
+        row = np.maximum(combination, 0)
+        lower = np.minimum(np.floor(position).astype(int), n_flows - 2)
+        fraction = position - lower
+        values = []
+        for table in (self.speed, self.power):
+            interpolated = table[row, lower] + fraction * (
+                table[row, lower + 1] - table[row, lower]
+            )
+            # at the edge of a combination's range only the nearest point is defined
+            nearest = table[row, np.rint(position).astype(int)]
+            values.append(np.where(np.isnan(interpolated), nearest, interpolated))
+        speed, power = values
+
+        off = flow <= 0
+        met = inside & (combination >= 0) & ~off
+        n_running = np.array([len(running) for running in self.combinations])
+        return {
+            "Flow": flow,
+            "Combination": np.where(met, combination, -1),
+            "Pumps Running": np.where(met, n_running[row], 0),
+            "Speed": np.where(off, 0.0, np.where(met, speed, np.nan)),
+            "Power": np.where(off, 0.0, np.where(met, power, np.nan)),
+            "Unmet": ~(met | off),
+        }
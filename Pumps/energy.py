@@ -0,0 +1,185 @@
+from itertools import repeat
+
+import numpy as np
+
+from operating_point import solve_speed
+
+
+def simulate_energy(
+    pump,
+    system,
+    demand_flows,
+    timestep=1.0,
+    tariff=0.0,
+    motor_efficiency=95.0,
+    drive_efficiency=97.0,
+    min_speed=0,
+    max_speed=100,
+    density=1000,
+):
+    """simulates the energy use of a variable speed pump meeting a demand profile
+    against a system curve. Every timestep is solved together using solve_speed.
+    The pump is stopped (0% speed and 0 kW) for timesteps with zero or negative
+    demand. Timesteps where the demand cannot be met within the speed limits are
+    reported as NaN, and the totals are NaN if there are any, so a pump that can't
+    meet the demand never looks cheaper than one that can. The energy and cost of
+    the timesteps that are met are reported separately.
+
+    Args:
+        pump (Pump): pump object with pump curve and efficiency defined at 100% speed
+        system (SystemCurve): system curve the pump operates against
+        demand_flows (array like): demand flow (L/s) at each timestep, e.g. 8760 hourly
+        values for a year
+        timestep (float, optional): length of each timestep (hours). Defaults to 1.0.
+        tariff (float or array like, optional): energy cost per kWh, either a single
+        value or one value per timestep. Defaults to 0.0.
+        motor_efficiency (float, optional): motor efficiency (%). Defaults to 95.0.
+        drive_efficiency (float, optional): variable speed drive efficiency (%).
+        Defaults to 97.0.
+        min_speed (float, optional): minimum allowable speed (%). Defaults to 0.
+        max_speed (float, optional): maximum allowable speed (%). Defaults to 100.
+        density (float, optional): fluid density (kg/m3). Defaults to 1000.
+
+    Returns:
+        dict: dictionary of per timestep arrays and totals. Structure:
+        {"Speed": [], "Shaft Power": [], "Input Power": [],
+        "Wire to Water Efficiency": [], "Energy": [], "Cost": [],
+        "Total Energy": float, "Total Cost": float, "Met Energy": float,
+        "Met Cost": float, "Unmet Timesteps": int}
+        Powers are in kW, energy in kWh and efficiencies in %. Wire to water
+        efficiency is NaN while the pump is stopped. Total Energy and Total Cost are
+        NaN if any timestep is unmet, Met Energy and Met Cost only sum the met
+        timesteps.
+    """
+    demand_flows = np.asarray(demand_flows, dtype=float)
+    operating_points = solve_speed(
+        pump,
+        system,
+        demand_flows,
+        min_speed=min_speed,
+        max_speed=max_speed,
+        density=density,
+    )
+    stopped = demand_flows <= 0
+    speed = np.where(stopped, 0.0, operating_points["Speed"])
+    shaft_power = np.where(stopped, 0.0, operating_points["Power"])
+    efficiency = np.where(stopped, np.nan, operating_points["Efficiency"])
+    drive_train_efficiency = (motor_efficiency / 100) * (drive_efficiency / 100)
+    input_power = shaft_power / drive_train_efficiency
+    energy = input_power * timestep
+    cost = energy * np.asarray(tariff, dtype=float)
+
+    return {
+        "Speed": speed,
+        "Shaft Power": shaft_power,
+        "Input Power": input_power,
+        "Wire to Water Efficiency": efficiency * drive_train_efficiency,
+        "Energy": energy,
+        "Cost": cost,
+        "Total Energy": np.sum(energy),
+        "Total Cost": np.sum(cost),
+        "Met Energy": np.nansum(energy),
+        "Met Cost": np.nansum(cost),
+        "Unmet Timesteps": int(np.count_nonzero(np.isnan(energy))),
+    }
+
+
+def simulate_energy_stream(
+    pump,
+    system,
+    demand_chunks,
+    timestep=1.0,
+    tariff=0.0,
+    motor_efficiency=95.0,
+    drive_efficiency=97.0,
+    min_speed=0,
+    max_speed=100,
+    density=1000,
+):
+    """streaming version of simulate_energy for demand profiles that are too large to
+    hold in memory, e.g. multi-year per minute records. The demand profile is consumed
+    one chunk at a time and only the running totals are kept.
+
+    Args:
+        pump (Pump): pump object with pump curve and efficiency defined at 100% speed
+        system (SystemCurve): system curve the pump operates against
+        demand_chunks (iterable): iterable yielding arrays of demand flows (L/s)
+        timestep (float, optional): length of each timestep (hours). Defaults to 1.0.
+        tariff (float, array or iterable, optional): energy cost per kWh. Either a
+        single value, a 1d array with one value per timestep of the whole profile,
+        or an iterable yielding one tariff (a single value or an array matching the
+        chunk) per demand chunk. Defaults to 0.0.
+        motor_efficiency (float, optional): motor efficiency (%). Defaults to 95.0.
+        drive_efficiency (float, optional): variable speed drive efficiency (%).
+        Defaults to 97.0.
+        min_speed (float, optional): minimum allowable speed (%). Defaults to 0.
+        max_speed (float, optional): maximum allowable speed (%). Defaults to 100.
+        density (float, optional): fluid density (kg/m3). Defaults to 1000.
+
+    Raises:
+        ValueError: Raises error if the tariff doesn't match the demand chunks
+
+    Returns:
+        dict: dictionary of totals. Structure:
+        {"Timesteps": int, "Total Energy": float, "Total Cost": float,
+        "Met Energy": float, "Met Cost": float, "Peak Input Power": float,
+        "Unmet Timesteps": int}, see simulate_energy
+    """
+    per_timestep = isinstance(tariff, np.ndarray) and tariff.ndim == 1
+    if np.isscalar(tariff):
+        tariff_chunks = repeat(tariff)
+    elif not per_timestep:
+        tariff_chunks = iter(tariff)
+
+    totals = {
+        "Timesteps": 0,
+        "Total Energy": 0.0,
+        "Total Cost": 0.0,
+        "Met Energy": 0.0,
+        "Met Cost": 0.0,
+        "Peak Input Power": 0.0,
+        "Unmet Timesteps": 0,
+    }
+    for demand_flows in demand_chunks:
+        demand_flows = np.asarray(demand_flows, dtype=float)
+        start = totals["Timesteps"]
+        if per_timestep:
+            chunk_tariff = tariff[start : start + len(demand_flows)]
+        else:
+            chunk_tariff = next(tariff_chunks, None)
+            if chunk_tariff is None:
+                raise ValueError("Error: tariff has fewer chunks than the demand")
+        if np.ndim(chunk_tariff) and len(chunk_tariff) != len(demand_flows):
+            raise ValueError(
+                f"Error: tariff has {len(chunk_tariff)} values for timesteps "
+                f"{start} to {start + len(demand_flows)} of the demand, "
+                f"expected {len(demand_flows)}"
+            )
+        chunk = simulate_energy(
+            pump,
+            system,
+            demand_flows,
+            timestep=timestep,
+            tariff=chunk_tariff,
+            motor_efficiency=motor_efficiency,
+            drive_efficiency=drive_efficiency,
+            min_speed=min_speed,
+            max_speed=max_speed,
+            density=density,
+        )
+        totals["Timesteps"] += len(chunk["Energy"])
+        totals["Total Energy"] += chunk["Total Energy"]
+        totals["Total Cost"] += chunk["Total Cost"]
+        totals["Met Energy"] += chunk["Met Energy"]
+        totals["Met Cost"] += chunk["Met Cost"]
+        totals["Unmet Timesteps"] += chunk["Unmet Timesteps"]
+        if chunk["Unmet Timesteps"] < len(chunk["Energy"]):
+            totals["Peak Input Power"] = max(
+                totals["Peak Input Power"], np.nanmax(chunk["Input Power"])
+            )
+    if per_timestep and totals["Timesteps"] != len(tariff):
+        raise ValueError(
+            f"Error: tariff has {len(tariff)} values but the demand has "
+            f"{totals['Timesteps']} timesteps"
+        )
+    return totals
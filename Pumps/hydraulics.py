@@ -0,0 +1,159 @@
+import numpy as np
+
+METHODS = ("darcy-weisbach", "hazen-williams")
+
+
+class PipeSegment:
+    """Length of pipe of a single diameter along with the fittings in it"""
+
+    __slots__ = ("length", "diameter", "roughness", "c_factor", "k")
+
+    def __init__(self, length, diameter, roughness=0.1, c_factor=130, fittings=0.0):
+        """
+        Args:
+            length (float): pipe length (m)
+            diameter (float): internal diameter (mm)
+            roughness (float, optional): absolute roughness (mm), used by the
+            Darcy-Weisbach method. Defaults to 0.1.
+            c_factor (float, optional): Hazen-Williams C factor, used by the
+            Hazen-Williams method. Defaults to 130.
+            fittings (float or list, optional): K factor of each fitting, or their
+            total. Defaults to 0.0.
+        """
+        self.length = length
+        self.diameter = diameter
+        self.roughness = roughness
+        self.c_factor = c_factor
+        self.k = float(np.sum(fittings))
+
+    def __repr__(self):
+        return f"PipeSegment({self.length} m of DN{self.diameter})"
+
+    @property
+    def area(self):
+        """internal cross sectional area (m2)"""
+        return np.pi * (self.diameter / 1000) ** 2 / 4
+
+
+def friction_factor(reynolds, relative_roughness):
+    """Darcy friction factor, from the Swamee-Jain approximation of the Colebrook
+    equation for turbulent flow and 64 / Re for laminar flow (Re < 2000).
+
+    Args:
+        reynolds (float or array): Reynolds number
+        relative_roughness (float or array): roughness divided by diameter
+
+    Returns:
+        float or array: Darcy friction factor, NaN at zero flow
+    """
+    reynolds = np.asarray(reynolds, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        turbulent = (
+            0.25 / np.log10(relative_roughness / 3.7 + 5.74 / reynolds**0.9) ** 2
+        )
+        laminar = 64 / reynolds
+    return np.where(reynolds < 2000, laminar, turbulent)
+
+
+def friction_head(
+    segments, flows, roughness_factor=1.0, method="darcy-weisbach", viscosity=1.004e-6
+):
+    """calculates the friction and fitting head loss through pipe segments in series.
+    flows and roughness_factor are broadcast together, so many flows and roughness
+    scenarios are calculated at once.
+
+    Args:
+        segments (list): list of PipeSegment objects
+        flows (float or array): flows (L/s)
+        roughness_factor (float or array, optional): multiplier on the roughness of
+        every segment, e.g. 2 for aged pipe. For Hazen-Williams the C factor is divided
+        by it. Defaults to 1.0.
+        method (str, optional): "darcy-weisbach" or "hazen-williams". Fitting losses
+        use K * v**2 / 2g for both. Defaults to "darcy-weisbach".
+        viscosity (float, optional): kinematic viscosity (m2/s), used by the
+        Darcy-Weisbach method. Defaults to 1.004e-6, water at 20 degC.
+
+    Raises:
+        ValueError: Raises error for an unknown method
+
+    Returns:
+        float or array: head loss (m)
+    """
+    if method not in METHODS:
+        raise ValueError(f"Error: method must be one of {METHODS}, got {method}")
+    flows = np.abs(np.asarray(flows, dtype=float)) / 1000  # m3/s
+    roughness_factor = np.asarray(roughness_factor, dtype=float)
+    head_loss = 0.0
+    for segment in segments:
+        diameter = segment.diameter / 1000
+        velocity_head = (flows / segment.area) ** 2 / (2 * 9.81)
+        if method == "darcy-weisbach":
+            reynolds = flows / segment.area * diameter / viscosity
+            relative_roughness = roughness_factor * segment.roughness / 1000 / diameter
+            friction = friction_factor(reynolds, relative_roughness)
+            # zero flow has no loss, even though the friction factor is undefined
+            with np.errstate(invalid="ignore"):
+                pipe_loss = np.where(
+                    flows > 0,
+                    friction * segment.length / diameter * velocity_head,
+                    0.0,
+                )
+        else:
+            c_factor = segment.c_factor / roughness_factor
+            pipe_loss = (
+                10.67
+                * segment.length
+                * flows**1.852
+                / (c_factor**1.852 * diameter**4.8704)
+            )
+        head_loss = head_loss + pipe_loss + segment.k * velocity_head
+    return head_loss
+
+
+def system_head_grid(
+    segments,
+    flows,
+    static_heads=0.0,
+    roughness_factors=1.0,
+    method="darcy-weisbach",
+    viscosity=1.004e-6,
+):
+    """evaluates the system head of every combination of static head and roughness
+    as one 2D array. Friction is calculated once per roughness and added to every
+    static head.
+
+    Args:
+        segments (list): list of PipeSegment objects
+        flows (array like): flows (L/s) to evaluate the system curves at
+        static_heads (float or array like, optional): static head scenarios (m), e.g.
+        the lift at minimum and maximum wet well levels. Defaults to 0.0.
+        roughness_factors (float or array like, optional): roughness multiplier
+        scenarios, see friction_head. Defaults to 1.0.
+        method (str, optional): "darcy-weisbach" or "hazen-williams".
+        Defaults to "darcy-weisbach".
+        viscosity (float, optional): kinematic viscosity (m2/s). Defaults to 1.004e-6.
+
+    Returns:
+        dict: dictionary of the scenario grid. Structure: {"Flow": [],
+        "Static Head": [], "Roughness Factor": [], "Head": [[]]}. Head has shape
+        (n_static_heads * n_roughness_factors, n_flows), row i is the scenario with
+        Static Head[i] and Roughness Factor[i]. Static heads vary slowest.
+    """
+    flows = np.asarray(flows, dtype=float)
+    static_heads = np.atleast_1d(np.asarray(static_heads, dtype=float))
+    roughness_factors = np.atleast_1d(np.asarray(roughness_factors, dtype=float))
+    friction = friction_head(
+        segments,
+        flows,
+        roughness_factor=roughness_factors[:, np.newaxis],
+        method=method,
+        viscosity=viscosity,
+    )
+    friction = np.broadcast_to(friction, (len(roughness_factors), len(flows)))
+    heads = static_heads[:, np.newaxis, np.newaxis] + friction
+    return {
+        "Flow": flows,
+        "Static Head": np.repeat(static_heads, len(roughness_factors)),
+        "Roughness Factor": np.tile(roughness_factors, len(static_heads)),
+        "Head": heads.reshape(-1, len(flows)),
+    }
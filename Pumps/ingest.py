@@ -0,0 +1,186 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from parameters import Pump, SystemCurve
+
+# curve data series held in each pump record, named after the Pump attributes
+CURVE_SERIES = ("flow", "head", "efficiency", "efficiency_flow", "npshr", "npshr_flow")
+
+# header names used by parse_xylect_curve and parse_excel_curve for each data series
+_SERIES_HEADINGS = {
+    "flow": "Flow [l/s]",
+    "head": "Head [m]",
+    "efficiency": "Overall Efficiency [%]",
+    "efficiency_flow": "Overall Efficiency Flow [l/s",
+    "npshr": "NPSHR-values [m]",
+    "npshr_flow": "NPSHR-Flow [l/s]",
+}
+
+
+def parse_curve_file(filepath, kind="xylect", make="Xylem", **columns):
+    """parses a single pump curve file into a catalog record.
+
+    Args:
+        filepath (str or Path): location of the pump curve file
+        kind (str, optional): "xylect" for Xylect exports (parse_xylect_curve) or
+        "excel" for general excel files (parse_excel_curve). Defaults to "xylect".
+        make (str, optional): pump make to record. Defaults to "Xylem".
+        **columns: column name arguments passed through to parse_excel_curve
+        (flow, head, efficiency etc). Only used when kind is "excel".
+
+    Returns:
+        dict: catalog record with the pump make, model, motor and impeller, and a float
+        array for each of the CURVE_SERIES. Missing series are empty arrays.
+    """
+    # imported here so loading records or a catalog never imports pandas
+    from parse_curve import parse_xylect_curve, parse_excel_curve
+
+    if kind == "xylect":
+        pump_dict = parse_xylect_curve(filepath)
+    elif kind == "excel":
+        pump_dict = parse_excel_curve(filepath, **columns)
+    else:
+        raise ValueError(f"Unknown curve file kind: {kind}")
+
+    record = {
+        "Make": make,
+        "Model": pump_dict.get("Pump", Path(filepath).stem),
+        "Motor": pump_dict.get("Motor"),
+        "Impeller": pump_dict.get("Impeller"),
+    }
+    for x, y in (
+        ("flow", "head"),
+        ("efficiency_flow", "efficiency"),
+        ("npshr_flow", "npshr"),
+    ):
+        x_values = pump_dict.get(_SERIES_HEADINGS[x], pump_dict.get("Flow [l/s]"))
+        y_values = pump_dict.get(_SERIES_HEADINGS[y])
+        if x_values is None or y_values is None:
+            record[x] = record[y] = np.empty(0)
+            continue
+        x_values = np.asarray(x_values, dtype=float)
+        y_values = np.asarray(y_values, dtype=float)
+        valid = np.isfinite(x_values) & np.isfinite(y_values)  # drops blank cells
+        record[x], record[y] = x_values[valid], y_values[valid]
+    return record
+
+
+def record_to_pump(record):
+    """creates a Pump object from a catalog record
+
+    Args:
+        record (dict): catalog record, as returned by parse_curve_file
+
+    Returns:
+        Pump: pump object with the curve data in the record assigned
+    """
+    pump = Pump(
+        make=record["Make"],
+        model=record["Model"],
+        impeller=record["Impeller"],
+        motor=record["Motor"],
+    )
+    pump.define_pumpcurve(flow=record["flow"], head=record["head"])
+    if len(record["efficiency"]):
+        pump.define_efficiency(
+            efficiency=record["efficiency"], efficiency_flow=record["efficiency_flow"]
+        )
+    if len(record["npshr"]):
+        pump.define_npshr(npshr=record["npshr"], npshr_flow=record["npshr_flow"])
+    return pump
+
+
+def parse_system_file(filepath):
+    """parses a single system curve file into a system record.
+
+    Args:
+        filepath (str or Path): location of the system curve file
+
+    Returns:
+        dict: system record with structure {"Name": str, "flow": array, "head": array}
+    """
+    from parse_curve import parse_system_curve
+
+    system_dict = parse_system_curve(filepath)
+    flow = np.asarray(system_dict["Flow"], dtype=float)
+    head = np.asarray(system_dict["Head"], dtype=float)
+    valid = np.isfinite(flow) & np.isfinite(head)
+    return {"Name": Path(filepath).stem, "flow": flow[valid], "head": head[valid]}
+
+
+def record_to_system(record):
+    """creates a SystemCurve object from a system record
+
+    Args:
+        record (dict): system record, as returned by parse_system_file
+
+    Returns:
+        SystemCurve: system curve object
+    """
+    return SystemCurve(name=record["Name"], flow=record["flow"], head=record["head"])
+
+
+def _ingest_file(job):
+    """parses one file for ingest_files. Runs in a worker process, so any error is
+    returned as a message rather than raised."""
+    filepath, kind, options = job
+    try:
+        if kind == "system":
+            record = parse_system_file(filepath)
+        else:
+            record = parse_curve_file(filepath, kind=kind, **options)
+    except Exception as error:
+        return filepath, None, f"{type(error).__name__}: {error}"
+    return filepath, record, None
+
+
+def ingest_files(
+    filepaths, kind="xylect", workers=None, chunksize=8, records=False, **options
+):
+    """parses many pump or system curve files in parallel using a process pool.
+    A file that fails to parse does not stop the run, its error is collected and
+    returned alongside the successful results.
+
+    Args:
+        filepaths (iterable): locations of the files to parse
+        kind (str, optional): "xylect" or "excel" for pump curves (see
+        parse_curve_file), or "system" for system curves. Defaults to "xylect".
+        workers (int, optional): number of worker processes. If None, one per CPU is
+        used. If 1, files are parsed in the current process. Defaults to None.
+        chunksize (int, optional): number of files sent to a worker at a time.
+        Defaults to 8.
+        records (bool, optional): If True, the raw record dicts of arrays are returned
+        instead of Pump/SystemCurve objects. Defaults to False.
+        **options: passed through to parse_curve_file (make and excel column names)
+
+    Returns:
+        dict: dictionary with structure
+        {"Results": {filepath: Pump, SystemCurve or record},
+        "Errors": {filepath: error message}}
+    """
+    jobs = [(filepath, kind, options) for filepath in filepaths]
+    if workers == 1:
+        outputs = map(_ingest_file, jobs)
+        return _collect_ingest(outputs, kind, records)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        outputs = executor.map(_ingest_file, jobs, chunksize=chunksize)
+        return _collect_ingest(outputs, kind, records)
+
+
+def _collect_ingest(outputs, kind, records):
+    """sorts ingest_files worker outputs into results and errors"""
+    to_object = record_to_system if kind == "system" else record_to_pump
+    ingested = {"Results": {}, "Errors": {}}
+    for filepath, record, error in outputs:
+        if error is None and not records:
+            try:
+                record = to_object(record)
+            except Exception as conversion_error:
+                error = f"{type(conversion_error).__name__}: {conversion_error}"
+        if error is not None:
+            ingested["Errors"][filepath] = error
+        else:
+            ingested["Results"][filepath] = record
+    return ingested
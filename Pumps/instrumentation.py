@@ -0,0 +1,178 @@
+"""Opt-in instrumentation of the Pumps package hot paths.
+
+Functions decorated with @instrument record their call counts, wall time and memory
+allocated while a profile is active. Outside of a profile the decorator only costs a
+single check of the active profile.
+
+    with profile() as stats:
+        pump.POR()
+    stats.print_stats()
+    stats.dump_json("profile.json")
+"""
+
+import functools
+import json
+import marshal
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_active_profile = None
+
+
+class Profile:
+    """Call counts, wall time and allocations recorded for each instrumented function"""
+
+    def __init__(self, allocations=False):
+        """
+        Args:
+            allocations (bool, optional): Record memory allocated by each function
+            using tracemalloc. This slows the profiled code down considerably.
+            Defaults to False.
+        """
+        self.allocations = allocations
+        self.stats = {}  # {key: [calls, own time, cumulative time, bytes, callers]}
+        self._stack = []  # [key, time spent in instrumented child calls] per frame
+
+    def _enter(self, key):
+        self._stack.append([key, 0.0])
+
+    def _exit(self, key, elapsed, allocated):
+        _, child_time = self._stack.pop()
+        entry = self.stats.get(key)
+        if entry is None:
+            entry = self.stats[key] = [0, 0.0, 0.0, 0, {}]
+        entry[0] += 1
+        entry[1] += elapsed - child_time
+        entry[2] += elapsed
+        entry[3] += allocated
+        if self._stack:
+            parent = self._stack[-1]
+            parent[1] += elapsed
+            caller = entry[4].setdefault(parent[0], [0, 0.0, 0.0])
+            caller[0] += 1
+            caller[1] += elapsed - child_time
+            caller[2] += elapsed
+
+    def as_dict(self):
+        """returns the recorded statistics
+
+        Returns:
+            dict: dictionary with structure {function name: {"Calls": int,
+            "Own Time": float, "Cumulative Time": float, "Allocated Bytes": int}}.
+            Times are in seconds. Own time excludes time spent in other instrumented
+            functions. Allocated bytes is the net memory allocated, only recorded if
+            the profile was started with allocations=True.
+        """
+        return {
+            key[2]: {
+                "Calls": calls,
+                "Own Time": own_time,
+                "Cumulative Time": cumulative_time,
+                "Allocated Bytes": allocated,
+            }
+            for key, (calls, own_time, cumulative_time, allocated, _) in sorted(
+                self.stats.items(), key=lambda item: -item[1][2]
+            )
+        }
+
+    def dump_json(self, filepath):
+        """saves the recorded statistics as JSON
+
+        Args:
+            filepath (str): location of the JSON file
+        """
+        with open(filepath, "w") as fp:
+            json.dump(self.as_dict(), fp, indent=4)
+
+    def dump_pstats(self, filepath):
+        """saves the recorded statistics in the marshal format read by pstats.Stats,
+        so they can be explored with pstats or tools such as snakeviz.
+
+        Args:
+            filepath (str): location of the stats file
+        """
+        pstats_dict = {}
+        for key, (calls, own_time, cumulative_time, _, callers) in self.stats.items():
+            pstats_dict[key] = (
+                calls,
+                calls,
+                own_time,
+                cumulative_time,
+                {
+                    caller: tuple([count, count] + times)
+                    for caller, (count, *times) in callers.items()
+                },
+            )
+        with open(filepath, "wb") as fp:
+            marshal.dump(pstats_dict, fp)
+
+    def print_stats(self):
+        """prints the recorded statistics, slowest cumulative time first"""
+        print(f"{'Function':<40}{'Calls':>10}{'Own (ms)':>14}{'Cumulative (ms)':>18}")
+        for name, stats in self.as_dict().items():
+            print(
+                f"{name:<40}{stats['Calls']:>10}{stats['Own Time'] * 1000:>14.3f}"
+                f"{stats['Cumulative Time'] * 1000:>18.3f}"
+            )
+
+
+@contextmanager
+def profile(allocations=False):
+    """activates instrumentation for the duration of the with block.
+
+    Args:
+        allocations (bool, optional): Record memory allocated by each instrumented
+        function using tracemalloc. Defaults to False.
+
+    Yields:
+        Profile: the statistics recorded inside the with block
+    """
+    global _active_profile
+    previous_profile = _active_profile
+    stats = Profile(allocations=allocations)
+    started_tracemalloc = allocations and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    _active_profile = stats
+    try:
+        yield stats
+    finally:
+        _active_profile = previous_profile
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+
+def instrument(func):
+    """decorator recording the call count, wall time and allocations of a function
+    whenever a profile is active.
+
+    Args:
+        func (callable): function to instrument
+
+    Returns:
+        callable: instrumented function
+    """
+    code = func.__code__
+    key = (code.co_filename, code.co_firstlineno, func.__qualname__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stats = _active_profile
+        if stats is None:
+            return func(*args, **kwargs)
+        stats._enter(key)
+        memory_before = tracemalloc.get_traced_memory()[0] if stats.allocations else 0
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated = (
+                tracemalloc.get_traced_memory()[0] - memory_before
+                if stats.allocations
+                else 0
+            )
+            stats._exit(key, elapsed, allocated)
+
+    return wrapper
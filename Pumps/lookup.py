@@ -0,0 +1,246 @@
+"""Precomputed speed x flow lookup tables of pump performance.
+
+A PumpTable holds the head, efficiency, shaft power and NPSHr of a pump on a dense
+uniform (speed, flow) grid, built once from the fitted curves with the affinity laws.
+Queries are bilinear interpolations on the grid so no curves need fitting at startup,
+and tables saved with PumpTable.save are memory-mapped by PumpTable.load so many
+processes can share a single copy.
+
+    table = PumpTable.from_pump(pump)
+    table.save("pump.table")
+    table = PumpTable.load("pump.table")
+    head = table.query(85.0, 42.0)
+"""
+
+import numpy as np
+
+from operating_point import shaft_power
+
+LOOKUP_SCHEMA_VERSION = 1
+QUANTITIES = ("head", "efficiency", "power", "npshr")
+_HEADER_LENGTH = 8  # float64 values written before the table values
+
+
+class PumpTable:
+    """Head, efficiency, shaft power and NPSHr of a pump tabulated on a uniform
+    (speed, flow) grid. Grid points where the equivalent 100% speed flow is outside
+    the pump's data, or where a curve hasn't been defined, are NaN.
+    """
+
+    __slots__ = ("values", "speed_min", "speed_step", "flow_min", "flow_step")
+
+    def __init__(self, values, speed_min, speed_step, flow_min, flow_step):
+        """
+        Args:
+            values (array): array with shape (len(QUANTITIES), n_speeds, n_flows) of
+            the tabulated quantities, ordered as QUANTITIES
+            speed_min (float): speed of the first grid row (%)
+            speed_step (float): speed spacing of the grid rows (%)
+            flow_min (float): flow of the first grid column (L/s)
+            flow_step (float): flow spacing of the grid columns (L/s)
+        """
+        self.values = values
+        self.speed_min = float(speed_min)
+        self.speed_step = float(speed_step)
+        self.flow_min = float(flow_min)
+        self.flow_step = float(flow_step)
+
+    def __repr__(self):
+        _, n_speeds, n_flows = self.values.shape
+        return f"PumpTable({n_speeds} speeds x {n_flows} flows)"
+
+    @classmethod
+    def from_pump(
+        cls, pump, min_speed=50, max_speed=100, n_speeds=51, n_flows=201, density=1000
+    ):
+        """tabulates a pump using the affinity laws and the pump's curve model.
+
+        Args:
+            pump (Pump): pump object with a pump curve defined at 100% speed
+            min_speed (float, optional): lowest tabulated speed (%). Defaults to 50.
+            max_speed (float, optional): highest tabulated speed (%). Defaults to 100.
+            n_speeds (int, optional): number of speed rows. Defaults to 51.
+            n_flows (int, optional): number of flow columns, spanning zero to the
+            maximum pump flow at max_speed. Defaults to 201.
+            density (float, optional): fluid density (kg/m3) used for the shaft
+            power. Defaults to 1000.
+
+        Returns:
+            PumpTable: the tabulated pump
+        """
+        speeds = np.linspace(min_speed, max_speed, n_speeds)
+        flow_multiplier, head_multiplier = pump.affinity_ratio(speeds[:, np.newaxis])
+        flows = np.linspace(0, np.max(pump.flow) * max_speed / 100, n_flows)
+        reduced_flow = flows / flow_multiplier  # equivalent flow at 100% speed
+        in_range = (reduced_flow >= np.min(pump.flow)) & (
+            reduced_flow <= np.max(pump.flow)
+        )
+
+        values = np.full((len(QUANTITIES), n_speeds, n_flows), np.nan)
+        head = head_multiplier * pump.fit_curve("flow", "head")(reduced_flow)
+        values[0] = np.where(in_range, head, np.nan)
+        if hasattr(pump, "efficiency"):
+            efficiency_fit = pump.fit_curve("efficiency_flow", "efficiency")
+            values[1] = np.where(in_range, efficiency_fit(reduced_flow), np.nan)
+            values[2] = shaft_power(flows, values[0], values[1], density=density)
+        if hasattr(pump, "npshr"):
+            # NPSHr scales with the square of speed, as head does
+            npshr = head_multiplier * pump.fit_curve("npshr_flow", "npshr")(
+                reduced_flow
+            )
+            values[3] = np.where(in_range, npshr, np.nan)
+        return cls(
+            values,
+            speed_min=min_speed,
+            speed_step=speeds[1] - speeds[0] if n_speeds > 1 else 1.0,
+            flow_min=0.0,
+            flow_step=flows[1] - flows[0],
+        )
+
+    @property
+    def speeds(self):
+        """speeds of the grid rows (%)"""
+        return self.speed_min + self.speed_step * np.arange(self.values.shape[1])
+
+    @property
+    def flows(self):
+        """flows of the grid columns (L/s)"""
+        return self.flow_min + self.flow_step * np.arange(self.values.shape[2])
+
+    def query(self, speed, flow, quantity="head"):
+        """bilinearly interpolates one quantity at the given speeds and flows.
+        Scalar queries take a pure Python path to keep their latency to a few
+        microseconds. Points outside the grid return NaN.
+
+        Args:
+            speed (float or array): pump speed(s) (%)
+            flow (float or array): flow(s) (L/s), broadcast against speed
+            quantity (str, optional): one of QUANTITIES. Defaults to "head".
+
+        Returns:
+            float or array: interpolated value(s)
+        """
+        table = self.values[QUANTITIES.index(quantity)]
+        if isinstance(speed, (int, float)) and isinstance(flow, (int, float)):
+            return self._query_scalar(table, speed, flow)
+        return self._query_arrays(table, speed, flow)
+
+    def lookup(self, speed, flow):
+        """interpolates every tabulated quantity at the given speeds and flows.
+
+        Args:
+            speed (float or array): pump speed(s) (%)
+            flow (float or array): flow(s) (L/s), broadcast against speed
+
+        Returns:
+            dict: dictionary with structure {"head": [], "efficiency": [],
+            "power": [], "npshr": []}. Power is the shaft power in kW.
+        """
+        values = self._query_arrays(self.values, speed, flow)
+        return dict(zip(QUANTITIES, values))
+
+    def _query_scalar(self, table, speed, flow):
+        _, n_speeds, n_flows = self.values.shape
+        s = (speed - self.speed_min) / self.speed_step
+        f = (flow - self.flow_min) / self.flow_step
+        if not (0 <= s <= n_speeds - 1 and 0 <= f <= n_flows - 1):
+            return float("nan")
+        i = min(int(s), n_speeds - 2) if n_speeds > 1 else 0
+        j = min(int(f), n_flows - 2)
+        s -= i
+        f -= j
+        row = table[i]
+        lower = row[j] + f * (row[j + 1] - row[j])
+        if s == 0:
+            return float(lower)
+        row = table[i + 1]
+        upper = row[j] + f * (row[j + 1] - row[j])
+        return float(lower + s * (upper - lower))
+
+    def _query_arrays(self, table, speed, flow):
+        """bilinear interpolation of a (..., n_speeds, n_flows) table, the leading
+        axes of the table are kept in front of the broadcast query shape"""
+        n_speeds, n_flows = table.shape[-2:]
+        speed, flow = np.broadcast_arrays(
+            np.asarray(speed, dtype=float), np.asarray(flow, dtype=float)
+        )
+        s = (speed - self.speed_min) / self.speed_step
+        f = (flow - self.flow_min) / self.flow_step
+        outside = (s < 0) | (s > n_speeds - 1) | (f < 0) | (f > n_flows - 1)
+        i = np.clip(np.floor(np.nan_to_num(s)), 0, max(n_speeds - 2, 0)).astype(int)
+        j = np.clip(np.floor(np.nan_to_num(f)), 0, n_flows - 2).astype(int)
+        s = s - i
+        f = f - j
+        i_upper = np.minimum(i + 1, n_speeds - 1)
+        lower = table[..., i, j] + f * (table[..., i, j + 1] - table[..., i, j])
+        upper = table[..., i_upper, j] + f * (
+            table[..., i_upper, j + 1] - table[..., i_upper, j]
+        )
+        values = lower + s * (upper - lower)
+        return np.where(outside, np.nan, values)
+
+    def save(self, filepath):
+        """saves the table as a flat float64 binary file: a header of the schema
+        version, grid shape and spacing followed by the table values in C order.
+
+        Args:
+            filepath (str or Path): location of the table file
+        """
+        n_quantities, n_speeds, n_flows = self.values.shape
+        header = np.array(
+            [
+                LOOKUP_SCHEMA_VERSION,
+                n_quantities,
+                n_speeds,
+                n_flows,
+                self.speed_min,
+                self.speed_step,
+                self.flow_min,
+                self.flow_step,
+            ],
+            dtype=np.float64,
+        )
+        with open(filepath, "wb") as fp:
+            header.tofile(fp)
+            np.ascontiguousarray(self.values, dtype=np.float64).tofile(fp)
+
+    @classmethod
+    def load(cls, filepath, mmap=True):
+        """loads a table saved by PumpTable.save.
+
+        Args:
+            filepath (str or Path): location of the table file
+            mmap (bool, optional): Memory map the table values read only instead of
+            reading them into memory, so processes loading the same file share one
+            copy. Defaults to True.
+
+        Raises:
+            ValueError: Raises error if the file has a different schema version
+
+        Returns:
+            PumpTable: the loaded table
+        """
+        header = np.fromfile(filepath, dtype=np.float64, count=_HEADER_LENGTH)
+        if int(header[0]) != LOOKUP_SCHEMA_VERSION:
+            raise ValueError(
+                f"Table {filepath} has schema version {int(header[0])}, "
+                f"expected {LOOKUP_SCHEMA_VERSION}"
+            )
+        shape = tuple(int(n) for n in header[1:4])
+        if mmap:
+            # a plain ndarray view of the map avoids the memmap subclass overhead on
+            # every scalar query, the view keeps the map open
+            values = np.asarray(
+                np.memmap(
+                    filepath,
+                    dtype=np.float64,
+                    mode="r",
+                    offset=_HEADER_LENGTH * 8,
+                    shape=shape,
+                )
+            )
+        else:
+            values = np.fromfile(
+                filepath, dtype=np.float64, offset=_HEADER_LENGTH * 8
+            ).reshape(shape)
+        return cls(values, *header[4:])
@@ -0,0 +1,216 @@
+"""Curve models used to fit pump and system curve data.
+
+Each model has a fit(x, y) method returning a callable curve which evaluates arrays of
+x values and has a deriv() method. PolynomialModel returns an np.poly1d, the piecewise
+models return a PiecewisePolynomial which evaluates through a precomputed coefficient
+table using np.searchsorted.
+"""
+
+import numpy as np
+
+from batch import polyder_rows, polyval_rows, real_roots_rows
+from instrumentation import instrument
+
+
+class PiecewisePolynomial:
+    """Piecewise polynomial curve stored as a table of local coefficients.
+    Segment i covers breaks[i] <= x < breaks[i + 1] and is evaluated as a polynomial
+    in (x - breaks[i]). Values outside the breaks are extrapolated from the end
+    segments.
+    """
+
+    __slots__ = ("breaks", "coeffs")
+
+    def __init__(self, breaks, coeffs):
+        """
+        Args:
+            breaks (array): array with shape (m + 1,) of increasing segment boundaries
+            coeffs (array): array with shape (m, order + 1) of local polynomial
+            coefficients for each segment, highest power first
+        """
+        self.breaks = np.ascontiguousarray(breaks, dtype=float)
+        self.coeffs = np.ascontiguousarray(coeffs, dtype=float)
+
+    def __repr__(self):
+        return (
+            f"PiecewisePolynomial({len(self.coeffs)} segments, "
+            f"order {self.coeffs.shape[1] - 1})"
+        )
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=float)
+        segment = np.clip(
+            np.searchsorted(self.breaks, x.ravel(), side="right") - 1,
+            0,
+            len(self.coeffs) - 1,
+        )
+        local_x = x.ravel() - self.breaks[segment]
+        return polyval_rows(self.coeffs[segment], local_x).reshape(x.shape)[()]
+
+    def deriv(self):
+        """returns the derivative of the curve
+
+        Returns:
+            PiecewisePolynomial: derivative curve
+        """
+        if self.coeffs.shape[1] == 1:
+            return PiecewisePolynomial(self.breaks, np.zeros_like(self.coeffs))
+        return PiecewisePolynomial(self.breaks, polyder_rows(self.coeffs))
+
+    def maximum(self, lower, upper):
+        """finds the maximum of the curve between two x values, checking the turning
+        points of every segment together.
+
+        Args:
+            lower (float): lower x bound
+            upper (float): upper x bound
+
+        Returns:
+            (tuple): Tuple of the x value and curve value at the maximum
+        """
+        widths = np.diff(self.breaks)
+        turning_points = real_roots_rows(polyder_rows(self.coeffs))
+        inside_segment = (turning_points >= 0) & (
+            turning_points <= widths[:, np.newaxis]
+        )
+        turning_points = (self.breaks[:-1, np.newaxis] + turning_points)[inside_segment]
+        candidates = np.concatenate([turning_points, self.breaks, [lower, upper]])
+        candidates = candidates[(candidates >= lower) & (candidates <= upper)]
+        values = self(candidates)
+        best = np.argmax(values)
+        return candidates[best], values[best]
+
+
+def _sorted_unique(x, y):
+    """sorts curve data by x and drops repeated x values and non finite points"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    x, index = np.unique(x[valid], return_index=True)
+    return x, y[valid][index]
+
+
+class PolynomialModel:
+    """Least squares polynomial of any degree (np.polyfit)"""
+
+    __slots__ = ("deg",)
+
+    def __init__(self, deg=3):
+        self.deg = deg
+
+    def __repr__(self):
+        return f"PolynomialModel(deg={self.deg})"
+
+    @property
+    def key(self):
+        """identifies the model in the Pump fit cache"""
+        return self.deg
+
+    @instrument
+    def fit(self, x, y):
+        """fits the model to a curve
+
+        Args:
+            x (array like): x values to curve fit
+            y (array like): y values to curve fit
+
+        Returns:
+            [poly1d]: np.poly1d object of curve
+        """
+        return np.poly1d(np.polyfit(x, y, self.deg))
+
+
+class PchipModel:
+    """Monotone piecewise cubic Hermite interpolation (PCHIP, Fritsch-Carlson).
+    Passes through every data point without overshooting between them."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "PchipModel()"
+
+    @property
+    def key(self):
+        """identifies the model in the Pump fit cache"""
+        return "pchip"
+
+    @instrument
+    def fit(self, x, y):
+        """fits the model to a curve
+
+        Args:
+            x (array like): x values to interpolate
+            y (array like): y values to interpolate
+
+        Returns:
+            PiecewisePolynomial: cubic segment table of the curve
+        """
+        x, y = _sorted_unique(x, y)
+        if len(x) < 3:
+            return LinearModel().fit(x, y)
+        widths = np.diff(x)
+        slopes = np.diff(y) / widths
+        derivatives = np.zeros_like(x)
+
+        # weighted harmonic mean of neighbouring slopes, zero at turning points
+        weight_1 = 2 * widths[1:] + widths[:-1]
+        weight_2 = widths[1:] + 2 * widths[:-1]
+        same_sign = np.sign(slopes[1:]) * np.sign(slopes[:-1]) > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            harmonic = (weight_1 + weight_2) / (
+                weight_1 / slopes[:-1] + weight_2 / slopes[1:]
+            )
+        derivatives[1:-1] = np.where(same_sign, harmonic, 0.0)
+        derivatives[0] = self._end_derivative(
+            widths[0], widths[1], slopes[0], slopes[1]
+        )
+        derivatives[-1] = self._end_derivative(
+            widths[-1], widths[-2], slopes[-1], slopes[-2]
+        )
+
+        # cubic Hermite coefficients in local x for each segment
+        c = (3 * slopes - 2 * derivatives[:-1] - derivatives[1:]) / widths
+        d = (derivatives[:-1] + derivatives[1:] - 2 * slopes) / widths**2
+        coeffs = np.column_stack([d, c, derivatives[:-1], y[:-1]])
+        return PiecewisePolynomial(x, coeffs)
+
+    @staticmethod
+    def _end_derivative(width_0, width_1, slope_0, slope_1):
+        """shape preserving three point estimate of the derivative at an end point"""
+        derivative = ((2 * width_0 + width_1) * slope_0 - width_0 * slope_1) / (
+            width_0 + width_1
+        )
+        if np.sign(derivative) != np.sign(slope_0):
+            return 0.0
+        if np.sign(slope_0) != np.sign(slope_1) and abs(derivative) > abs(3 * slope_0):
+            return 3 * slope_0
+        return derivative
+
+
+class LinearModel:
+    """Piecewise linear interpolation between the data points"""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "LinearModel()"
+
+    @property
+    def key(self):
+        """identifies the model in the Pump fit cache"""
+        return "linear"
+
+    @instrument
+    def fit(self, x, y):
+        """fits the model to a curve
+
+        Args:
+            x (array like): x values to interpolate
+            y (array like): y values to interpolate
+
+        Returns:
+            PiecewisePolynomial: linear segment table of the curve
+        """
+        x, y = _sorted_unique(x, y)
+        coeffs = np.column_stack([np.diff(y) / np.diff(x), y[:-1]])
+        return PiecewisePolynomial(x, coeffs)
@@ -0,0 +1,137 @@
+import numpy as np
+
+from instrumentation import instrument
+
+
+def vapour_pressure(temperature):
+    """vapour pressure of water from the Antoine equation, valid from 1 to 100 degC
+
+    Args:
+        temperature (float or array): water temperature (degC)
+
+    Returns:
+        float or array: vapour pressure (kPa)
+    """
+    mmHg = 10 ** (8.07131 - 1730.63 / (233.426 + np.asarray(temperature, dtype=float)))
+    return mmHg * 0.133322
+
+
+def npsh_available(
+    level,
+    temperature=20.0,
+    suction_losses=0.0,
+    pump_elevation=0.0,
+    atmospheric_pressure=101.325,
+    density=1000,
+):
+    """calculates the net positive suction head available to a pump drawing from an
+    open wet well. All arguments are broadcast together, so a time series of any of
+    them gives a time series of NPSHa.
+
+    Args:
+        level (float or array): wet well water level (m)
+        temperature (float or array, optional): water temperature (degC), used for the
+        vapour pressure. Defaults to 20.0.
+        suction_losses (float or array, optional): friction and fitting losses in the
+        suction pipework (m). Defaults to 0.0.
+        pump_elevation (float, optional): elevation of the pump impeller eye (m), in
+        the same datum as level. Defaults to 0.0.
+        atmospheric_pressure (float, optional): atmospheric pressure on the wet well
+        surface (kPa). Defaults to 101.325.
+        density (float, optional): fluid density (kg/m3). Defaults to 1000.
+
+    Returns:
+        float or array: NPSHa (m)
+    """
+    pressure_head = (
+        (atmospheric_pressure - vapour_pressure(temperature)) * 1000 / (density * 9.81)
+    )
+    static_head = np.asarray(level, dtype=float) - pump_elevation
+    return pressure_head + static_head - suction_losses
+
+
+@instrument
+def npsh_margin(
+    pump,
+    flows,
+    speeds=100,
+    level=0.0,
+    temperature=20.0,
+    suction_losses=0.0,
+    pump_elevation=0.0,
+    atmospheric_pressure=101.325,
+    density=1000,
+    min_margin=0.0,
+    min_ratio=1.0,
+):
+    """screens pump operating points against the suction conditions at the same
+    times. NPSHr is scaled to each speed with the affinity laws (NPSHr at speed ratio
+    r and flow Q is r**2 * NPSHr(Q / r)) and compared to NPSHa, with every sample
+    handled in one set of array operations.
+
+    Args:
+        pump (Pump): pump object with NPSHr data defined at 100% speed
+        flows (array like): pump flow at each sample (L/s)
+        speeds (float or array like, optional): pump speed at each sample (%).
+        Defaults to 100.
+        level (float or array like, optional): wet well level at each sample (m).
+        Defaults to 0.0.
+        temperature (float or array like, optional): water temperature at each
+        sample (degC). Defaults to 20.0.
+        suction_losses (float or array like, optional): suction losses at each
+        sample (m). Defaults to 0.0.
+        pump_elevation (float, optional): elevation of the pump impeller eye (m), in
+        the same datum as level. Defaults to 0.0.
+        atmospheric_pressure (float, optional): atmospheric pressure (kPa).
+        Defaults to 101.325.
+        density (float, optional): fluid density (kg/m3). Defaults to 1000.
+        min_margin (float, optional): smallest acceptable NPSHa - NPSHr (m).
+        Defaults to 0.0.
+        min_ratio (float, optional): smallest acceptable NPSHa / NPSHr, e.g. 1.1 or
+        higher per Hydraulic Institute guidance. Defaults to 1.0.
+
+    Raises:
+        AttributeError: Raises error if no NPSHr data has been assigned to the pump
+
+    Returns:
+        dict: dictionary of arrays with one element per sample. Structure:
+        {"NPSHa": [], "NPSHr": [], "Margin": [], "Ratio": [], "Violation": [],
+        "Outside Data": []}. Violation is True where the margin or ratio is below its
+        minimum. Outside Data is True where the equivalent 100% speed flow is outside
+        the NPSHr data, NPSHr, Margin and Ratio are NaN and Violation is False there.
+    """
+    flows = np.asarray(flows, dtype=float)
+    flow_multiplier, head_multiplier = pump.affinity_ratio(
+        np.asarray(speeds, dtype=float)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reduced_flow = flows / flow_multiplier
+    outside = ~(
+        (reduced_flow >= np.min(pump.npshr_flow))
+        & (reduced_flow <= np.max(pump.npshr_flow))
+    )
+    npshr = np.where(
+        outside,
+        np.nan,
+        head_multiplier * pump.fit_curve("npshr_flow", "npshr")(reduced_flow),
+    )
+    npsha = npsh_available(
+        level,
+        temperature=temperature,
+        suction_losses=suction_losses,
+        pump_elevation=pump_elevation,
+        atmospheric_pressure=atmospheric_pressure,
+        density=density,
+    )
+    margin = npsha - npshr
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = npsha / npshr
+    violation = (margin < min_margin) | (ratio < min_ratio)
+    return {
+        "NPSHa": np.broadcast_to(npsha, margin.shape),
+        "NPSHr": npshr,
+        "Margin": margin,
+        "Ratio": ratio,
+        "Violation": violation,
+        "Outside Data": np.broadcast_to(outside, margin.shape),
+    }
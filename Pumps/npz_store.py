@@ -0,0 +1,69 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+def pack_series(records, series):
+    """concatenates one data series from many records into a single flat array
+    along with the offsets of each record's values
+
+    Args:
+        records (list): list of dicts (or other mappings) of data series
+        series (str): key of the data series to pack
+
+    Returns:
+        tuple: flat float array of every record's values, and an int64 array with
+        one more element than records where record i's values are
+        values[offsets[i]:offsets[i + 1]]
+    """
+    lengths = [len(record[series]) for record in records]
+    offsets = np.zeros(len(records) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if records:
+        values = np.concatenate([record[series] for record in records])
+    else:
+        values = np.empty(0)
+    return values.astype(float), offsets
+
+
+def write_npz(filepath, arrays, schema_version):
+    """writes arrays to an uncompressed .npz file along with a schema version. The
+    file is written to a temporary file first and moved into place, so an
+    interrupted write never leaves a half written file.
+
+    Args:
+        filepath (str or Path): location of the .npz file
+        arrays (dict): dictionary of arrays to save, {name: array}
+        schema_version (int): version of the file layout, checked by read_npz
+    """
+    filepath = Path(filepath)
+    temp_path = filepath.with_name(filepath.name + ".tmp")
+    with open(temp_path, "wb") as fp:
+        np.savez(fp, schema_version=np.array(schema_version), **arrays)
+    os.replace(temp_path, filepath)
+
+
+def read_npz(filepath, schema_version, description="File"):
+    """reads every array of an .npz file written by write_npz into a dict
+
+    Args:
+        filepath (str or Path): location of the .npz file
+        schema_version (int): expected version of the file layout
+        description (str, optional): name of the kind of file used in the error
+        message. Defaults to "File".
+
+    Raises:
+        ValueError: Raises error if the file has a different schema version
+
+    Returns:
+        dict: dictionary of arrays, {name: array}
+    """
+    with np.load(filepath, allow_pickle=False) as store:
+        arrays = {key: store[key] for key in store.files}
+    if int(arrays["schema_version"]) != schema_version:
+        raise ValueError(
+            f"{description} {filepath} has schema version {arrays['schema_version']}, "
+            f"expected {schema_version}"
+        )
+    return arrays
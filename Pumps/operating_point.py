@@ -0,0 +1,263 @@
+import numpy as np
+
+from instrumentation import instrument
+
+
+def bisect_roots(func, lower, upper, xtol=1e-9, max_iterations=100):
+    """vectorised bisection root finder. Solves func(x) = 0 independently for every
+    element of the lower and upper bound arrays in a single set of array operations.
+    Elements where func does not change sign between the bounds have no root and are
+    returned as NaN.
+
+    Args:
+        func (callable): function taking an array of x values and returning an array of
+        the same shape.
+        lower (array): lower bound of the search interval for each element
+        upper (array): upper bound of the search interval for each element
+        xtol (float, optional): absolute tolerance on the root. Defaults to 1e-9.
+        max_iterations (int, optional): maximum number of bisections. Defaults to 100.
+
+    Returns:
+        array: root for each element, NaN where no root is bracketed
+    """
+    lower, upper = np.broadcast_arrays(
+        np.asarray(lower, dtype=float), np.asarray(upper, dtype=float)
+    )
+    lower, upper = lower.copy(), upper.copy()
+    f_lower = func(lower)
+    f_upper = func(upper)
+    bracketed = np.signbit(f_lower) != np.signbit(f_upper)
+    bracketed |= (f_lower == 0) | (f_upper == 0)
+    for _ in range(max_iterations):
+        if not np.any(np.abs(upper - lower) > xtol):
+            break
+        mid = 0.5 * (lower + upper)
+        f_mid = func(mid)
+        move_lower = np.signbit(f_mid) == np.signbit(f_lower)
+        lower = np.where(move_lower, mid, lower)
+        f_lower = np.where(move_lower, f_mid, f_lower)
+        upper = np.where(move_lower, upper, mid)
+    return np.where(bracketed, 0.5 * (lower + upper), np.nan)
+
+
+def bisect_all_roots(func, lower, upper, n_intervals=16, xtol=1e-9, max_iterations=100):
+    """vectorised root finder for functions with several roots between the bounds,
+    e.g. a drooping pump curve crossing a flat system curve twice. func is sampled at
+    the ends of n_intervals equal intervals between the bounds and every sign change
+    is bisected with bisect_roots. Roots closer together than one sampling interval,
+    or where func only touches zero, may be missed.
+
+    Args:
+        func (callable): function taking an array of x values and returning an array of
+        the same shape.
+        lower (array): lower bound of the search interval for each element
+        upper (array): upper bound of the search interval for each element
+        n_intervals (int, optional): number of sampling intervals. Defaults to 16.
+        xtol (float, optional): absolute tolerance on the roots. Defaults to 1e-9.
+        max_iterations (int, optional): maximum number of bisections. Defaults to 100.
+
+    Returns:
+        array: array with the shape of the bounds plus a last axis of roots, sorted
+        highest first and padded with NaN, so [..., 0] is the highest root. The last
+        axis has at least one element, which is NaN where there are no roots.
+    """
+    lower, upper = np.broadcast_arrays(
+        np.asarray(lower, dtype=float), np.asarray(upper, dtype=float)
+    )
+    width = (upper - lower) / n_intervals
+    negative = np.stack(
+        [np.signbit(func(lower + i * width)) for i in range(n_intervals + 1)], axis=-1
+    )
+    brackets = negative[..., 1:] != negative[..., :-1]
+    # rank brackets from the highest x down
+    rank = np.cumsum(brackets[..., ::-1], axis=-1)[..., ::-1] - 1
+    n_roots = max(int(np.max(rank[..., 0], initial=0)) + 1, 1)
+    roots = []
+    for k in range(n_roots):
+        in_bracket = brackets & (rank == k)
+        start = np.where(
+            np.any(in_bracket, axis=-1),
+            lower + np.argmax(in_bracket, axis=-1) * width,
+            np.nan,
+        )
+        roots.append(
+            bisect_roots(
+                func,
+                start,
+                start + width,
+                xtol=xtol,
+                max_iterations=max_iterations,
+            )
+        )
+    return np.stack(roots, axis=-1)
+
+
+@instrument
+def solve_duty_point(pump, system, speeds=100):
+    """finds the duty point(s) where the fitted pump curve crosses the fitted system
+    curve. The pump curve is scaled to each speed using the affinity laws and all
+    speeds are solved together. Only intersections within the flow range of the
+    provided pump curve data are returned, speeds where the curves do not cross within
+    this range return NaN. A drooping pump curve can cross the system curve more
+    than once, the duty point is the highest flow crossing, which is the stable one,
+    and every crossing is returned in All Flows.
+
+    Args:
+        pump (Pump): pump object with a pump curve defined at 100% speed
+        system (SystemCurve): system curve to intersect with the pump curve
+        speeds (int, float or array like, optional): pump speed(s) (%) to solve the
+        duty point for. Defaults to 100.
+
+    Returns:
+        dict: dictionary of arrays with one element per speed. Structure:
+        {"Speed": [], "Flow": [], "Head": [], "Efficiency": [], "In POR": [],
+        "All Flows": [[]]}. All Flows has one row per speed of every crossing flow,
+        highest first and padded with NaN. Efficiency is NaN and In POR is False if
+        no efficiency has been assigned to the pump.
+    """
+    speeds = pump._speed_array(speeds)
+    flow_multiplier, head_multiplier = pump.affinity_ratio(speeds)
+    pump_poly = pump.fit_curve("flow", "head")
+    system_poly = system.fit_curve("flow", "head")
+
+    def head_difference(flow):
+        return head_multiplier * pump_poly(flow / flow_multiplier) - system_poly(flow)
+
+    all_flows = bisect_all_roots(
+        head_difference,
+        lower=flow_multiplier * np.min(pump.flow),
+        upper=flow_multiplier * np.max(pump.flow),
+    )
+    duty_flow = all_flows[:, 0]
+    duty_head = system_poly(duty_flow)
+
+    if hasattr(pump, "efficiency"):
+        efficiency_poly = pump.fit_curve("efficiency_flow", "efficiency")
+        # efficiency is unchanged along an affinity parabola, so the efficiency at
+        # reduced speed is the 100% efficiency at the equivalent 100% speed flow
+        duty_efficiency = efficiency_poly(duty_flow / flow_multiplier)
+        POR_array = pump.generate_POR_arrays(speeds)
+        in_POR = (duty_flow >= POR_array[:, 2]) & (duty_flow <= POR_array[:, 0])
+    else:
+        duty_efficiency = np.full_like(duty_flow, np.nan)
+        in_POR = np.zeros_like(duty_flow, dtype=bool)
+
+    return {
+        "Speed": speeds,
+        "Flow": duty_flow,
+        "Head": duty_head,
+        "Efficiency": duty_efficiency,
+        "In POR": in_POR,
+        "All Flows": all_flows,
+    }
+
+
+def shaft_power(flow, head, efficiency, density=1000):
+    """calculates the pump shaft (absorbed) power.
+
+    Args:
+        flow (float or array): flow (L/s)
+        head (float or array): head (m)
+        efficiency (float or array): pump efficiency (%)
+        density (float, optional): fluid density (kg/m3). Defaults to 1000.
+
+    Returns:
+        float or array: shaft power (kW)
+    """
+    hydraulic_power = density * 9.81 * (np.asarray(flow) / 1000) * head / 1000
+    return hydraulic_power / (np.asarray(efficiency) / 100)
+
+
+@instrument
+def solve_speed(
+    pump,
+    system,
+    demand_flows,
+    min_speed=0,
+    max_speed=100,
+    tol=1e-6,
+    max_iterations=50,
+    density=1000,
+):
+    """finds the pump speed required to deliver each of the demand flows against the
+    system curve. The affinity scaled pump head (speed ratio r) at a demand flow Q is
+    r**2 * H(Q/r), which is solved for r with a vectorised Newton iteration over the
+    whole demand array. Demand flows that cannot be met within the speed limits, or
+    that fall outside the flow range of the pump curve data, return NaN.
+
+    Args:
+        pump (Pump): pump object with a pump curve defined at 100% speed
+        system (SystemCurve): system curve the pump operates against
+        demand_flows (array like): demand flows (L/s)
+        min_speed (float, optional): minimum allowable speed (%). Defaults to 0.
+        max_speed (float, optional): maximum allowable speed (%). Defaults to 100.
+        tol (float, optional): head tolerance (m) for convergence. Defaults to 1e-6.
+        max_iterations (int, optional): maximum Newton iterations. Defaults to 50.
+        density (float, optional): fluid density (kg/m3). Defaults to 1000.
+
+    Returns:
+        dict: dictionary of arrays with one element per demand flow. Structure:
+        {"Flow": [], "Speed": [], "Head": [], "Efficiency": [], "Power": []}
+        Speed is in %, Power is the shaft power in kW. Efficiency and Power are NaN if
+        no efficiency has been assigned to the pump.
+    """
+    flow = np.asarray(demand_flows, dtype=float)
+    pump_poly = pump.fit_curve("flow", "head")
+    pump_poly_deriv = pump_poly.deriv()
+    required_head = system.fit_curve("flow", "head")(flow)
+
+    ratio_min = max(min_speed / 100, 1e-3)  # avoids dividing by a zero speed
+    ratio_max = max_speed / 100
+    ratio = np.full_like(flow, ratio_max)
+    # only samples still converging are iterated, samples that have converged, are
+    # pinned at a speed limit or can't be evaluated are dropped from the active set
+    ratio_flat, flow_flat, head_flat = (
+        ratio.ravel(),
+        flow.ravel(),
+        required_head.ravel(),
+    )
+    active = np.arange(ratio_flat.size)
+    for _ in range(max_iterations):
+        if not len(active):
+            break
+        active_ratio, active_flow = ratio_flat[active], flow_flat[active]
+        reduced_flow = active_flow / active_ratio
+        pump_head = pump_poly(reduced_flow)
+        residual = active_ratio**2 * pump_head - head_flat[active]
+        converged = np.abs(residual) < tol
+        slope = 2 * active_ratio * pump_head - active_flow * pump_poly_deriv(
+            reduced_flow
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = np.where(slope != 0, residual / slope, 0)
+        new_ratio = np.clip(active_ratio - step, ratio_min, ratio_max)
+        moving = ~converged & np.isfinite(new_ratio) & (new_ratio != active_ratio)
+        ratio_flat[active[moving]] = new_ratio[moving]
+        active = active[moving]
+    ratio = ratio_flat.reshape(flow.shape)
+
+    reduced_flow = flow / ratio
+    residual = ratio**2 * pump_poly(reduced_flow) - required_head
+    valid = (
+        (np.abs(residual) < tol)
+        & (reduced_flow >= np.min(pump.flow))
+        & (reduced_flow <= np.max(pump.flow))
+    )
+    speed = np.where(valid, ratio * 100, np.nan)
+    head = np.where(valid, required_head, np.nan)
+
+    if hasattr(pump, "efficiency"):
+        efficiency_poly = pump.fit_curve("efficiency_flow", "efficiency")
+        efficiency = np.where(valid, efficiency_poly(reduced_flow), np.nan)
+        power = shaft_power(flow, head, efficiency, density=density)
+    else:
+        efficiency = np.full_like(flow, np.nan)
+        power = np.full_like(flow, np.nan)
+
+    return {
+        "Flow": flow,
+        "Speed": speed,
+        "Head": head,
+        "Efficiency": efficiency,
+        "Power": power,
+    }
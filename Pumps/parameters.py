@@ -1,25 +1,46 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
 from datetime import datetime
 
+from batch import batch_BEP
+from curve import Curve
+from hydraulics import system_head_grid
+from instrumentation import instrument
+from models import PolynomialModel
+
 # TODO - fix legend
 # TODO - Combine system curve and pump curve plot. https://stackoverflow.com/questions/36204644/what-is-the-best-way-of-combining-two-independent-plots-with-matplotlib
 # TODO - Add capability to provide custom AOR and POR points
-# TODO - Add auto duty point based on system and pump curves
 
 
 class Pump:
 
+    __slots__ = (
+        "make",
+        "model",
+        "impeller",
+        "motor",
+        "_pump_curve",
+        "_efficiency_curve",
+        "_npshr_curve",
+        "_curve_model",
+        "_fit_cache",
+        "_fit_cache_hits",
+        "_fit_cache_misses",
+        "fig",
+        "ax1",
+        "ax2",
+    )
     default_speeds = [90, 80, 70, 60, 50]
-    flow = None
-    head = None
+    curve_dtype = np.float64  # can be set to np.float32 to halve curve memory
+    default_curve_model = PolynomialModel(deg=3)
 
     def __init__(self, make, model, impeller=None, motor=None):
         self.make = make
         self.model = model
         self.impeller = impeller
         self.motor = motor
+        self._reset_curves()
 
     def __repr__(self):
         return f"{self.make}, {self.model}"
@@ -39,8 +60,8 @@ class Pump:
             flow (list): list of flows
             head (list): list of head achieved at corresponding flows
         """
-        self.flow = flow
-        self.head = head
+        self._pump_curve = Curve(flow, head, dtype=self.curve_dtype)
+        self._invalidate_fits("flow", "head")
 
     def define_efficiency(self, efficiency: list, efficiency_flow: list = None):
         """Add an efficiency to the pump. By default this assume the efficiency values
@@ -50,11 +71,17 @@ class Pump:
         Args:
             efficiency (list): pump efficiency list
             efficiency_flow (list, optional): Flow corresponding to efficiency values. Defaults to None.
+
+        Raises:
+            ValueError: Raises error if efficiency_flow isn't provided and no pump
+            curve has been defined
         """
-        self.efficiency = efficiency
-        self.efficiency_flow = self.flow
-        if efficiency_flow is not None:
-            self.efficiency_flow = efficiency_flow
+        if efficiency_flow is None:
+            efficiency_flow = self._default_flow("efficiency_flow")
+        self._efficiency_curve = Curve(
+            efficiency_flow, efficiency, dtype=self.curve_dtype
+        )
+        self._invalidate_fits("efficiency", "efficiency_flow")
 
     def define_npshr(self, npshr: list, npshr_flow: list = None):
         """Add a net positive suction head required (npshr) to the pump.
@@ -66,24 +93,204 @@ class Pump:
             npshr (list): npshr values
             npshr_flow (list, optional): flow corresponding to npshr. If none, this
             defaults to the flow provided in the flow/head curve. Defaults to None.
+
+        Raises:
+            ValueError: Raises error if npshr_flow isn't provided and no pump curve
+            has been defined
+        """
+        if npshr_flow is None:
+            npshr_flow = self._default_flow("npshr_flow")
+        self._npshr_curve = Curve(npshr_flow, npshr, dtype=self.curve_dtype)
+        self._invalidate_fits("npshr", "npshr_flow")
+
+    def _default_flow(self, argument):
+        """returns the pump curve flows used when no flows are given for another data
+        series, raising a ValueError if the pump curve hasn't been defined yet"""
+        if self._pump_curve is None:
+            raise ValueError(
+                "Error: define the pump curve with define_pumpcurve first, or "
+                f"provide {argument}"
+            )
+        return self.flow
+
+    @property
+    def flow(self):
+        """array: pump curve flows, None if no pump curve has been defined"""
+        if self._pump_curve is None:
+            return None
+        return self._pump_curve.x
+
+    @property
+    def head(self):
+        """array: pump curve heads, None if no pump curve has been defined"""
+        if self._pump_curve is None:
+            return None
+        return self._pump_curve.y
+
+    @property
+    def efficiency(self):
+        """array: pump efficiency values. Raises AttributeError if not defined"""
+        return self._defined_curve("_efficiency_curve", "efficiency").y
+
+    @property
+    def efficiency_flow(self):
+        """array: flows corresponding to the efficiency values"""
+        return self._defined_curve("_efficiency_curve", "efficiency").x
+
+    @property
+    def npshr(self):
+        """array: pump npshr values. Raises AttributeError if not defined"""
+        return self._defined_curve("_npshr_curve", "npshr").y
+
+    @property
+    def npshr_flow(self):
+        """array: flows corresponding to the npshr values"""
+        return self._defined_curve("_npshr_curve", "npshr").x
+
+    def _defined_curve(self, slot, name):
+        """returns the curve held in the given slot, raising an AttributeError if it has
+        not been defined so hasattr checks behave as if the attribute is missing"""
+        curve = getattr(self, slot)
+        if curve is None:
+            raise AttributeError(f"{name} has not been defined for {self!r}")
+        return curve
+
+    def _reset_curves(self):
+        """clears all curve data and the fitted curve cache"""
+        self._pump_curve = None
+        self._efficiency_curve = None
+        self._npshr_curve = None
+        self._curve_model = None
+        self._reset_fit_cache()
+
+    def _reset_fit_cache(self):
+        """empties the fitted curve cache and resets the hit/miss counters"""
+        self._fit_cache = {}
+        self._fit_cache_hits = 0
+        self._fit_cache_misses = 0
+
+    def _invalidate_fits(self, *series):
+        """drops any cached fits that were generated from the given data series.
+
+        Args:
+            *series (str): attribute names of the data series that have changed
         """
-        self.npshr = npshr
-        self.npshr_flow = self.flow
-        if npshr_flow is not None:
-            self.npshr_flow = npshr_flow
+        for key in list(self._fit_cache):
+            x, y, _ = key
+            if x in series or y in series:
+                del self._fit_cache[key]
+
+    @property
+    def curve_model(self):
+        """model used to fit the pump curves, see set_curve_model"""
+        if self._curve_model is None:
+            return self.default_curve_model
+        return self._curve_model
+
+    def set_curve_model(self, model):
+        """sets the model used to fit curves in BEP, POR, plotting and the duty point
+        solvers. Fits from each model are cached separately.
+
+        Args:
+            model (PolynomialModel, PchipModel or LinearModel): curve model from the
+            models module. If None, the default degree 3 polynomial is used.
+        """
+        self._curve_model = model
+        return self
+
+    def fit_curve(self, x: str = "flow", y: str = "head", deg=None):
+        """returns a cached curve fitted to two of the pump data series.
+        The fit is only generated the first time a given x, y and model combination
+        is requested, subsequent calls return the cached curve. The cache is
+        invalidated by define_pumpcurve, define_efficiency and define_npshr.
+        Note that modifying the data lists in place will not invalidate the cache.
+
+        Args:
+            x (str, optional): attribute name of the x data. Defaults to "flow".
+            y (str, optional): attribute name of the y data. Defaults to "head".
+            deg (int, optional): If provided, a polynomial of this degree is fitted
+            instead of using the pump's curve model. Defaults to None.
+
+        Returns:
+            [poly1d or PiecewisePolynomial]: callable curve object, see models
+        """
+        model = self.curve_model if deg is None else PolynomialModel(deg)
+        key = (x, y, model.key)
+        try:
+            poly = self._fit_cache[key]
+        except KeyError:
+            self._fit_cache_misses += 1
+            poly = model.fit(getattr(self, x), getattr(self, y))
+            self._fit_cache[key] = poly
+            return poly
+        self._fit_cache_hits += 1
+        if isinstance(poly, np.ndarray):  # seeded coefficients, see seed_fit
+            poly = self._fit_cache[key] = np.poly1d(poly)
+        return poly
+
+    def seed_fit(self, coeffs, x: str = "flow", y: str = "head"):
+        """stores already fitted polynomial coefficients in the fit cache, e.g. from
+        a batch fit of a whole catalog, so fit_curve doesn't need to refit them.
+        The coefficients are only wrapped in a poly1d the first time fit_curve
+        returns them, so seeding many pumps is cheap.
+
+        Args:
+            coeffs (array): polynomial coefficients, highest power first. The degree
+            is taken from the number of coefficients.
+            x (str, optional): attribute name of the x data. Defaults to "flow".
+            y (str, optional): attribute name of the y data. Defaults to "head".
+        """
+        self._fit_cache[(x, y, len(coeffs) - 1)] = np.asarray(coeffs, dtype=float)
+
+    def fit_cache_info(self):
+        """returns the number of cached fits along with the cache hit and miss counts
 
-    def BEP(self):
+        Returns:
+            dict: dictionary with structure {"Hits": int, "Misses": int, "Size": int}
+        """
+        return {
+            "Hits": self._fit_cache_hits,
+            "Misses": self._fit_cache_misses,
+            "Size": len(self._fit_cache),
+        }
+
+    @instrument
+    def BEP(self, continuous=False):
         """return the best efficiency point for a given pump.
         will return the best efficiency (%), followed by the corresponding flow and head
 
+        Args:
+            continuous (bool, optional): If True, the BEP is the maximum of the fitted
+            efficiency curve within the efficiency flow range, rather than the highest
+            tabulated efficiency point. Defaults to False.
+
         Returns:
             tuple: BEP of the pump in (efficiency, flow, head)
         """
         try:
-            _max_efficiency_index = self.efficiency.index(max(self.efficiency))
-            poly = self.generate_curve_equation(
-                self.efficiency_flow, self.head, deg=3
-            )  # generating flow/head curve polynomial
+            if continuous:
+                efficiency_fit = self.fit_curve("efficiency_flow", "efficiency")
+                lower_flow = np.min(self.efficiency_flow)
+                upper_flow = np.max(self.efficiency_flow)
+                if isinstance(efficiency_fit, np.poly1d):
+                    BEP_dict = batch_BEP(
+                        efficiency_coeffs=efficiency_fit.coeffs[np.newaxis],
+                        flow_min=[lower_flow],
+                        flow_max=[upper_flow],
+                    )
+                    BEP_flow = BEP_dict["Flow"][0]
+                    best_efficiency = BEP_dict["Efficiency"][0]
+                else:
+                    BEP_flow, best_efficiency = efficiency_fit.maximum(
+                        lower_flow, upper_flow
+                    )
+                return (
+                    best_efficiency,
+                    BEP_flow,
+                    self.fit_curve("flow", "head")(BEP_flow),
+                )
+            _max_efficiency_index = np.argmax(self.efficiency)
+            poly = self.fit_curve("flow", "head")  # generating flow/head curve
             _max_efficiency_head = poly(self.efficiency_flow[_max_efficiency_index])
 
             best_efficiency_point = (
@@ -104,14 +311,30 @@ class Pump:
             new_speed (int): New pump speed to create flow/head values for
 
         Returns:
-            (tuple): Tuple of two lists, containing reduced flow and reduced head values
+            (tuple): Tuple of two arrays, containing reduced flow and reduced head values
         """
-        flow_multplier, head_multipler = self.affinity_ratio(
-            new_speed
-        )  # assumes original pump curve is at 100% speed
-        reduced_flow = [flow * flow_multplier for flow in self.flow]
-        reduced_head = [head * head_multipler for head in self.head]
+        flows, heads = self.generate_affinity_arrays(new_speed)
+        return flows[0], heads[0]
 
+    @instrument
+    def generate_affinity_arrays(self, speeds):
+        """Uses pump affinity laws to create flow/head curves for an array of speeds in a
+        single broadcast operation. This function expects the self.flow values to
+        correspond to the pump at 100%.
+
+        Args:
+            speeds (array like): speeds to create flow/head values for. A single speed
+            can be passed as an int or float.
+
+        Returns:
+            (tuple): Tuple of two arrays with shape (n_speeds, n_points), containing
+            the reduced flow and reduced head values. Row i corresponds to speeds[i].
+        """
+        flow_multiplier, head_multiplier = self.affinity_ratio(
+            self._speed_array(speeds)[:, np.newaxis]
+        )  # assumes original pump curve is at 100% speed
+        reduced_flow = flow_multiplier * self.flow
+        reduced_head = head_multiplier * self.head
         return reduced_flow, reduced_head
 
     def generate_speed_curves(self, speeds: list = None):
@@ -132,27 +355,27 @@ class Pump:
         _speeds = self.default_speeds  # typical % speeds
         if speeds is not None:
             _speeds = speeds
-        speed_curve_dict = {}  # empty dict to hold our speed data.
-        for speed in _speeds:
-            flow, head = self.generate_affinity(new_speed=speed)
-            _temp_dict = {speed: (flow, head)}
-            speed_curve_dict.update(_temp_dict)
-        return speed_curve_dict
-
-    def POR(self):
+        flows, heads = self.generate_affinity_arrays(_speeds)
+        return {speed: (flows[i], heads[i]) for i, speed in enumerate(_speeds)}
+
+    @instrument
+    def POR(self, continuous=False):
         """creates upper and lower preferred operating points for a given pump speed.
         This assume HI guidance (lower = 70% BEP flow, upper = 120% BEP flow)
 
+        Args:
+            continuous (bool, optional): If True, the POR is based on the continuous
+            BEP, see BEP. Defaults to False.
+
         Returns:
             tuple: coordinates of upper and lower POR.
             POR_upper_flow, POR_upper_head, POR_lower_flow, POR_lower_head
 
         """
-        poly = self.generate_curve_equation(
-            self.flow, self.head, deg=3
-        )  # generating flow/head curve polynomial
+        poly = self.fit_curve("flow", "head")  # generating flow/head curve
 
-        _, BEP_flow, BEP_head = self.BEP()  # disregard the best efficiency (%)
+        # disregard the best efficiency (%)
+        _, BEP_flow, BEP_head = self.BEP(continuous=continuous)
         POR_lower_flow = (
             0.7 * BEP_flow
         )  # POR lower range is 70% of the BEP (Hydraulic Institute)
@@ -171,6 +394,7 @@ class Pump:
         return POR_dict
 
     @staticmethod
+    @instrument
     def generate_curve_equation(x: list, y: list, deg=3):
         """returns a 1d poly object for a given x and y
 
@@ -200,15 +424,27 @@ class Pump:
             isinstance(speeds, float)
         ):  # allows single speed plotting
             speeds = [speeds]
-        BEP_speeds_dict = {}
+        BEP_flows, BEP_heads = self.generate_BEP_arrays(speeds)
+        return {speed: (BEP_flows[i], BEP_heads[i]) for i, speed in enumerate(speeds)}
+
+    @instrument
+    def generate_BEP_arrays(self, speeds):
+        """generates BEP flow and head arrays for an array of speeds in a single
+        broadcast operation.
+
+        Args:
+            speeds (array like): speeds to create BEPs for. A single speed can be
+            passed as an int or float.
+
+        Returns:
+            (tuple): Tuple of two arrays with shape (n_speeds,), containing the BEP
+            flow and BEP head at each speed.
+        """
         _, BEP_flow, BEP_head = self.BEP()
-        for speed in speeds:
-            flow_multiplier, head_multiplier = self.affinity_ratio(speed)
-            BEP_flow_speed = BEP_flow * flow_multiplier
-            BEP_head_speed = BEP_head * head_multiplier
-            _temp_dict = {speed: (BEP_flow_speed, BEP_head_speed)}
-            BEP_speeds_dict.update(_temp_dict)
-        return BEP_speeds_dict
+        flow_multiplier, head_multiplier = self.affinity_ratio(
+            self._speed_array(speeds)
+        )
+        return BEP_flow * flow_multiplier, BEP_head * head_multiplier
 
     def generate_speeds_POR(self, speeds: list):
         """generate PORs for various speeds. If a single speed is preferred this can be passed as an int which is automatically
@@ -226,33 +462,60 @@ class Pump:
             isinstance(speeds, float)
         ):  # allows single speed plotting
             speeds = [speeds]
-        POR_speeds_dict = {}
+        POR_array = self.generate_POR_arrays(speeds)
+        return {speed: tuple(POR_array[i]) for i, speed in enumerate(speeds)}
+
+    @instrument
+    def generate_POR_arrays(self, speeds):
+        """generates POR points for an array of speeds in a single broadcast operation.
+
+        Args:
+            speeds (array like): speeds to create POR points for. A single speed can
+            be passed as an int or float.
+
+        Returns:
+            array: array with shape (n_speeds, 4). Columns are
+            (POR Flow - Upper, POR head - Upper, POR Flow - Lower, POR head - Lower)
+        """
         POR_dict = self.POR()
-        for speed in speeds:
-            flow_multiplier, head_multiplier = self.affinity_ratio(speed)
-            POR_flow_speed_upper = POR_dict["Upper Flow"] * flow_multiplier
-            POR_head_speed_upper = POR_dict["Upper Head"] * head_multiplier
-            POR_flow_speed_lower = POR_dict["Lower Flow"] * flow_multiplier
-            POR_head_speed_lower = POR_dict["Lower Head"] * head_multiplier
-            _temp_dict = {
-                speed: (
-                    POR_flow_speed_upper,
-                    POR_head_speed_upper,
-                    POR_flow_speed_lower,
-                    POR_head_speed_lower,
-                )
-            }
-            POR_speeds_dict.update(_temp_dict)
-        return POR_speeds_dict
+        POR_100 = np.array(
+            [
+                POR_dict["Upper Flow"],
+                POR_dict["Upper Head"],
+                POR_dict["Lower Flow"],
+                POR_dict["Lower Head"],
+            ]
+        )
+        flow_multiplier, head_multiplier = self.affinity_ratio(
+            self._speed_array(speeds)
+        )
+        multipliers = np.stack(
+            [flow_multiplier, head_multiplier, flow_multiplier, head_multiplier],
+            axis=-1,
+        )
+        return multipliers * POR_100
+
+    @staticmethod
+    def _speed_array(speeds):
+        """converts a single speed or list of speeds into a 1d float array
+
+        Args:
+            speeds (int, float or array like): speed(s) in %
+
+        Returns:
+            array: 1d array of speeds
+        """
+        return np.atleast_1d(np.asarray(speeds, dtype=float))
 
     def affinity_ratio(self, speed: int):
         """Uses affinity laws to create flow and head multipliers for a given speed.
 
         Args:
-            speed (int): new speed the ratio is to be calculated for
+            speed (int or array): new speed(s) the ratio is to be calculated for
 
         Returns:
-            flow_multiplier, head_multiplier (int, int): multipliers for flow and head
+            flow_multiplier, head_multiplier (float, float): multipliers for flow and head.
+            If an array of speeds is passed, arrays of multipliers are returned.
         """
         flow_multiplier = speed / 100
         head_multiplier = (speed / 100) ** 2
@@ -271,6 +534,7 @@ class Pump:
 
     #####-----------Plotting Functions------------######
 
+    @instrument
     def generate_plot(self, BEP=False, POR=False):
         """Plots the 100% speed pump curve, with optional best efficiency and preferred
         operating point markers
@@ -282,6 +546,8 @@ class Pump:
         Returns:
             matplotlib ax object: plot of the 100% pump curve
         """
+        import matplotlib.pyplot as plt
+
         self.fig, self.ax1 = plt.subplots()
         self.ax1.plot(self.flow, self.head, label="100%")
         self.ax1.set_xlabel("Flow (L/s)")
@@ -304,6 +570,7 @@ class Pump:
             )
         return self
 
+    @instrument
     def add_npshr(self):
         """adds an npshr plot to the plot object.
         This method requires the generate_plot method is called first.
@@ -333,6 +600,7 @@ class Pump:
             )
             return self
 
+    @instrument
     def add_efficiency(self):
         """Plots pump efficiency on a secondary y axis
 
@@ -350,8 +618,9 @@ class Pump:
         self.ax2.set_ylabel("Efficiency (%)")
         return self
 
+    @instrument
     def plot_speeds(self, speeds=None, BEP=False, POR=False):
-        """plots various speed curves.
+        """plots various speed curves, drawn together as a single LineCollection.
         If no speeds are passed the method plots "typical" speeds (90,80,70,60,50)%.
 
         Args:
@@ -373,38 +642,36 @@ class Pump:
             "_fill": True if POR == "fill" else False,
         }
 
+        from matplotlib.collections import LineCollection
+
         if speeds is None:
-            speed_dict = self.generate_speed_curves()
-        else:
-            speed_dict = self.generate_speed_curves(speeds)
-        for key, value in speed_dict.items():
-            self.ax1.plot(
-                value[0], value[1], label=str(key) + "%", alpha=0.2, color="tab:blue"
+            speeds = self.default_speeds
+        speeds = self._speed_array(speeds)
+        # every speed curve is drawn as one LineCollection rather than a line each
+        flows, heads = self.generate_affinity_arrays(speeds)
+        self.ax1.add_collection(
+            LineCollection(
+                np.stack([flows, heads], axis=-1),
+                label=self._speeds_label(speeds),
+                alpha=0.2,
+                color="tab:blue",
             )
+        )
+        self.ax1.autoscale_view()
         if BEP:
-            if speeds is None:
-                BEP_dict = self.generate_speeds_BEP(speeds=self.default_speeds)
-            else:
-                BEP_dict = self.generate_speeds_BEP(speeds)
-            for key, value in BEP_dict.items():
-                self.ax1.plot(value[0], value[1], marker="o", color="orange")
+            BEP_flows, BEP_heads = self.generate_BEP_arrays(speeds)
+            self.ax1.plot(
+                BEP_flows, BEP_heads, marker="o", color="orange", linestyle="None"
+            )
         if POR:
-            if speeds is None:
-                POR_dict = self.generate_speeds_POR(speeds=self.default_speeds)
-            else:
-                POR_dict = self.generate_speeds_POR(speeds=speeds)
+            POR_dict = self.POR()
+            POR_array = self.generate_POR_arrays(speeds)
 
             # grabbing the 100% POR points. Reqd to make the line meet the 100% speed curve
-            upper_flows = [self.POR()["Upper Flow"]]
-            upper_heads = [self.POR()["Upper Head"]]
-            lower_flows = [self.POR()["Lower Flow"]]
-            lower_heads = [self.POR()["Lower Head"]]
-            # grabbing POR points for other speeds
-            for key, value in POR_dict.items():
-                upper_flows.append(value[0])
-                upper_heads.append(value[1])
-                lower_flows.append(value[2])
-                lower_heads.append(value[3])
+            upper_flows = np.append(POR_dict["Upper Flow"], POR_array[:, 0])
+            upper_heads = np.append(POR_dict["Upper Head"], POR_array[:, 1])
+            lower_flows = np.append(POR_dict["Lower Flow"], POR_array[:, 2])
+            lower_heads = np.append(POR_dict["Lower Head"], POR_array[:, 3])
 
             if POR == "fill":
                 self.ax1.fill(
@@ -417,13 +684,13 @@ class Pump:
                 # Filling gap between POR curve and 100% speed curve
                 # Getting the ranges of the POR flow and creating a linear array
                 POR_flows = np.linspace(
-                    self.POR()["Upper Flow"], self.POR()["Lower Flow"], 50
+                    POR_dict["Upper Flow"], POR_dict["Lower Flow"], 50
                 )
                 # Getting the ranges of the POR head and creating a linear array
                 POR_heads = np.linspace(
-                    self.POR()["Upper Head"], self.POR()["Lower Head"], 50
+                    POR_dict["Upper Head"], POR_dict["Lower Head"], 50
                 )
-                pump_curve_coeffs = self.generate_curve_equation(self.flow, self.head)
+                pump_curve_coeffs = self.fit_curve("flow", "head")
                 pump_flows = pump_curve_coeffs(POR_flows)
                 self.ax1.fill_between(
                     x=POR_flows,
@@ -451,6 +718,104 @@ class Pump:
             )
         return self
 
+    @staticmethod
+    def _speeds_label(speeds):
+        """legend label for a set of speed curves"""
+        if len(speeds) <= 5:
+            return ", ".join(f"{speed:g}%" for speed in speeds)
+        return f"{min(speeds):g}-{max(speeds):g}% ({len(speeds)} speeds)"
+
+    def interactive_speed(
+        self, speed=100, min_speed=30, max_speed=100, system=None, BEP=True, POR=True
+    ):
+        """plots the pump curve with a slider controlling the pump speed. The 100%
+        curve, system curve and axes are drawn once and cached, moving the slider
+        only redraws the speed curve, BEP and POR markers and duty point (blitting).
+        Display the figure with show_plot or plt.show.
+
+        Args:
+            speed (float, optional): initial speed (%). Defaults to 100.
+            min_speed (float, optional): lowest slider speed (%). Defaults to 30.
+            max_speed (float, optional): highest slider speed (%). Defaults to 100.
+            system (SystemCurve, optional): If provided, the system curve is plotted
+            and the duty point at the slider speed is marked. Defaults to None.
+            BEP (bool, optional): Mark the BEP at the slider speed. Defaults to True.
+            POR (bool, optional): Mark the POR at the slider speed. Defaults to True.
+
+        Returns:
+            matplotlib Slider: the speed slider, a reference must be kept for it to
+            stay responsive
+        """
+        from matplotlib.widgets import Slider
+        from operating_point import solve_duty_point
+
+        self.generate_plot()
+        self.fig.subplots_adjust(bottom=0.2)
+        if system is not None:
+            self.ax1.plot(system.flow, system.head, color="black", label="System Curve")
+        (speed_line,) = self.ax1.plot([], [], color="tab:blue", animated=True)
+        (BEP_marker,) = self.ax1.plot(
+            [], [], marker="o", color="orange", linestyle="None", animated=True
+        )
+        (POR_markers,) = self.ax1.plot(
+            [], [], marker="x", color="red", linestyle="None", animated=True
+        )
+        (duty_marker,) = self.ax1.plot(
+            [], [], marker="+", color="forestgreen", linestyle="None", animated=True
+        )
+        slider = Slider(
+            self.fig.add_axes([0.15, 0.05, 0.7, 0.03]),
+            "Speed (%)",
+            min_speed,
+            max_speed,
+            valinit=speed,
+        )
+        # the slider is redrawn by blitting with everything else
+        slider.drawon = False
+        animated = [speed_line, BEP_marker, POR_markers, duty_marker]
+        animated += [slider.poly, slider.valtext, getattr(slider, "_handle", None)]
+        animated = [artist for artist in animated if artist is not None]
+        for artist in animated:
+            artist.set_animated(True)
+        canvas = self.fig.canvas
+        background = None
+
+        def set_speed(value):
+            flows, heads = self.generate_affinity_arrays(value)
+            speed_line.set_data(flows[0], heads[0])
+            if BEP and hasattr(self, "efficiency"):
+                BEP_flows, BEP_heads = self.generate_BEP_arrays(value)
+                BEP_marker.set_data(BEP_flows, BEP_heads)
+            if POR and hasattr(self, "efficiency"):
+                POR_array = self.generate_POR_arrays(value)
+                POR_markers.set_data(POR_array[0, [0, 2]], POR_array[0, [1, 3]])
+            if system is not None:
+                duty_dict = solve_duty_point(self, system, value)
+                duty_marker.set_data(duty_dict["Flow"], duty_dict["Head"])
+
+        def draw_animated():
+            for artist in animated:
+                self.fig.draw_artist(artist)
+
+        def on_draw(event):
+            nonlocal background
+            background = canvas.copy_from_bbox(self.fig.bbox)
+            draw_animated()
+
+        def on_change(value):
+            set_speed(value)
+            if background is None:
+                return
+            canvas.restore_region(background)
+            draw_animated()
+            canvas.blit(self.fig.bbox)
+
+        set_speed(speed)
+        canvas.mpl_connect("draw_event", on_draw)
+        slider.on_changed(on_change)
+        return slider
+
+    @instrument
     def add_duty(self, duty_flow, duty_head, line=False):
         """add a marker or line for a given duty point.
 
@@ -498,32 +863,159 @@ class Pump:
             bbox_transform=self.fig.transFigure,
         )
 
-    def show_plot(self, grid=True, save=False, save_dir: str = None):
+    def _finalise_plot(self, grid=True):
+        """applies the layout, combined legend and optional grid to the figure"""
         self.fig.tight_layout()
         self.get_legends()
         if grid:
             self.ax1.grid(linestyle="dotted", alpha=0.35, color="grey")
-        plt.show()
 
-        now = datetime.now()
-        now = now.strftime("%d_%m_%Y__%H_%M_%S")
-        filename = Path(f"Output Plot_{now}.png")  # saving with date and time appended
+    @instrument
+    def show_plot(self, grid=True, save=False, save_dir: str = None, show=True):
+        """finalises the plot and displays it. If save is True the figure is saved
+        before it is displayed.
+
+        Args:
+            grid (bool, optional): Add gridlines. Defaults to True.
+            save (bool, optional): Save the figure as a png. Defaults to False.
+            save_dir (str, optional): directory to save the figure to. If None, the
+            current working directory is used. Defaults to None.
+            show (bool, optional): Display the figure with plt.show(). Defaults to True.
+        """
+        self._finalise_plot(grid=grid)
 
         if save:
+            now = datetime.now()
+            now = now.strftime("%d_%m_%Y__%H_%M_%S")
+            # saving with date and time appended
+            filename = Path(f"Output Plot_{now}.png")
             if save_dir is None:
                 save_dir = Path.cwd()
-            self.fig.savefig(fname=Path(save_dir / filename), format="png")
+            self.fig.savefig(fname=Path(save_dir) / filename, format="png")
             print(f"Image saved as {filename} at {save_dir}")
 
+        if show:
+            import matplotlib.pyplot as plt
+
+            plt.show()
+
+    @instrument
+    def save_plot(self, filepath, grid=True, close=True, finalise=True):
+        """finalises the plot and saves it without displaying it. The file format is
+        taken from the filepath suffix (e.g. .png, .svg, .pdf).
+
+        Args:
+            filepath (str): location to save the figure to
+            grid (bool, optional): Add gridlines. Defaults to True.
+            close (bool, optional): Close the figure after saving. Defaults to True.
+            finalise (bool, optional): Apply the layout, legend and grid before saving.
+            Should be False when saving an already finalised figure again, e.g. in a
+            second format. Defaults to True.
+
+        Returns:
+            Path: location of the saved figure
+        """
+        if finalise:
+            self._finalise_plot(grid=grid)
+        filepath = Path(filepath)
+        self.fig.savefig(fname=filepath)
+        if close:
+            self.close_plot()
+        return filepath
+
+    def close_plot(self):
+        """closes the figure and removes the figure and axes from the pump object so
+        they are not kept in memory."""
+        if hasattr(self, "fig"):
+            import matplotlib.pyplot as plt
+
+            plt.close(self.fig)
+            del self.fig
+        for ax in ("ax1", "ax2"):
+            if hasattr(self, ax):
+                delattr(self, ax)
+
 
 class SystemCurve(Pump):
+
+    __slots__ = ("name",)
+
     def __init__(self, name, flow, head):
         self.name = name
-        self.flow = flow
-        self.head = head
+        self._reset_curves()
+        self.define_pumpcurve(flow, head)
+
+    def __repr__(self):
+        return f"{self.name}"
+
+    @classmethod
+    def from_pipes(
+        cls,
+        name,
+        segments,
+        flow,
+        static_head=0.0,
+        roughness_factor=1.0,
+        method="darcy-weisbach",
+        viscosity=1.004e-6,
+    ):
+        """builds a system curve from the static head and the head loss through pipe
+        segments, see hydraulics.friction_head.
 
+        Args:
+            name (str): system curve name
+            segments (list): list of hydraulics.PipeSegment objects
+            flow (array like): flows (L/s) to evaluate the system curve at
+            static_head (float, optional): static head (m). Defaults to 0.0.
+            roughness_factor (float, optional): multiplier on the pipe roughness.
+            Defaults to 1.0.
+            method (str, optional): "darcy-weisbach" or "hazen-williams".
+            Defaults to "darcy-weisbach".
+            viscosity (float, optional): kinematic viscosity (m2/s).
+            Defaults to 1.004e-6.
+
+        Returns:
+            SystemCurve: system curve object
+        """
+        grid = system_head_grid(
+            segments,
+            flow,
+            static_heads=static_head,
+            roughness_factors=roughness_factor,
+            method=method,
+            viscosity=viscosity,
+        )
+        return cls(name, grid["Flow"], grid["Head"][0])
+
+    @classmethod
+    def from_head_grid(cls, grid, name="System"):
+        """creates one system curve per scenario of a system_head_grid, so each
+        scenario can be used in a duty point analysis.
+
+        Args:
+            grid (dict): scenario grid returned by hydraulics.system_head_grid
+            name (str, optional): name prefix of the system curves.
+            Defaults to "System".
+
+        Returns:
+            list: list of SystemCurve objects, one per row of grid["Head"]
+        """
+        return [
+            cls(
+                f"{name} (static {static_head:g} m, roughness x{roughness_factor:g})",
+                grid["Flow"],
+                head,
+            )
+            for static_head, roughness_factor, head in zip(
+                grid["Static Head"], grid["Roughness Factor"], grid["Head"]
+            )
+        ]
+
+    @instrument
     def plot(self, ax=None):
 
+        import matplotlib.pyplot as plt
+
         self.fig, self.ax1 = plt.subplots()
         self.ax1.plot(self.flow, self.head, label="System Curve")
         self.ax1.set_xlabel("Flow (L/s)")
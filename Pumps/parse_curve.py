@@ -1,9 +1,10 @@
-from re import L
-import pandas as pd
 from pathlib import Path
 import json
 
+from instrumentation import instrument
 
+
+@instrument
 def parse_xylect_curve(pump_curve_filepath: str):
     """Function parse the output of a xylect pump curve into a dictionary.
     This function expects the excel file to be in the standard Xylect output format.
@@ -18,6 +19,8 @@ def parse_xylect_curve(pump_curve_filepath: str):
     Returns:
         dictionary: a dictionary containing all the information from the xylect .xls
     """
+    import pandas as pd  # imported on first use, it is slow to import
+
     _pump_curve = pd.read_excel(pump_curve_filepath)
     _pump_info_dict = {
         "Pump": _pump_curve["Unnamed: 1"][0],
@@ -43,6 +46,7 @@ def parse_xylect_curve(pump_curve_filepath: str):
     return pump_dict
 
 
+@instrument
 def parse_excel_curve(
     filepath: str,
     flow: str,
@@ -75,6 +79,8 @@ def parse_excel_curve(
         efficiency: "Overall Efficiency [%]",
         efficiency_flow: "Overall Efficiency Flow [l/s",
     }
+    import pandas as pd
+
     _pump_curve = pd.read_excel(filepath)
     _pump_curve.dropna(axis=0, how="all", inplace=True)
     _pump_curve = _pump_curve.rename(columns=_pump_curve.iloc[0]).drop(
@@ -86,8 +92,11 @@ def parse_excel_curve(
     return _pump_curve_dict
 
 
+@instrument
 def parse_system_curve(filepath: str):
 
+    import pandas as pd
+
     _system_curve = pd.read_excel(filepath)
     _system_curve.dropna(axis=0, how="all", inplace=True)
     _system_curve.dropna(axis=1, how="all", inplace=True)
@@ -0,0 +1,326 @@
+"""Binary persistence of Pump and SystemCurve objects.
+
+Collections of pumps and system curves are saved to a single uncompressed .npz file
+holding the raw curve arrays, the polynomial fits and the derived BEP and POR
+of every pump, so they load without pandas and without refitting.
+
+    save_pumps("pumps.npz", pumps)
+    pumps = load_pumps("pumps.npz")
+    derived = load_derived("pumps.npz")
+"""
+
+import gc
+
+import numpy as np
+
+from curve import Curve
+from ingest import CURVE_SERIES
+from models import LinearModel, PchipModel, PolynomialModel
+from npz_store import pack_series, read_npz, write_npz
+from parameters import Pump, SystemCurve
+
+PERSISTENCE_SCHEMA_VERSION = 2
+DERIVED_FIELDS = (
+    "BEP Efficiency",
+    "BEP Flow",
+    "BEP Head",
+    "Upper Flow",
+    "Upper Head",
+    "Lower Flow",
+    "Lower Head",
+)
+FIT_SERIES = (
+    ("flow", "head"),
+    ("efficiency_flow", "efficiency"),
+    ("npshr_flow", "npshr"),
+)
+_PIECEWISE_MODELS = {"pchip": PchipModel, "linear": LinearModel}
+
+
+def _curve_arrays(pump):
+    """returns the curve data of a pump as a dict of arrays, empty where undefined"""
+    arrays = {}
+    for series in CURVE_SERIES:
+        try:
+            values = getattr(pump, series)
+        except AttributeError:
+            values = None
+        arrays[series] = np.empty(0) if values is None else values
+    return arrays
+
+
+def _fit_all(pump):
+    """fits every defined data series of a pump with its curve model, so the fits
+    are in the fit cache when it is saved"""
+    for x, y in FIT_SERIES:
+        try:
+            defined = getattr(pump, x) is not None
+        except AttributeError:
+            defined = False
+        if defined:
+            pump.fit_curve(x, y)
+
+
+def _poly_coeffs(fit):
+    """returns the coefficients of a cached polynomial fit, or None for piecewise
+    fits. Seeded fits are cached as coefficient arrays until first used."""
+    if isinstance(fit, np.poly1d):
+        return fit.coeffs
+    if isinstance(fit, np.ndarray):
+        return fit
+    return None
+
+
+def _derived(pump):
+    """returns the BEP and POR of a pump in DERIVED_FIELDS order, NaN if the pump has
+    no efficiency data"""
+    if not hasattr(pump, "efficiency"):
+        return [np.nan] * len(DERIVED_FIELDS)
+    POR_dict = pump.POR()
+    return list(pump.BEP()) + [
+        POR_dict["Upper Flow"],
+        POR_dict["Upper Head"],
+        POR_dict["Lower Flow"],
+        POR_dict["Lower Head"],
+    ]
+
+
+def _key_arrays(keys):
+    """returns the keys as strings along with a flag marking the integer keys, so
+    load_pumps restores their type"""
+    for key in keys:
+        if not isinstance(key, (str, int, np.integer)) or isinstance(key, bool):
+            raise ValueError(f"Error: keys must be strings or integers, got {key!r}")
+    return (
+        np.array([str(key) for key in keys], dtype=str),
+        np.array([not isinstance(key, str) for key in keys], dtype=bool),
+    )
+
+
+def _keys(arrays):
+    """restores the saved keys with their original str or int type"""
+    return [
+        int(key) if is_int else key
+        for key, is_int in zip(arrays["keys"].tolist(), arrays["int_keys"].tolist())
+    ]
+
+
+def save_pumps(filepath, pumps):
+    """saves pumps and system curves to a single .npz file. Curve data is stored as
+    one flat array per data series with offsets marking each object's values, and
+    every polynomial fit is stored as a coefficient matrix per (x, y, degree). Each
+    defined data series is fitted with the object's curve model before saving, so
+    loaded objects never need to refit. Piecewise (PCHIP and linear) fits are not
+    stored, they are rebuilt on first use without any least squares fitting.
+
+    Args:
+        filepath (str or Path): location of the .npz file
+        pumps (dict or list): pumps and system curves to save, either {key: object}
+        with str or int keys, or a list, in which case the key is the list index
+
+    Raises:
+        ValueError: Raises error for objects other than Pump and SystemCurve (e.g.
+        PumpStation, whose station state can't be saved) or keys that aren't str
+        or int
+    """
+    if not isinstance(pumps, dict):
+        pumps = dict(enumerate(pumps))
+    objects = list(pumps.values())
+    for key, pump in pumps.items():
+        if type(pump) not in (Pump, SystemCurve):
+            raise ValueError(
+                f"Error: only Pump and SystemCurve objects can be saved, got "
+                f"{type(pump).__name__} for {key!r}"
+            )
+    is_system = np.array([isinstance(pump, SystemCurve) for pump in objects])
+    keys, int_keys = _key_arrays(pumps)
+    arrays = {
+        "keys": keys,
+        "int_keys": int_keys,
+        "is_system": is_system,
+        "names": np.array(
+            [pump.name if system else "" for pump, system in zip(objects, is_system)],
+            dtype=str,
+        ),
+        "curve_models": np.array(
+            [
+                "" if pump._curve_model is None else str(pump._curve_model.key)
+                for pump in objects
+            ],
+            dtype=str,
+        ),
+    }
+    for field in ("make", "model", "motor", "impeller"):
+        arrays[f"{field}s"] = np.array(
+            [getattr(pump, field, None) or "" for pump in objects], dtype=str
+        )
+
+    records = [_curve_arrays(pump) for pump in objects]
+    for series in CURVE_SERIES:
+        arrays[f"{series}_values"], arrays[f"{series}_offsets"] = pack_series(
+            records, series
+        )
+
+    for pump in objects:
+        _fit_all(pump)
+    arrays["derived"] = np.array(
+        [
+            [np.nan] * len(DERIVED_FIELDS) if system else _derived(pump)
+            for pump, system in zip(objects, is_system)
+        ],
+        dtype=float,
+    ).reshape(-1, len(DERIVED_FIELDS))
+
+    # one coefficient matrix per fit key, NaN rows for objects without that fit
+    fit_keys = sorted(
+        {
+            key
+            for pump in objects
+            for key, fit in pump._fit_cache.items()
+            if _poly_coeffs(fit) is not None
+        }
+    )
+    for i, (x, y, deg) in enumerate(fit_keys):
+        coeffs = np.full((len(objects), deg + 1), np.nan)
+        for row, pump in enumerate(objects):
+            fit = _poly_coeffs(pump._fit_cache.get((x, y, deg)))
+            if fit is not None:
+                # poly1d drops leading zero coefficients
+                coeffs[row] = 0.0
+                coeffs[row, deg + 1 - len(fit) :] = fit
+        arrays[f"fit_{i}_coeffs"] = coeffs
+    arrays["fit_keys"] = np.array(
+        [[x, y, str(deg)] for x, y, deg in fit_keys], dtype=str
+    ).reshape(-1, 3)
+    write_npz(filepath, arrays, PERSISTENCE_SCHEMA_VERSION)
+
+
+def _read(filepath):
+    """reads the raw arrays of a saved collection into a dict"""
+    return read_npz(filepath, PERSISTENCE_SCHEMA_VERSION)
+
+
+def _curve_model(key):
+    """recreates a curve model from the key stored by save_pumps"""
+    if not key:
+        return None
+    if key in _PIECEWISE_MODELS:
+        return _PIECEWISE_MODELS[key]()
+    return PolynomialModel(int(key))
+
+
+def load_pumps(filepath):
+    """loads pumps and system curves saved by save_pumps, with their polynomial fits
+    already in each fit cache.
+
+    Args:
+        filepath (str or Path): location of the .npz file
+
+    Raises:
+        ValueError: Raises error if the file has a different schema version
+
+    Returns:
+        dict: dictionary with structure {key: Pump or SystemCurve}
+    """
+    arrays = _read(filepath)
+    # split every flat array into per object views once, up front
+    series_values = {}
+    for series in CURVE_SERIES:
+        values, offsets = arrays[f"{series}_values"], arrays[f"{series}_offsets"]
+        offsets = offsets.tolist()
+        series_values[series] = [
+            values[start:end] for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+    fits = []
+    for i, (x, y, _) in enumerate(arrays["fit_keys"].tolist()):
+        coeffs = arrays[f"fit_{i}_coeffs"]
+        valid = np.all(np.isfinite(coeffs), axis=1).tolist()
+        fits.append((x, y, list(coeffs), valid))
+    keys = _keys(arrays)
+    is_system = arrays["is_system"].tolist()
+    names = arrays["names"].tolist()
+    makes = arrays["makes"].tolist()
+    pump_models = arrays["models"].tolist()
+    impellers = arrays["impellers"].tolist()
+    motors = arrays["motors"].tolist()
+    curve_models = arrays["curve_models"].tolist()
+    models = {key: _curve_model(key) for key in set(curve_models)}
+
+    def curve(x, y, i):
+        # curves are built directly rather than through define_*, there are no
+        # cached fits to invalidate yet
+        x_values = series_values[x][i]
+        if not len(x_values):
+            return None
+        return Curve(x_values, series_values[y][i], dtype=Pump.curve_dtype)
+
+    pumps = {}
+    # the objects hold no reference cycles, pausing the cyclic garbage collector
+    # saves it repeatedly scanning every object created so far
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i, key in enumerate(keys):
+            if is_system[i]:
+                system_curve = curve("flow", "head", i)
+                pump = SystemCurve(names[i], system_curve.x, system_curve.y)
+            else:
+                pump = Pump(
+                    makes[i],
+                    pump_models[i],
+                    impeller=impellers[i] or None,
+                    motor=motors[i] or None,
+                )
+                pump._pump_curve = curve("flow", "head", i)
+                pump._efficiency_curve = curve("efficiency_flow", "efficiency", i)
+                pump._npshr_curve = curve("npshr_flow", "npshr", i)
+            pump._curve_model = models[curve_models[i]]
+            for x, y, rows, valid in fits:
+                if valid[i]:
+                    pump.seed_fit(rows[i], x=x, y=y)
+            pumps[key] = pump
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return pumps
+
+
+def load_derived(filepath):
+    """loads the BEP and POR saved with each pump, without creating any Pump objects
+
+    Args:
+        filepath (str or Path): location of the .npz file
+
+    Returns:
+        dict: dictionary of arrays with one element per saved object. Structure:
+        {"Keys": [], "BEP Efficiency": [], "BEP Flow": [], "BEP Head": [],
+        "Upper Flow": [], "Upper Head": [], "Lower Flow": [], "Lower Head": []}
+        Keys is a list of the saved keys. Values are NaN for system curves and
+        pumps without efficiency data.
+    """
+    arrays = _read(filepath)
+    derived = {"Keys": _keys(arrays)}
+    derived.update(zip(DERIVED_FIELDS, arrays["derived"].T))
+    return derived
+
+
+def save_pump(filepath, pump):
+    """saves a single pump or system curve, see save_pumps
+
+    Args:
+        filepath (str or Path): location of the .npz file
+        pump (Pump or SystemCurve): object to save
+    """
+    save_pumps(filepath, [pump])
+
+
+def load_pump(filepath):
+    """loads a single pump or system curve saved by save_pump
+
+    Args:
+        filepath (str or Path): location of the .npz file
+
+    Returns:
+        Pump or SystemCurve: the first object in the file
+    """
+    return next(iter(load_pumps(filepath).values()))
@@ -0,0 +1,162 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+
+
+def _use_headless_backend():
+    """switches matplotlib to the non-interactive Agg backend"""
+    matplotlib.use("Agg")
+
+
+def render_report(
+    pump,
+    output_dir,
+    name=None,
+    formats=("png",),
+    speeds=None,
+    BEP=True,
+    POR="marker",
+    efficiency=True,
+    npshr=True,
+    duty=None,
+    grid=True,
+):
+    """renders the standard pump curve chart for a single pump and saves it in each
+    of the requested formats. The figure is closed once saved, or if rendering
+    fails.
+
+    Args:
+        pump (Pump): pump object to render
+        output_dir (str): directory the charts are saved to
+        name (str, optional): file name (without suffix). If None, the pump fullname
+        is used. Defaults to None.
+        formats (tuple, optional): file formats to save, any of "png", "svg" or "pdf".
+        Defaults to ("png",).
+        speeds (list, optional): speeds to plot, see plot_speeds. If False, no reduced
+        speed curves are plotted. Defaults to None.
+        BEP (bool, optional): Plot best efficiency points. Defaults to True.
+        POR (bool|str, optional): POR plotting method, see plot_speeds.
+        Defaults to "marker".
+        efficiency (bool, optional): Plot efficiency if the pump has it.
+        Defaults to True.
+        npshr (bool, optional): Plot NPSHr if the pump has it. Defaults to True.
+        duty (tuple, optional): (duty flow, duty head) to mark. Defaults to None.
+        grid (bool, optional): Add gridlines. Defaults to True.
+
+    Returns:
+        list: locations of the saved charts
+    """
+    try:
+        has_efficiency = hasattr(pump, "efficiency")
+        pump.generate_plot(BEP=BEP and has_efficiency, POR=bool(POR) and has_efficiency)
+        if speeds is not False:
+            pump.plot_speeds(
+                speeds=speeds,
+                BEP=BEP and has_efficiency,
+                POR=POR if has_efficiency else False,
+            )
+        if npshr and hasattr(pump, "npshr"):
+            pump.add_npshr()
+        if duty is not None:
+            pump.add_duty(duty_flow=duty[0], duty_head=duty[1])
+        if efficiency and has_efficiency:
+            pump.add_efficiency()
+
+        if name is None:
+            name = pump.fullname()
+        name = re.sub(
+            r"[^\w\-. ]", "_", str(name)
+        )  # removes characters not allowed in paths
+        filepaths = []
+        for i, file_format in enumerate(formats):
+            filepaths.append(
+                pump.save_plot(
+                    Path(output_dir) / f"{name}.{file_format}",
+                    grid=grid,
+                    close=i == len(formats) - 1,
+                    finalise=i == 0,
+                )
+            )
+        return filepaths
+    finally:
+        pump.close_plot()  # never leaves a figure open, even on error
+
+
+def _render_job(job):
+    """renders one report for render_reports. Runs in a worker process, so any error
+    is returned as a message rather than raised."""
+    key, pump, output_dir, options = job
+    try:
+        filepaths = render_report(pump, output_dir, name=key, **options)
+    except Exception as error:
+        return key, None, f"{type(error).__name__}: {error}"
+    return key, filepaths, None
+
+
+def _unique_names(pumps):
+    """keys a list of pumps by fullname, numbering repeated names so no pump is
+    dropped"""
+    named = {}
+    for pump in pumps:
+        name, count = pump.fullname(), 1
+        while name in named:
+            count += 1
+            name = f"{pump.fullname()} ({count})"
+        named[name] = pump
+    return named
+
+
+def render_reports(pumps, output_dir, workers=None, chunksize=1, duty=None, **options):
+    """renders pump curve charts for many pumps without displaying them, spreading
+    the work across worker processes using the non-interactive Agg backend.
+    A chart that fails to render does not stop the run, its error is collected and
+    returned alongside the successful results.
+
+    Args:
+        pumps (dict or list): pumps to render, either {name: Pump} or a list of Pump
+        objects, in which case each pump's fullname is used as the file name, with
+        " (2)", " (3)" etc added to repeated names. Pumps should not have an open
+        figure, as figures are not sent to worker processes.
+        output_dir (str): directory the charts are saved to. Created if missing.
+        workers (int, optional): number of worker processes. If None, one per CPU is
+        used. If 1, charts are rendered in the current process with its current
+        matplotlib backend, charts are saved and closed without being shown.
+        Defaults to None.
+        chunksize (int, optional): number of pumps sent to a worker at a time.
+        Defaults to 1.
+        duty (tuple or dict, optional): (duty flow, duty head) marked on every chart,
+        or a dict of {name: (duty flow, duty head)}. Defaults to None.
+        **options: passed through to render_report (formats, speeds, BEP, POR etc)
+
+    Returns:
+        dict: dictionary with structure
+        {"Results": {name: [saved chart locations]}, "Errors": {name: error message}}
+    """
+    if not isinstance(pumps, dict):
+        pumps = _unique_names(pumps)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    jobs = []
+    for key, pump in pumps.items():
+        pump_duty = duty.get(key) if isinstance(duty, dict) else duty
+        jobs.append((key, pump, output_dir, {**options, "duty": pump_duty}))
+
+    if workers == 1:
+        # the caller's backend is left alone, switching it would close their figures
+        return _collect_reports(map(_render_job, jobs))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_use_headless_backend
+    ) as executor:
+        return _collect_reports(executor.map(_render_job, jobs, chunksize=chunksize))
+
+
+def _collect_reports(outputs):
+    """sorts render_reports worker outputs into results and errors"""
+    reports = {"Results": {}, "Errors": {}}
+    for key, filepaths, error in outputs:
+        if error is not None:
+            reports["Errors"][key] = error
+        else:
+            reports["Results"][key] = filepaths
+    return reports
@@ -0,0 +1,228 @@
+import numpy as np
+
+from batch import piecewise_rows, polyval_rows, stack_piecewise
+from operating_point import bisect_roots
+
+
+class SelectionIndex:
+    """Spatial index of the preferred operating region (POR) of many pumps across a
+    range of speeds. Each pump's POR envelope is bucketed into a uniform flow/head
+    grid so a duty point query only needs exact checks on the pumps sharing its grid
+    cell. The exact checks use each pump's selected curve model, pumps fitted with
+    polynomials are checked together and piecewise (PCHIP or linear) pumps one at a
+    time.
+    """
+
+    def __init__(self, pumps, min_speed=50, max_speed=100, grid_size=64):
+        """builds the index.
+
+        Args:
+            pumps (dict or list): pumps to index, either {key: Pump} (e.g. from
+            load_catalog) or a list of Pump objects, in which case the key is the
+            list index. Pumps without efficiency data have no POR and are skipped.
+            min_speed (float, optional): minimum allowable speed (%). Defaults to 50.
+            max_speed (float, optional): maximum allowable speed (%). Defaults to 100.
+            grid_size (int, optional): number of grid cells along each of the flow
+            and head axes. Defaults to 64.
+        """
+        if not isinstance(pumps, dict):
+            pumps = dict(enumerate(pumps))
+        self.min_speed = min_speed
+        self.max_speed = max_speed
+        self.keys = []
+        head_coeffs, efficiency_coeffs, POR_points = [], [], []
+        head_fits, efficiency_fits = [], []  # piecewise fits
+        self.piecewise_index = []
+        for key, pump in pumps.items():
+            if not hasattr(pump, "efficiency"):
+                continue
+            POR_dict = pump.POR()
+            head_fit = pump.fit_curve("flow", "head")
+            efficiency_fit = pump.fit_curve("efficiency_flow", "efficiency")
+            if isinstance(head_fit, np.poly1d) and isinstance(
+                efficiency_fit, np.poly1d
+            ):
+                head_coeffs.append(head_fit.coeffs)
+                efficiency_coeffs.append(efficiency_fit.coeffs)
+                self.piecewise_index.append(-1)
+            else:
+                self.piecewise_index.append(len(head_fits))
+                head_fits.append(head_fit)
+                efficiency_fits.append(efficiency_fit)
+                head_coeffs.append([np.nan])
+                efficiency_coeffs.append([np.nan])
+            self.keys.append(key)
+            POR_points.append(
+                (
+                    POR_dict["Upper Flow"],
+                    POR_dict["Upper Head"],
+                    POR_dict["Lower Flow"],
+                    POR_dict["Lower Head"],
+                )
+            )
+        self.head_coeffs = self._coefficient_rows(head_coeffs)
+        self.efficiency_coeffs = self._coefficient_rows(efficiency_coeffs)
+        # row of each piecewise pump in the stacked piecewise fits, -1 for polynomials
+        self.piecewise_index = np.array(self.piecewise_index, dtype=np.int64)
+        self.head_pieces = stack_piecewise(head_fits)
+        self.efficiency_pieces = stack_piecewise(efficiency_fits)
+        POR_points = np.array(POR_points, dtype=float).reshape(-1, 4)
+        self.upper_flow, self.upper_head = POR_points[:, 0], POR_points[:, 1]
+        self.lower_flow, self.lower_head = POR_points[:, 2], POR_points[:, 3]
+
+        # POR envelope bounding box across the allowable speed range
+        ratio_min, ratio_max = min_speed / 100, max_speed / 100
+        self.box_flow_min = ratio_min * self.lower_flow
+        self.box_flow_max = ratio_max * self.upper_flow
+        self.box_head_min = ratio_min**2 * self.upper_head
+        self.box_head_max = ratio_max**2 * self.lower_head
+        self._build_grid(grid_size)
+
+    def _build_grid(self, grid_size):
+        """buckets each pump's POR envelope bounding box into the grid cells it
+        overlaps. Buckets are stored as a flat array of pump indices with an offsets
+        array per cell."""
+        self.grid_size = grid_size
+        if not self.keys:
+            self.flow_edges = self.head_edges = np.array([0.0, 1.0])
+            self.cell_offsets = np.zeros(grid_size * grid_size + 1, dtype=np.int64)
+            self.cell_pumps = np.empty(0, dtype=np.int64)
+            return
+        self.flow_edges = np.linspace(
+            self.box_flow_min.min(), self.box_flow_max.max(), grid_size + 1
+        )
+        self.head_edges = np.linspace(
+            self.box_head_min.min(), self.box_head_max.max(), grid_size + 1
+        )
+        flow_cells = self._cells(self.flow_edges, self.box_flow_min, self.box_flow_max)
+        head_cells = self._cells(self.head_edges, self.box_head_min, self.box_head_max)
+
+        cells, pumps = [], []
+        for i, (flow_range, head_range) in enumerate(zip(flow_cells, head_cells)):
+            flow_index, head_index = np.meshgrid(
+                np.arange(*flow_range), np.arange(*head_range)
+            )
+            pump_cells = (flow_index * grid_size + head_index).ravel()
+            cells.append(pump_cells)
+            pumps.append(np.full(len(pump_cells), i))
+        cells = np.concatenate(cells)
+        pumps = np.concatenate(pumps)
+        order = np.argsort(cells, kind="stable")
+        self.cell_pumps = pumps[order]
+        self.cell_offsets = np.zeros(grid_size * grid_size + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(cells, minlength=grid_size * grid_size),
+            out=self.cell_offsets[1:],
+        )
+
+    @staticmethod
+    def _coefficient_rows(coeffs):
+        """stacks polynomial coefficients of any degree into one array, padding lower
+        degrees with leading zeros"""
+        width = max((len(row) for row in coeffs), default=1)
+        rows = np.zeros((len(coeffs), width))
+        for row, row_coeffs in zip(rows, coeffs):
+            row[width - len(row_coeffs) :] = row_coeffs
+        return rows
+
+    @staticmethod
+    def _cells(edges, lower, upper):
+        """returns the (first, last + 1) grid cell index covering each lower/upper
+        range along one axis"""
+        n_cells = len(edges) - 1
+        first = np.clip(np.searchsorted(edges, lower, side="right") - 1, 0, n_cells - 1)
+        last = np.clip(np.searchsorted(edges, upper, side="right") - 1, 0, n_cells - 1)
+        return np.stack([first, last + 1], axis=-1)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def candidates(self, duty_flow, duty_head):
+        """returns the indices of pumps whose POR envelope bounding box contains the
+        duty point.
+
+        Args:
+            duty_flow (float): flow at duty point (L/s)
+            duty_head (float): head at duty point (m)
+
+        Returns:
+            array: indices of candidate pumps
+        """
+        flow_cell = np.searchsorted(self.flow_edges, duty_flow, side="right") - 1
+        head_cell = np.searchsorted(self.head_edges, duty_head, side="right") - 1
+        if flow_cell < 0 or head_cell < 0:
+            return np.empty(0, dtype=np.int64)
+        # points on or beyond the upper grid edge are checked against the last cell,
+        # the bounding box check below removes any pumps that don't actually cover them
+        flow_cell = min(flow_cell, self.grid_size - 1)
+        head_cell = min(head_cell, self.grid_size - 1)
+        cell = flow_cell * self.grid_size + head_cell
+        candidates = self.cell_pumps[
+            self.cell_offsets[cell] : self.cell_offsets[cell + 1]
+        ]
+        inside_box = (
+            (self.box_flow_min[candidates] <= duty_flow)
+            & (duty_flow <= self.box_flow_max[candidates])
+            & (self.box_head_min[candidates] <= duty_head)
+            & (duty_head <= self.box_head_max[candidates])
+        )
+        return candidates[inside_box]
+
+    def query(self, duty_flow, duty_head):
+        """finds the pumps which have the duty point inside their POR at a speed
+        within the allowable speed range.
+        The affinity parabola through the duty point (head = k * flow**2) meets each
+        pump's 100% curve at the equivalent 100% speed flow. The duty point is in the
+        POR when that flow is within the 100% POR, and the required speed is the duty
+        flow divided by that flow.
+
+        Args:
+            duty_flow (float): flow at duty point (L/s)
+            duty_head (float): head at duty point (m)
+
+        Returns:
+            dict: matching pumps, sorted by descending efficiency at the duty point.
+            Structure: {"Pumps": [keys], "Speed": [], "Efficiency": []}
+        """
+        candidates = self.candidates(duty_flow, duty_head)
+        k = duty_head / duty_flow**2
+        candidates = candidates[
+            (k <= self.lower_head[candidates] / self.lower_flow[candidates] ** 2)
+            & (k >= self.upper_head[candidates] / self.upper_flow[candidates] ** 2)
+        ]
+        flow_100 = np.empty(len(candidates))
+        efficiency = np.empty(len(candidates))
+        piecewise_rows_index = self.piecewise_index[candidates]
+        polynomial = piecewise_rows_index < 0
+        head_coeffs = self.head_coeffs[candidates[polynomial]]
+        flow_100[polynomial] = bisect_roots(
+            lambda flow: polyval_rows(head_coeffs, flow) - k * flow**2,
+            lower=self.lower_flow[candidates[polynomial]],
+            upper=self.upper_flow[candidates[polynomial]],
+        )
+        efficiency[polynomial] = polyval_rows(
+            self.efficiency_coeffs[candidates[polynomial]], flow_100[polynomial]
+        )
+        rows = piecewise_rows_index[~polynomial]
+        head_breaks, head_pieces = (array[rows] for array in self.head_pieces)
+        flow_100[~polynomial] = bisect_roots(
+            lambda flow: piecewise_rows(head_breaks, head_pieces, flow) - k * flow**2,
+            lower=self.lower_flow[candidates[~polynomial]],
+            upper=self.upper_flow[candidates[~polynomial]],
+        )
+        efficiency[~polynomial] = piecewise_rows(
+            *(array[rows] for array in self.efficiency_pieces), flow_100[~polynomial]
+        )
+        speed = 100 * duty_flow / flow_100
+        in_range = (speed >= self.min_speed) & (speed <= self.max_speed)
+        candidates, speed, efficiency = (
+            candidates[in_range],
+            speed[in_range],
+            efficiency[in_range],
+        )
+        order = np.argsort(-efficiency)
+        return {
+            "Pumps": [self.keys[i] for i in candidates[order]],
+            "Speed": speed[order],
+            "Efficiency": efficiency[order],
+        }
@@ -0,0 +1,243 @@
+import numpy as np
+
+from operating_point import shaft_power
+from parameters import Pump
+
+ARRANGEMENTS = ("parallel", "series")
+
+
+def invert_head_curve(pump, heads, speeds=100, n_samples=256):
+    """finds the flow at which a pump delivers each head, for any number of speeds.
+    The 100% speed head curve is sampled once and made monotonically decreasing, so
+    the inverse is a single np.interp call. A head h at speed ratio r is delivered at
+    r * Q(h / r**2), where Q is the inverse of the 100% curve, so speeds and heads
+    are broadcast together without any per speed work.
+
+    Args:
+        pump (Pump): pump object with a pump curve defined at 100% speed
+        heads (float or array): heads (m) to find the flows for
+        speeds (float or array, optional): pump speeds (%), broadcast against heads.
+        Defaults to 100.
+        n_samples (int, optional): number of points the 100% curve is sampled at.
+        Defaults to 256.
+
+    Returns:
+        float or array: flows (L/s). NaN where the head is above the pump's head at
+        its lowest flow or below its head at its highest flow.
+    """
+    sample_flows = np.linspace(np.min(pump.flow), np.max(pump.flow), n_samples)
+    # the lowest head reached so far, removing any rising section of the curve
+    sample_heads = np.minimum.accumulate(pump.fit_curve("flow", "head")(sample_flows))
+    flow_multiplier, head_multiplier = pump.affinity_ratio(np.asarray(speeds, float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        flows_100 = np.interp(
+            np.asarray(heads, dtype=float) / head_multiplier,
+            sample_heads[::-1],
+            sample_flows[::-1],
+            left=np.nan,
+            right=np.nan,
+        )
+    return flow_multiplier * flows_100
+
+
+class PumpStation(Pump):
+    """Pumps combined in parallel (flows add at equal head) or in series (heads add
+    at equal flow), each at its own speed. The combined flow/head and efficiency
+    curves are defined as the station's curves, so the station can be plotted and
+    used with a SystemCurve like any other Pump. The combined curves are at the
+    assigned speeds, plot_speeds then scales every pump's speed together.
+    """
+
+    __slots__ = ("name", "pumps", "speeds", "arrangement", "n_points")
+
+    def __init__(self, name, pumps, speeds=100, arrangement="parallel", n_points=100):
+        """
+        Args:
+            name (str): station name
+            pumps (list): list of Pump objects, the same object can appear more than
+            once for identical pumps
+            speeds (float or list, optional): speed of each pump (%), or a single
+            speed for all of them. Pumps at 0% speed are off and left out of the
+            combined curve, e.g. standby pumps. Defaults to 100.
+            arrangement (str, optional): "parallel" or "series".
+            Defaults to "parallel".
+            n_points (int, optional): number of points on the combined curves.
+            Defaults to 100.
+
+        Raises:
+            ValueError: Raises error for an unknown arrangement or a speeds list
+            which doesn't match the number of pumps
+        """
+        if arrangement not in ARRANGEMENTS:
+            raise ValueError(
+                f"Error: arrangement must be one of {ARRANGEMENTS}, got {arrangement}"
+            )
+        self.name = name
+        self.make = name
+        self.model = f"{len(pumps)} pumps in {arrangement}"
+        self.impeller = None
+        self.motor = None
+        self.pumps = list(pumps)
+        self.arrangement = arrangement
+        self.n_points = n_points
+        self._reset_curves()
+        self.set_speeds(speeds)
+
+    def __repr__(self):
+        return f"{self.name}"
+
+    def set_speeds(self, speeds):
+        """assigns the pump speeds and rebuilds the combined curves
+
+        Args:
+            speeds (float or list): speed of each pump (%), or a single speed for all
+
+        Raises:
+            ValueError: Raises error if no pump is running or the number of speeds
+            doesn't match the number of pumps
+        """
+        speeds = np.broadcast_to(np.asarray(speeds, dtype=float), (len(self.pumps),))
+        if not np.any(speeds > 0):
+            raise ValueError("Error: at least one pump in the station must be running")
+        self.speeds = speeds.copy()
+        if self.arrangement == "parallel":
+            self._combine_parallel()
+        else:
+            self._combine_series()
+        return self
+
+    @property
+    def running(self):
+        """indices of the pumps which are running"""
+        return np.flatnonzero(self.speeds > 0)
+
+    def _combine_parallel(self):
+        running = self.running
+        shutoff_heads, lowest_heads = [], []
+        for i in running:
+            pump = self.pumps[i]
+            _, head_multiplier = pump.affinity_ratio(self.speeds[i])
+            heads = head_multiplier * pump.fit_curve("flow", "head")(
+                np.array([np.min(pump.flow), np.max(pump.flow)])
+            )
+            shutoff_heads.append(heads[0])
+            lowest_heads.append(heads[1])
+        # every running pump has a defined flow between these heads
+        heads = np.linspace(max(lowest_heads), max(shutoff_heads), self.n_points)
+        flows = self._pump_flows(heads)
+        station_flow = flows.sum(axis=0)
+        order = np.argsort(station_flow)
+        self.define_pumpcurve(station_flow[order], heads[order])
+        self._define_station_efficiency(
+            flows, np.broadcast_to(heads, flows.shape), station_flow, heads
+        )
+
+    def _combine_series(self):
+        running = self.running
+        lowest_flow = max(
+            self.speeds[i] / 100 * np.min(self.pumps[i].flow) for i in running
+        )
+        highest_flow = min(
+            self.speeds[i] / 100 * np.max(self.pumps[i].flow) for i in running
+        )
+        flows = np.linspace(lowest_flow, highest_flow, self.n_points)
+        heads = self._pump_heads(flows)
+        station_head = heads.sum(axis=0)
+        self.define_pumpcurve(flows, station_head)
+        self._define_station_efficiency(
+            np.broadcast_to(flows, heads.shape), heads, flows, station_head
+        )
+
+    def _pump_flows(self, heads):
+        """flow of each running pump at the station heads in a parallel station.
+        Pumps whose shut off head is below the station head deliver no flow."""
+        flows = []
+        for i in self.running:
+            pump_flows = invert_head_curve(self.pumps[i], heads, self.speeds[i])
+            _, head_multiplier = self.pumps[i].affinity_ratio(self.speeds[i])
+            shutoff_head = head_multiplier * self.pumps[i].fit_curve("flow", "head")(
+                np.min(self.pumps[i].flow)
+            )
+            flows.append(np.where(heads > shutoff_head, 0.0, pump_flows))
+        return np.array(flows)
+
+    def _pump_heads(self, flows):
+        """head of each running pump at the station flows in a series station"""
+        heads = []
+        for i in self.running:
+            flow_multiplier, head_multiplier = self.pumps[i].affinity_ratio(
+                self.speeds[i]
+            )
+            pump_poly = self.pumps[i].fit_curve("flow", "head")
+            heads.append(head_multiplier * pump_poly(flows / flow_multiplier))
+        return np.array(heads)
+
+    def _pump_power(self, flows, heads):
+        """efficiency and shaft power of each running pump, NaN if any running pump
+        has no efficiency data. Pumps delivering no flow draw no power."""
+        efficiencies = np.full(flows.shape, np.nan)
+        for row, i in enumerate(self.running):
+            pump = self.pumps[i]
+            if not hasattr(pump, "efficiency"):
+                return efficiencies, np.full(flows.shape, np.nan)
+            flow_multiplier, _ = pump.affinity_ratio(self.speeds[i])
+            efficiency_poly = pump.fit_curve("efficiency_flow", "efficiency")
+            efficiencies[row] = efficiency_poly(flows[row] / flow_multiplier)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            power = np.where(flows > 0, shaft_power(flows, heads, efficiencies), 0.0)
+        return efficiencies, power
+
+    def _define_station_efficiency(self, flows, heads, station_flow, station_head):
+        """defines the station efficiency as the hydraulic power delivered over the
+        total shaft power of the running pumps. The efficiency is cleared if it
+        can't be calculated, e.g. a running pump has no efficiency data."""
+        _, power = self._pump_power(flows, heads)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            efficiency = (
+                100 * shaft_power(station_flow, station_head, 100) / power.sum(axis=0)
+            )
+        valid = np.isfinite(efficiency)
+        if np.count_nonzero(valid) < 2:
+            # no efficiency at these speeds, don't keep the previous speeds' curve
+            self._efficiency_curve = None
+            self._invalidate_fits("efficiency", "efficiency_flow")
+            return
+        order = np.argsort(station_flow[valid])
+        self.define_efficiency(
+            efficiency[valid][order], efficiency_flow=station_flow[valid][order]
+        )
+
+    def pump_operating_points(self, station_flow):
+        """finds the operating point of each running pump when the station delivers
+        the given flows.
+
+        Args:
+            station_flow (float or array): station flows (L/s)
+
+        Returns:
+            dict: dictionary of arrays with shape (n_running, n_flows). Structure:
+            {"Pumps": [indices of the running pumps], "Flow": [], "Head": [],
+            "Efficiency": [], "Power": []}. Power is the shaft power in kW. Values are
+            NaN where the station flow is outside the combined curve.
+        """
+        station_flow = np.atleast_1d(np.asarray(station_flow, dtype=float))
+        outside = (station_flow < np.min(self.flow)) | (
+            station_flow > np.max(self.flow)
+        )
+        if self.arrangement == "parallel":
+            station_head = np.where(
+                outside, np.nan, np.interp(station_flow, self.flow, self.head)
+            )
+            flows = self._pump_flows(station_head)
+            heads = np.broadcast_to(station_head, flows.shape)
+        else:
+            heads = np.where(outside, np.nan, self._pump_heads(station_flow))
+            flows = np.broadcast_to(station_flow, heads.shape)
+        efficiencies, power = self._pump_power(flows, heads)
+        return {
+            "Pumps": self.running,
+            "Flow": np.where(np.isnan(heads), np.nan, flows),
+            "Head": heads,
+            "Efficiency": np.where(np.isnan(heads), np.nan, efficiencies),
+            "Power": np.where(np.isnan(heads), np.nan, power),
+        }
@@ -0,0 +1,210 @@
+"""Streaming analysis of pump telemetry against the vendor curves.
+
+Telemetry files are read in bounded memory chunks and each sample is compared to the
+pump's 100% speed curves scaled to the measured speed with the affinity laws. Rolling
+deviations are carried across chunk boundaries, so a file of any size is processed
+with the memory of a single chunk.
+
+    chunks = read_telemetry("station.parquet", chunksize=500000)
+    for result in monitor_telemetry(pump, chunks, window=1440):
+        for timestamp, message in result["Alerts"]:
+            print(timestamp, message)
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from instrumentation import instrument
+from operating_point import shaft_power
+
+TELEMETRY_FIELDS = ("Timestamp", "Speed", "Flow", "Head", "Power")
+
+
+def read_telemetry(
+    filepath,
+    chunksize=100000,
+    timestamp="timestamp",
+    speed="speed",
+    flow="flow",
+    head="head",
+    power="power",
+):
+    """reads a CSV or Parquet telemetry file one chunk at a time. Only the named
+    columns are read. Parquet files require pyarrow.
+
+    Args:
+        filepath (str or Path): .csv or .parquet telemetry file
+        chunksize (int, optional): number of rows per chunk. Defaults to 100000.
+        timestamp (str, optional): timestamp column name. Defaults to "timestamp".
+        speed (str, optional): pump speed (%) column name. Defaults to "speed".
+        flow (str, optional): flow (L/s) column name. Defaults to "flow".
+        head (str, optional): head (m) column name. Defaults to "head".
+        power (str, optional): shaft power (kW) column name. Defaults to "power".
+
+    Raises:
+        ValueError: Raises error if the file isn't a .csv or .parquet file
+
+    Yields:
+        dict: dictionary of arrays for each chunk. Structure:
+        {"Timestamp": [], "Speed": [], "Flow": [], "Head": [], "Power": []}
+    """
+    columns = dict(zip((timestamp, speed, flow, head, power), TELEMETRY_FIELDS))
+    suffix = Path(filepath).suffix.lower()
+    if suffix == ".csv":
+        import pandas as pd
+
+        reader = pd.read_csv(filepath, usecols=list(columns), chunksize=chunksize)
+        frames = (frame.to_dict("series") for frame in reader)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(filepath).iter_batches(
+            batch_size=chunksize, columns=list(columns)
+        )
+        frames = (
+            {
+                name: batch.column(name).to_numpy(zero_copy_only=False)
+                for name in columns
+            }
+            for batch in batches
+        )
+    else:
+        raise ValueError(
+            f"Error: telemetry must be a .csv or .parquet file, got {filepath}"
+        )
+    for frame in frames:
+        chunk = {field: np.asarray(frame[name]) for name, field in columns.items()}
+        for field in TELEMETRY_FIELDS[1:]:
+            chunk[field] = chunk[field].astype(float)
+        yield chunk
+
+
+@instrument
+def curve_deviation(pump, chunk, density=1000):
+    """compares measured operating points to the pump curves scaled to the measured
+    speed. The expected head at speed ratio r and flow Q is r**2 * H(Q / r) and the
+    expected efficiency is the 100% efficiency at Q / r.
+
+    Args:
+        pump (Pump): pump object with pump curve and efficiency at 100% speed
+        chunk (dict): telemetry arrays with the "Speed", "Flow", "Head" and "Power"
+        fields, see read_telemetry
+        density (float, optional): fluid density (kg/m3). Defaults to 1000.
+
+    Returns:
+        dict: dictionary of arrays with one element per sample. Structure:
+        {"Expected Head": [], "Expected Efficiency": [], "Efficiency": [],
+        "Head Deviation": [], "Efficiency Deviation": []}
+        Head deviation is in % of the expected head, efficiency deviation in
+        percentage points. Samples with the pump stopped or with the equivalent 100%
+        speed flow outside the pump data are NaN.
+    """
+    flow_multiplier, head_multiplier = pump.affinity_ratio(chunk["Speed"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reduced_flow = chunk["Flow"] / flow_multiplier
+        valid = (
+            (chunk["Speed"] > 0)
+            & (reduced_flow >= np.min(pump.flow))
+            & (reduced_flow <= np.max(pump.flow))
+        )
+        reduced_flow = np.where(valid, reduced_flow, np.nan)
+        expected_head = head_multiplier * pump.fit_curve("flow", "head")(reduced_flow)
+        expected_efficiency = pump.fit_curve("efficiency_flow", "efficiency")(
+            reduced_flow
+        )
+        hydraulic_power = shaft_power(chunk["Flow"], chunk["Head"], 100, density)
+        efficiency = 100 * hydraulic_power / chunk["Power"]
+        head_deviation = 100 * (chunk["Head"] - expected_head) / expected_head
+    return {
+        "Expected Head": expected_head,
+        "Expected Efficiency": expected_efficiency,
+        "Efficiency": efficiency,
+        "Head Deviation": head_deviation,
+        "Efficiency Deviation": efficiency - expected_efficiency,
+    }
+
+
+def _rolling_mean(values, carry, window):
+    """rolling mean over the last window samples ignoring NaN, continuing from the
+    carried over tail of the previous chunk. Returns the means and the new tail."""
+    joined = np.concatenate([carry, values])
+    valid = ~np.isnan(joined)
+    sums = np.concatenate([[0.0], np.cumsum(np.where(valid, joined, 0.0))])
+    counts = np.concatenate([[0], np.cumsum(valid)])
+    end = np.arange(len(carry) + 1, len(joined) + 1)
+    start = np.maximum(end - window, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = (sums[end] - sums[start]) / (counts[end] - counts[start])
+    return means, joined[-(window - 1) :] if window > 1 else joined[:0]
+
+
+def monitor_telemetry(
+    pump,
+    chunks,
+    window=1000,
+    head_threshold=-5.0,
+    efficiency_threshold=-5.0,
+    density=1000,
+):
+    """generator detecting pump degradation in a stream of telemetry chunks. The
+    rolling mean head and efficiency deviations over the last window samples are
+    tracked across chunks, and an alert is raised whenever either falls below its
+    threshold and cleared when both recover.
+
+    Args:
+        pump (Pump): pump object with pump curve and efficiency at 100% speed
+        chunks (iterable): iterable of telemetry chunks, e.g. from read_telemetry
+        window (int, optional): number of samples in the rolling window.
+        Defaults to 1000.
+        head_threshold (float, optional): rolling head deviation (%) below which an
+        alert is raised. Defaults to -5.0.
+        efficiency_threshold (float, optional): rolling efficiency deviation
+        (percentage points) below which an alert is raised. Defaults to -5.0.
+        density (float, optional): fluid density (kg/m3). Defaults to 1000.
+
+    Yields:
+        dict: dictionary for each chunk. Structure: {"Timestamp": [],
+        "Head Deviation": [], "Efficiency Deviation": [],
+        "Rolling Head Deviation": [], "Rolling Efficiency Deviation": [],
+        "Degraded": [], "Alerts": [(timestamp, message)]}
+        Degraded is True for samples in an alert state. Alerts lists the samples
+        where an alert was raised or cleared.
+    """
+    head_carry = efficiency_carry = np.empty(0)
+    degraded_before = False
+    for chunk in chunks:
+        deviation = curve_deviation(pump, chunk, density=density)
+        rolling_head, head_carry = _rolling_mean(
+            deviation["Head Deviation"], head_carry, window
+        )
+        rolling_efficiency, efficiency_carry = _rolling_mean(
+            deviation["Efficiency Deviation"], efficiency_carry, window
+        )
+        degraded = (rolling_head < head_threshold) | (
+            rolling_efficiency < efficiency_threshold
+        )
+        changes = np.flatnonzero(np.diff(degraded, prepend=degraded_before))
+        alerts = [
+            (
+                chunk["Timestamp"][i],
+                (
+                    f"Degradation alert: rolling head deviation {rolling_head[i]:.1f}%, "
+                    f"efficiency deviation {rolling_efficiency[i]:.1f} points"
+                    if degraded[i]
+                    else "Degradation alert cleared"
+                ),
+            )
+            for i in changes
+        ]
+        if len(degraded):
+            degraded_before = degraded[-1]
+        yield {
+            "Timestamp": chunk["Timestamp"],
+            "Head Deviation": deviation["Head Deviation"],
+            "Efficiency Deviation": deviation["Efficiency Deviation"],
+            "Rolling Head Deviation": rolling_head,
+            "Rolling Efficiency Deviation": rolling_efficiency,
+            "Degraded": degraded,
+            "Alerts": alerts,
+        }
@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# the Pumps modules import each other by their flat module names
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import synthetic_pump, synthetic_system  # noqa: E402
+
+
+@pytest.fixture
+def pump():
+    """synthetic pump with pump, efficiency and npshr curves"""
+    return synthetic_pump(seed=1)
+
+
+@pytest.fixture
+def system(pump):
+    """system curve crossing the pump curve near its BEP"""
+    return synthetic_system(pump)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+SPEEDS = [100, 90, 75.5, 60, 40]
+
+
+def test_affinity_arrays_match_per_speed_scaling(pump):
+    flows, heads = pump.generate_affinity_arrays(SPEEDS)
+    assert flows.shape == heads.shape == (len(SPEEDS), len(pump.flow))
+    for i, speed in enumerate(SPEEDS):
+        ratio = speed / 100
+        np.testing.assert_allclose(flows[i], pump.flow * ratio)
+        np.testing.assert_allclose(heads[i], pump.head * ratio**2)
+
+
+def test_single_speed_affinity(pump):
+    flow, head = pump.generate_affinity(80)
+    np.testing.assert_allclose(flow, pump.flow * 0.8)
+    np.testing.assert_allclose(head, pump.head * 0.64)
+
+
+def test_speed_curves_dict_matches_arrays(pump):
+    curves = pump.generate_speed_curves(SPEEDS)
+    flows, heads = pump.generate_affinity_arrays(SPEEDS)
+    assert list(curves) == SPEEDS
+    for i, speed in enumerate(SPEEDS):
+        np.testing.assert_array_equal(curves[speed][0], flows[i])
+        np.testing.assert_array_equal(curves[speed][1], heads[i])
+
+
+def test_BEP_and_POR_arrays_match_scaled_100_percent_points(pump):
+    _, BEP_flow, BEP_head = pump.BEP()
+    POR = pump.POR()
+    BEP_flows, BEP_heads = pump.generate_BEP_arrays(SPEEDS)
+    POR_array = pump.generate_POR_arrays(SPEEDS)
+    for i, speed in enumerate(SPEEDS):
+        ratio = speed / 100
+        assert BEP_flows[i] == pytest.approx(BEP_flow * ratio)
+        assert BEP_heads[i] == pytest.approx(BEP_head * ratio**2)
+        np.testing.assert_allclose(
+            POR_array[i],
+            [
+                POR["Upper Flow"] * ratio,
+                POR["Upper Head"] * ratio**2,
+                POR["Lower Flow"] * ratio,
+                POR["Lower Head"] * ratio**2,
+            ],
+        )
+    assert pump.generate_speeds_POR(80)[80] == tuple(pump.generate_POR_arrays(80)[0])
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from batch import batch_BEP, catalog_BEP, polyder_rows, polyval_rows, real_roots_rows
+from benchmarks import synthetic_pump
+
+
+def test_polyval_and_polyder_rows_match_numpy():
+    rng = np.random.default_rng(0)
+    coeffs = rng.normal(size=(5, 4))
+    x = rng.normal(size=(5, 3))
+    for row, row_coeffs in enumerate(coeffs):
+        np.testing.assert_allclose(
+            polyval_rows(coeffs, x)[row], np.polyval(row_coeffs, x[row])
+        )
+        np.testing.assert_allclose(polyder_rows(coeffs)[row], np.polyder(row_coeffs))
+
+
+def test_real_roots_rows_match_numpy():
+    coeffs = np.array([[1, -6, 11, -6], [1, 0, 1, 0], [0, 1, -3, 2]], dtype=float)
+    roots = real_roots_rows(coeffs)
+    np.testing.assert_allclose(np.sort(roots[0]), [1, 2, 3])
+    assert np.count_nonzero(np.isfinite(roots[1])) == 1 and np.nanmax(roots[1]) == 0
+    np.testing.assert_allclose(np.sort(roots[2, :2]), [1, 2])
+    assert np.isnan(roots[2, 2])
+
+
+def test_batch_BEP_matches_dense_search():
+    rng = np.random.default_rng(1)
+    coeffs = rng.normal(size=(20, 4))
+    flow_min, flow_max = np.zeros(20), rng.uniform(1, 3, 20)
+    BEP = batch_BEP(coeffs, flow_min, flow_max, head_coeffs=coeffs)
+    for i in range(20):
+        flows = np.linspace(flow_min[i], flow_max[i], 100001)
+        efficiency = np.polyval(coeffs[i], flows)
+        assert BEP["Efficiency"][i] == pytest.approx(efficiency.max(), abs=1e-8)
+        assert BEP["Efficiency"][i] >= efficiency.max() - 1e-12
+    np.testing.assert_allclose(BEP["Head"], BEP["Efficiency"])
+
+
+def test_catalog_BEP_matches_per_pump_BEP():
+    pumps = [synthetic_pump(n_points=10 + seed, seed=seed) for seed in range(30)]
+    BEP = catalog_BEP(pumps)
+    for i, pump in enumerate(pumps):
+        assert pump.fit_cache_info()["Size"] == 2
+        expected = pump.BEP(continuous=True)
+        np.testing.assert_allclose(
+            [BEP["Efficiency"][i], BEP["Flow"][i], BEP["Head"][i]],
+            expected,
+            rtol=1e-9,
+        )
+        fresh = synthetic_pump(n_points=10 + i, seed=i)
+        np.testing.assert_allclose(
+            expected, fresh.BEP(continuous=True), rtol=1e-9, atol=1e-9
+        )
+        assert pump.fit_cache_info()["Misses"] == 0
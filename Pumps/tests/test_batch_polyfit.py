@@ -0,0 +1,36 @@
+import numpy as np
+
+from batch import batch_polyfit, pad_curves, pad_ragged, polyval_rows
+
+
+def test_pad_ragged():
+    values, mask = pad_ragged([1, 2, 3, 4, 5, 6], [0, 2, 2, 6])
+    np.testing.assert_array_equal(values, [[1, 2, 0, 0], [0, 0, 0, 0], [3, 4, 5, 6]])
+    np.testing.assert_array_equal(mask.sum(axis=1), [2, 0, 4])
+    padded, _ = pad_curves([[1, 2], [3]])
+    np.testing.assert_array_equal(padded, [[1, 2], [3, 0]])
+
+
+def test_ragged_fit_matches_polyfit():
+    rng = np.random.default_rng(0)
+    x = [np.sort(rng.uniform(0, 500, n)) for n in rng.integers(6, 40, 50)]
+    y = [rng.normal(size=len(xi)).cumsum() for xi in x]
+    for deg in (1, 3, 5):
+        coeffs = batch_polyfit(x, y, deg=deg)
+        assert coeffs.shape == (50, deg + 1)
+        for row, (xi, yi) in enumerate(zip(x, y)):
+            expected = np.polyfit(xi, yi, deg)
+            np.testing.assert_allclose(
+                np.polyval(coeffs[row], xi), np.polyval(expected, xi), atol=1e-8
+            )
+
+
+def test_mask_and_non_finite_values_are_padding():
+    x = np.tile(np.linspace(0, 10, 8), (3, 1))
+    y = 2 * x**2 - x + 1
+    y[0, -1] = 1e6
+    mask = np.ones_like(x, dtype=bool)
+    mask[0, -1] = False
+    y[1, 2] = np.nan
+    coeffs = batch_polyfit(x, y, deg=2, mask=mask)
+    np.testing.assert_allclose(coeffs, [[2, -1, 1]] * 3, atol=1e-9)
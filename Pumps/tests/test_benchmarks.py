@@ -0,0 +1,50 @@
+import json
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from benchmarks import (
+    BENCHMARKS,
+    compare_results,
+    main,
+    synthetic_curve_data,
+    synthetic_pump,
+)
+
+
+def test_synthetic_data_is_reproducible():
+    first, second = synthetic_curve_data(10, seed=4), synthetic_curve_data(10, seed=4)
+    assert first == second
+    assert np.all(np.diff(first["Head [m]"]) < 0)
+    assert synthetic_pump(seed=4).model == "Pump 4"
+
+
+@pytest.mark.parametrize("name", list(BENCHMARKS))
+def test_every_benchmark_runs(name, tmp_path):
+    context = {
+        "pumps": [synthetic_pump(12, seed) for seed in range(3)],
+        "n_points": 12,
+        "speeds": [90, 70],
+        "tempdir": str(tmp_path),
+    }
+    BENCHMARKS[name](context)()
+    plt.close("all")
+
+
+def test_compare_results_flags_regressions():
+    baseline = {"Results": {"a": {"Median": 1.0}, "b": {"Median": 1.0}}}
+    results = {
+        "Results": {"a": {"Median": 1.5}, "b": {"Median": 1.1}, "c": {"Median": 9}}
+    }
+    assert compare_results(results, baseline, threshold=1.2) == {"a": 1.5}
+
+
+def test_main_saves_and_compares(tmp_path):
+    output = tmp_path / "results.json"
+    argv = ["--pumps", "2", "--repeat", "1", "--select", "BEP (cached fits)"]
+    assert main(argv + ["--output", str(output)]) == 0
+    results = json.loads(output.read_text())
+    assert list(results["Results"]) == ["BEP (cached fits)"]
+    assert results["Meta"]["Pumps"] == 2
+    assert main(argv + ["--compare", str(output), "--threshold", "1000"]) == 0
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks import synthetic_curve_data, write_xylect_file
+from catalog import build_catalog, fit_catalog, load_catalog, load_pump
+from ingest import CURVE_SERIES, parse_curve_file
+
+
+@pytest.fixture
+def curve_dir(tmp_path):
+    directory = tmp_path / "curves"
+    directory.mkdir()
+    for seed in range(4):
+        write_xylect_file(
+            directory / f"pump_{seed}.xlsx",
+            synthetic_curve_data(n_points=12, seed=seed),
+            model=f"Pump {seed}",
+        )
+    return directory
+
+
+def build(curve_dir, catalog_path):
+    return build_catalog(curve_dir, catalog_path, pattern="*.xlsx", workers=1)
+
+
+def assert_matches_files(catalog_path, curve_dir):
+    pumps = load_catalog(catalog_path)
+    files = sorted(path.name for path in curve_dir.glob("*.xlsx"))
+    assert sorted(pumps) == files
+    for file, pump in pumps.items():
+        record = parse_curve_file(curve_dir / file)
+        assert pump.model == record["Model"]
+        for series in CURVE_SERIES:
+            np.testing.assert_array_equal(getattr(pump, series), record[series])
+
+
+def test_build_round_trip(curve_dir, tmp_path):
+    catalog_path = tmp_path / "catalog.npz"
+    summary = build(curve_dir, catalog_path)
+    assert len(summary["Parsed"]) == 4 and not summary["Errors"]
+    assert_matches_files(catalog_path, curve_dir)
+    pump = load_pump(catalog_path, "pump_2.xlsx")
+    assert pump.model == "Pump 2"
+
+
+def test_update_only_parses_changed_files(curve_dir, tmp_path):
+    catalog_path = tmp_path / "catalog.npz"
+    build(curve_dir, catalog_path)
+
+    # touched but unchanged contents are not re-parsed
+    os.utime(curve_dir / "pump_0.xlsx", (1, 1))
+    write_xylect_file(
+        curve_dir / "pump_1.xlsx", synthetic_curve_data(12, seed=10), model="New 1"
+    )
+    write_xylect_file(
+        curve_dir / "pump_9.xlsx", synthetic_curve_data(12, seed=9), model="Pump 9"
+    )
+    (curve_dir / "pump_3.xlsx").unlink()
+    (curve_dir / "broken.xlsx").write_bytes(b"not a spreadsheet")
+
+    summary = build(curve_dir, catalog_path)
+    assert sorted(summary["Parsed"]) == ["pump_1.xlsx", "pump_9.xlsx"]
+    assert sorted(summary["Unchanged"]) == ["pump_0.xlsx", "pump_2.xlsx"]
+    assert summary["Removed"] == ["pump_3.xlsx"]
+    assert list(summary["Errors"]) == ["broken.xlsx"]
+
+    (curve_dir / "broken.xlsx").unlink()
+    assert_matches_files(catalog_path, curve_dir)
+    assert load_pump(catalog_path, "pump_1.xlsx").model == "New 1"
+
+
+def test_batch_fits_match_per_pump_fits(curve_dir, tmp_path):
+    catalog_path = tmp_path / "catalog.npz"
+    build(curve_dir, catalog_path)
+    fits = fit_catalog(catalog_path)
+    pumps = load_catalog(catalog_path, fit_deg=3)
+    fresh = load_catalog(catalog_path)
+    for i, file in enumerate(pumps):
+        for (x, y), coeffs in fits.items():
+            expected = fresh[file].fit_curve(x, y).coeffs
+            np.testing.assert_allclose(coeffs[i], expected, rtol=1e-8, atol=1e-10)
+            np.testing.assert_array_equal(pumps[file].fit_curve(x, y).coeffs, coeffs[i])
+        assert pumps[file].fit_cache_info()["Misses"] == 0
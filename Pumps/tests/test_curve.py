@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from curve import Curve
+from parameters import Pump, SystemCurve
+
+
+def test_curve_stores_contiguous_arrays():
+    curve = Curve([0, 1, 2], [3.0, 2.5, 1.0], dtype=np.float32)
+    assert curve.x.dtype == curve.y.dtype == np.float32
+    assert curve.x.flags["C_CONTIGUOUS"] and len(curve) == 3
+    assert curve.nbytes() == 24
+
+
+def test_curve_rejects_mismatched_lengths():
+    with pytest.raises(ValueError, match="same length"):
+        Curve([0, 1, 2], [1, 2])
+
+
+def test_pump_and_system_have_no_instance_dict(pump, system):
+    for obj in (pump, system):
+        assert not hasattr(obj, "__dict__")
+        with pytest.raises(AttributeError):
+            obj.unknown_attribute = 1
+
+
+def test_undefined_series():
+    pump = Pump("Test", "Empty")
+    assert pump.flow is None and pump.head is None
+    assert not hasattr(pump, "efficiency") and not hasattr(pump, "npshr")
+    with pytest.raises(ValueError, match="define_pumpcurve"):
+        pump.define_efficiency([50, 60])
+
+
+def test_efficiency_defaults_to_pump_curve_flow():
+    pump = Pump("Test", "Lists")
+    pump.define_pumpcurve([0, 10, 20], [30, 25, 15])
+    pump.define_efficiency([0, 60, 50])
+    np.testing.assert_array_equal(pump.efficiency_flow, [0, 10, 20])
+    assert isinstance(pump.efficiency, np.ndarray)
+    system = SystemCurve("System", [0, 10, 20], [5, 10, 25])
+    np.testing.assert_array_equal(system.head, [5, 10, 25])
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from dispatch import DispatchTable
+from operating_point import solve_speed
+from parameters import SystemCurve
+from station import PumpStation
+
+
+def test_single_pump_matches_solve_speed(pump, system):
+    table = DispatchTable.from_station([pump], system, n_flows=101, POR=False)
+    expected = solve_speed(pump, system, table.flows, min_speed=50)
+    feasible = np.isfinite(table.speed[0])
+    assert np.count_nonzero(feasible) > 20
+    np.testing.assert_array_equal(feasible[1:], np.isfinite(expected["Speed"][1:]))
+    np.testing.assert_allclose(
+        table.speed[0, feasible], expected["Speed"][feasible], rtol=2e-3
+    )
+    np.testing.assert_allclose(
+        table.power[0, feasible], expected["Power"][feasible], rtol=1e-2
+    )
+
+
+def test_identical_pumps_pick_the_cheapest_combination(pump, system):
+    station = PumpStation("Station", [pump, pump, pump], speeds=[100, 100, 0])
+    table = DispatchTable.from_station(
+        station, system, n_flows=61, max_flow=3 * pump.flow.max(), POR=False
+    )
+    assert len(table.combinations) == 7
+    flows = table.flows
+    # brute force: n identical pumps share the flow equally at the system head, so
+    # each pump works against the system curve with its flows divided by n
+    brute_force = np.full((3, len(flows)), np.nan)
+    for n_running in (1, 2, 3):
+        shared = SystemCurve("Shared", system.flow / n_running, system.head)
+        result = solve_speed(pump, shared, flows / n_running, min_speed=50)
+        brute_force[n_running - 1] = n_running * result["Power"]
+    best_power = table.power[table.best, np.arange(len(flows))]
+    decided = table.best >= 0
+    np.testing.assert_array_equal(
+        decided[1:], np.any(np.isfinite(brute_force), axis=0)[1:]
+    )
+    np.testing.assert_allclose(
+        best_power[decided], np.nanmin(brute_force[:, decided], axis=0), rtol=1e-2
+    )
+    n_running = np.array([len(table.combinations[i]) for i in table.best[decided]])
+    expected = np.nanargmin(brute_force[:, decided], axis=0) + 1
+    close = np.sort(brute_force[:, decided], axis=0)
+    ambiguous = np.abs(close[1] - close[0]) < 1e-2 * close[0]
+    np.testing.assert_array_equal(n_running[~ambiguous], expected[~ambiguous])
+
+
+def test_POR_and_NPSH_limits_remove_points(pump, system):
+    free = DispatchTable.from_station([pump], system, n_flows=51, POR=False)
+    limited = DispatchTable.from_station([pump], system, n_flows=51, npsha=1e-3)
+    assert np.count_nonzero(np.isfinite(limited.power)) == 0
+    POR_only = DispatchTable.from_station([pump], system, n_flows=51)
+    assert (
+        0
+        < np.count_nonzero(np.isfinite(POR_only.power))
+        < np.count_nonzero(np.isfinite(free.power))
+    )
+
+
+def test_lookup(pump, system):
+    table = DispatchTable.from_station([pump, pump], system, n_flows=101, POR=False)
+    index = np.flatnonzero(table.best >= 0)[5]
+    row = table.best[index]
+    flow = table.flows[index]
+    result = table.lookup([0.0, flow, 1e9])
+    np.testing.assert_array_equal(result["Unmet"], [False, False, True])
+    assert result["Speed"][0] == result["Power"][0] == 0
+    assert result["Combination"][1] == row and result["Combination"][2] == -1
+    assert result["Speed"][1] == pytest.approx(table.speed[row, index])
+    assert table.best[index + 1] == row
+    middle = table.lookup([0.5 * (table.flows[index] + table.flows[index + 1])])
+    assert middle["Power"][0] == pytest.approx(
+        0.5 * (table.power[row, index] + table.power[row, index + 1])
+    )
+
+
+def test_series_station_is_rejected(pump, system):
+    station = PumpStation("Station", [pump, pump], arrangement="series")
+    with pytest.raises(ValueError, match="parallel"):
+        DispatchTable.from_station(station, system)
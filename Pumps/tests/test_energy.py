@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from energy import simulate_energy, simulate_energy_stream
+from operating_point import solve_duty_point, solve_speed
+
+
+@pytest.fixture
+def demand(pump, system):
+    rng = np.random.default_rng(0)
+    max_flow = solve_duty_point(pump, system)["Flow"][0]
+    demand = rng.uniform(0.3, 0.95, 1000) * max_flow
+    demand[::50] = 0.0  # pump stopped
+    return demand
+
+
+def test_energy_matches_solve_speed(pump, system, demand):
+    result = simulate_energy(pump, system, demand, timestep=0.5, tariff=0.2)
+    running = demand > 0
+    expected = solve_speed(pump, system, demand[running])["Power"] / (0.95 * 0.97)
+    np.testing.assert_allclose(result["Input Power"][running], expected)
+    assert np.all(result["Energy"][~running] == 0)
+    assert result["Total Energy"] == pytest.approx(np.sum(expected) * 0.5)
+    assert result["Total Cost"] == pytest.approx(result["Total Energy"] * 0.2)
+    assert result["Unmet Timesteps"] == 0
+
+
+def test_unmet_demand_makes_totals_nan(pump, system, demand):
+    demand = demand.copy()
+    demand[3] = 10 * np.max(pump.flow)
+    result = simulate_energy(pump, system, demand, tariff=0.2)
+    assert result["Unmet Timesteps"] == 1
+    assert np.isnan(result["Total Energy"]) and np.isnan(result["Total Cost"])
+    assert result["Met Energy"] == pytest.approx(np.nansum(result["Energy"]))
+
+
+def test_stream_matches_full_simulation(pump, system, demand):
+    tariff = np.linspace(0.1, 0.3, len(demand))
+    full = simulate_energy(pump, system, demand, tariff=tariff)
+    chunks = np.array_split(demand, 7)
+    streamed = simulate_energy_stream(pump, system, iter(chunks), tariff=tariff)
+    assert streamed["Timesteps"] == len(demand)
+    for key in ("Total Energy", "Total Cost", "Met Energy", "Met Cost"):
+        assert streamed[key] == pytest.approx(full[key])
+    assert streamed["Peak Input Power"] == pytest.approx(np.nanmax(full["Input Power"]))
+
+    tariff_chunks = np.array_split(tariff, 7)
+    per_chunk = simulate_energy_stream(pump, system, chunks, tariff=tariff_chunks)
+    assert per_chunk["Total Cost"] == pytest.approx(full["Total Cost"])
+
+
+def test_stream_rejects_mismatched_tariff(pump, system, demand):
+    chunks = np.array_split(demand, 4)
+    with pytest.raises(ValueError, match="fewer chunks"):
+        simulate_energy_stream(pump, system, chunks, tariff=[0.1, 0.2])
+    with pytest.raises(ValueError, match="expected"):
+        simulate_energy_stream(pump, system, chunks, tariff=[[0.1]] * 4)
+    with pytest.raises(ValueError, match="timesteps"):
+        simulate_energy_stream(pump, system, chunks, tariff=np.ones(len(demand) + 1))
@@ -0,0 +1,32 @@
+import numpy as np
+
+
+def test_fit_is_cached(pump):
+    first = pump.fit_curve("flow", "head")
+    assert pump.fit_curve("flow", "head") is first
+    assert pump.fit_cache_info() == {"Hits": 1, "Misses": 1, "Size": 1}
+
+
+def test_fit_matches_polyfit(pump):
+    expected = np.polyfit(pump.flow, pump.head, 3)
+    np.testing.assert_allclose(pump.fit_curve("flow", "head").coeffs, expected)
+
+
+def test_define_invalidates_only_changed_series(pump):
+    pump.fit_curve("flow", "head")
+    efficiency_fit = pump.fit_curve("efficiency_flow", "efficiency")
+    pump.define_pumpcurve(pump.flow, pump.head * 2)
+    assert pump.fit_cache_info()["Size"] == 1
+    assert pump.fit_curve("efficiency_flow", "efficiency") is efficiency_fit
+    np.testing.assert_allclose(
+        pump.fit_curve("flow", "head").coeffs,
+        np.polyfit(pump.flow, pump.head, 3),
+    )
+
+
+def test_seed_fit_skips_fitting(pump):
+    pump.seed_fit([1.0, 2.0, 3.0, 4.0])
+    fit = pump.fit_curve("flow", "head")
+    assert isinstance(fit, np.poly1d)
+    np.testing.assert_array_equal(fit.coeffs, [1.0, 2.0, 3.0, 4.0])
+    assert pump.fit_cache_info()["Misses"] == 0
@@ -0,0 +1,86 @@
+import math
+
+import numpy as np
+import pytest
+
+from hydraulics import PipeSegment, friction_factor, friction_head, system_head_grid
+from parameters import SystemCurve
+
+SEGMENTS = [
+    PipeSegment(100, 200, roughness=0.1, fittings=[0.5, 0.3]),
+    PipeSegment(50, 150, roughness=0.05, c_factor=120, fittings=1.0),
+]
+
+
+def darcy_loss(segment, flow, roughness_factor=1.0):
+    """scalar Darcy-Weisbach and fitting loss through one segment"""
+    diameter = segment.diameter / 1000
+    velocity = flow / 1000 / (math.pi * diameter**2 / 4)
+    reynolds = velocity * diameter / 1.004e-6
+    relative_roughness = roughness_factor * segment.roughness / 1000 / diameter
+    friction = 0.25 / math.log10(relative_roughness / 3.7 + 5.74 / reynolds**0.9) ** 2
+    velocity_head = velocity**2 / (2 * 9.81)
+    return (friction * segment.length / diameter + segment.k) * velocity_head
+
+
+def colebrook(reynolds, relative_roughness):
+    """Darcy friction factor solved from the Colebrook equation by iteration"""
+    friction = 0.02
+    for _ in range(50):
+        friction = (
+            -2
+            * math.log10(
+                relative_roughness / 3.7 + 2.51 / (reynolds * math.sqrt(friction))
+            )
+        ) ** -2
+    return friction
+
+
+def test_friction_factor():
+    assert friction_factor(1000, 0.001) == pytest.approx(0.064)
+    for reynolds in (1e4, 1e5, 1e6):
+        for relative_roughness in (1e-5, 5e-4, 1e-2):
+            assert friction_factor(reynolds, relative_roughness) == pytest.approx(
+                colebrook(reynolds, relative_roughness), rel=0.03
+            )
+
+
+def test_darcy_weisbach_matches_scalar_calculation():
+    flows = np.array([0.0, 5.0, 30.0, 80.0])
+    losses = friction_head(SEGMENTS, flows)
+    assert losses[0] == 0
+    for flow, loss in zip(flows[1:], losses[1:]):
+        expected = sum(darcy_loss(segment, flow) for segment in SEGMENTS)
+        assert loss == pytest.approx(expected)
+
+
+def test_hazen_williams():
+    segment = PipeSegment(100, 200, c_factor=130)
+    loss = friction_head([segment], 30.0, method="hazen-williams")
+    assert loss == pytest.approx(10.67 * 100 * 0.03**1.852 / (130**1.852 * 0.2**4.8704))
+    with pytest.raises(ValueError, match="method"):
+        friction_head([segment], 30.0, method="manning")
+
+
+def test_grid_matches_each_scenario():
+    flows = np.linspace(0, 80, 9)
+    grid = system_head_grid(SEGMENTS, flows, [2.0, 5.0, 8.0], [1.0, 1.5])
+    assert grid["Head"].shape == (6, 9)
+    np.testing.assert_array_equal(grid["Static Head"], [2, 2, 5, 5, 8, 8])
+    for static_head, roughness_factor, head in zip(
+        grid["Static Head"], grid["Roughness Factor"], grid["Head"]
+    ):
+        np.testing.assert_allclose(
+            head, static_head + friction_head(SEGMENTS, flows, roughness_factor)
+        )
+
+
+def test_system_curve_builders():
+    flows = np.linspace(0, 80, 9)
+    system = SystemCurve.from_pipes("Rising main", SEGMENTS, flows, static_head=4.0)
+    np.testing.assert_allclose(system.head, 4.0 + friction_head(SEGMENTS, flows))
+    grid = system_head_grid(SEGMENTS, flows, [2.0, 5.0], [1.0, 2.0])
+    systems = SystemCurve.from_head_grid(grid, name="Scenario")
+    assert len(systems) == 4
+    assert systems[3].name == "Scenario (static 5 m, roughness x2)"
+    np.testing.assert_array_equal(systems[3].head, grid["Head"][3])
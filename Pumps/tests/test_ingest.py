@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from benchmarks import synthetic_curve_data, write_xylect_file
+from ingest import CURVE_SERIES, _collect_ingest, ingest_files, parse_curve_file
+from parameters import Pump, SystemCurve
+
+SYSTEM_FILE = Path(__file__).resolve().parent.parent / "system_curve.xlsx"
+
+
+@pytest.fixture
+def curve_files(tmp_path):
+    files = []
+    for seed in range(3):
+        filepath = tmp_path / f"pump_{seed}.xlsx"
+        write_xylect_file(filepath, synthetic_curve_data(10, seed=seed), f"Pump {seed}")
+        files.append(filepath)
+    broken = tmp_path / "broken.xlsx"
+    broken.write_bytes(b"not a spreadsheet")
+    return files + [broken]
+
+
+def test_pool_matches_serial_ingest(curve_files):
+    serial = ingest_files(curve_files, workers=1, records=True)
+    pooled = ingest_files(curve_files, workers=2, chunksize=1, records=True)
+    assert list(pooled["Results"]) == list(serial["Results"]) == curve_files[:3]
+    for filepath, record in serial["Results"].items():
+        for series in CURVE_SERIES:
+            np.testing.assert_array_equal(
+                pooled["Results"][filepath][series], record[series]
+            )
+    assert list(pooled["Errors"]) == list(serial["Errors"]) == curve_files[3:]
+
+
+def test_ingest_returns_pumps(curve_files):
+    ingested = ingest_files(curve_files[:3], workers=1)
+    for filepath, pump in ingested["Results"].items():
+        assert isinstance(pump, Pump)
+        np.testing.assert_array_equal(pump.head, parse_curve_file(filepath)["head"])
+
+
+def test_ingest_system_curve():
+    ingested = ingest_files([SYSTEM_FILE], kind="system", workers=1)
+    system = ingested["Results"][SYSTEM_FILE]
+    assert isinstance(system, SystemCurve) and system.name == "system_curve"
+    assert len(system.flow) == len(system.head) > 0
+
+
+def test_conversion_errors_are_collected():
+    good = {
+        "Make": "Test",
+        "Model": "Good",
+        "Motor": None,
+        "Impeller": None,
+        **{series: np.arange(4.0) for series in CURVE_SERIES},
+    }
+    bad = dict(good, Model="Bad", head=np.arange(3.0))
+    outputs = [("good", good, None), ("bad", bad, None), ("failed", None, "OSError")]
+    ingested = _collect_ingest(outputs, "xylect", records=False)
+    assert list(ingested["Results"]) == ["good"]
+    assert ingested["Errors"]["failed"] == "OSError"
+    assert ingested["Errors"]["bad"].startswith("ValueError")
@@ -0,0 +1,61 @@
+import json
+import pstats
+
+import pytest
+
+from instrumentation import instrument, profile
+
+
+@instrument
+def inner(values):
+    return [value * 2 for value in values]
+
+
+@instrument
+def outer(n):
+    return sum(sum(inner(range(1000))) for _ in range(n))
+
+
+def test_no_recording_outside_profile():
+    with profile() as stats:
+        pass
+    outer(2)
+    assert stats.as_dict() == {}
+
+
+def test_counts_and_own_time():
+    with profile() as stats:
+        outer(3)
+        outer(2)
+    recorded = stats.as_dict()
+    assert recorded["outer"]["Calls"] == 2
+    assert recorded["inner"]["Calls"] == 5
+    outer_stats = recorded["outer"]
+    assert outer_stats["Own Time"] == pytest.approx(
+        outer_stats["Cumulative Time"] - recorded["inner"]["Cumulative Time"]
+    )
+    assert list(recorded)[0] == "outer"  # slowest cumulative time first
+
+
+def test_pump_methods_are_instrumented(pump):
+    with profile() as stats:
+        pump.POR()
+    recorded = stats.as_dict()
+    assert recorded["Pump.POR"]["Calls"] == 1
+    assert recorded["Pump.BEP"]["Calls"] == 1
+
+
+def test_allocations_recorded():
+    with profile(allocations=True) as stats:
+        inner(range(10000))
+    assert stats.as_dict()["inner"]["Allocated Bytes"] > 0
+
+
+def test_dump_json_and_pstats(tmp_path):
+    with profile() as stats:
+        outer(1)
+    stats.dump_json(tmp_path / "profile.json")
+    assert json.loads((tmp_path / "profile.json").read_text())["inner"]["Calls"] == 1
+    stats.dump_pstats(tmp_path / "profile.pstats")
+    loaded = pstats.Stats(str(tmp_path / "profile.pstats"))
+    assert loaded.total_calls == 2
@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks import LAZY_MODULES, time_startup
+
+COMPUTE_MODULES = (
+    "parameters",
+    "operating_point",
+    "energy",
+    "catalog",
+    "ingest",
+    "selection",
+    "batch",
+    "models",
+    "lookup",
+    "station",
+    "dispatch",
+    "npsh",
+    "hydraulics",
+    "uncertainty",
+    "telemetry",
+    "persistence",
+)
+
+
+def test_compute_modules_do_not_import_plotting_or_pandas():
+    script = (
+        "import json, sys\n"
+        f"import {', '.join(COMPUTE_MODULES)}\n"
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert json.loads(output) == []
+
+
+def test_time_startup_reports_lazy_modules():
+    startup = time_startup(repeat=1)
+    assert startup["Lazy Modules Loaded"] == []
+    assert startup["Min"] > 0
+    loaded = time_startup(modules=("reporting",), repeat=1)
+    assert loaded["Lazy Modules Loaded"] == ["matplotlib"]
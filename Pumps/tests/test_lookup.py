@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from lookup import QUANTITIES, PumpTable
+from operating_point import shaft_power
+
+
+@pytest.fixture
+def table(pump):
+    return PumpTable.from_pump(pump, n_speeds=26, n_flows=101)
+
+
+def test_grid_points_match_affinity_scaled_curves(pump, table):
+    speeds, flows = table.speeds, table.flows
+    for row in (0, 10, 25):
+        ratio = speeds[row] / 100
+        reduced = flows / ratio
+        in_range = (reduced >= pump.flow.min()) & (reduced <= pump.flow.max())
+        head = ratio**2 * pump.fit_curve("flow", "head")(reduced[in_range])
+        np.testing.assert_allclose(table.values[0, row, in_range], head)
+        assert np.all(np.isnan(table.values[0, row, ~in_range]))
+
+
+def test_query_matches_direct_evaluation(pump, table):
+    rng = np.random.default_rng(0)
+    speeds = rng.uniform(60, 100, 200)
+    flows = rng.uniform(0.1, 0.5, 200) * pump.flow.max() * speeds / 100
+    ratio = speeds / 100
+    head = ratio**2 * pump.fit_curve("flow", "head")(flows / ratio)
+    efficiency = pump.fit_curve("efficiency_flow", "efficiency")(flows / ratio)
+    looked_up = table.lookup(speeds, flows)
+    assert list(looked_up) == list(QUANTITIES)
+    np.testing.assert_allclose(looked_up["head"], head, rtol=2e-3)
+    np.testing.assert_allclose(looked_up["efficiency"], efficiency, rtol=5e-3)
+    np.testing.assert_allclose(
+        looked_up["power"], shaft_power(flows, head, efficiency), rtol=1e-2
+    )
+    scalar = [table.query(float(s), float(f)) for s, f in zip(speeds, flows)]
+    np.testing.assert_allclose(scalar, table.query(speeds, flows))
+
+
+def test_query_outside_grid_is_nan(table):
+    assert np.isnan(table.query(40.0, 1.0))
+    assert np.isnan(table.query(80.0, -1.0))
+    assert np.all(np.isnan(table.query([101.0, 80.0], [1.0, 1e9])))
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_round_trip(table, tmp_path, mmap):
+    filepath = tmp_path / "pump.table"
+    table.save(filepath)
+    loaded = PumpTable.load(filepath, mmap=mmap)
+    np.testing.assert_array_equal(loaded.values, table.values)
+    np.testing.assert_array_equal(loaded.flows, table.flows)
+    flow = float(table.flows[30])
+    assert np.isfinite(table.query(75.0, flow))
+    assert loaded.query(75.0, flow) == table.query(75.0, flow)
+
+
+def test_load_rejects_other_schema(table, tmp_path):
+    filepath = tmp_path / "pump.table"
+    table.save(filepath)
+    data = np.fromfile(filepath, dtype=np.float64)
+    data[0] = 99
+    data.tofile(filepath)
+    with pytest.raises(ValueError, match="schema version"):
+        PumpTable.load(filepath)
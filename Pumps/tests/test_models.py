@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from batch import piecewise_rows, stack_piecewise
+from models import LinearModel, PchipModel, PolynomialModel
+
+X = np.array([0.0, 1.0, 2.5, 3.0, 4.5, 6.0, 8.0])
+Y = np.array([10.0, 9.8, 9.0, 8.2, 6.0, 3.5, 0.0])
+
+
+def test_pchip_interpolates_without_overshoot():
+    curve = PchipModel().fit(X[::-1], Y[::-1])
+    np.testing.assert_allclose(curve(X), Y)
+    x = np.linspace(X[0], X[-1], 2001)
+    assert np.all(np.diff(curve(x)) <= 1e-12)  # monotone data stays monotone
+    step = PchipModel().fit([0, 1, 2, 3], [0, 0, 1, 1])
+    values = step(np.linspace(0, 3, 301))
+    assert values.min() >= 0 and values.max() <= 1
+
+
+def test_linear_matches_interp():
+    curve = LinearModel().fit(X, Y)
+    x = np.linspace(X[0], X[-1], 101)
+    np.testing.assert_allclose(curve(x), np.interp(x, X, Y))
+    assert curve(-1.0) == pytest.approx(Y[0] - (Y[1] - Y[0]))  # extrapolated
+
+
+@pytest.mark.parametrize("model", [PchipModel(), LinearModel()])
+def test_deriv_matches_finite_difference(model):
+    curve = model.fit(X, Y)
+    x = np.linspace(0.1, 7.9, 50)
+    x = x[np.min(np.abs(x[:, np.newaxis] - X), axis=1) > 1e-3]
+    numerical = (curve(x + 1e-6) - curve(x - 1e-6)) / 2e-6
+    np.testing.assert_allclose(curve.deriv()(x), numerical, rtol=1e-5, atol=1e-6)
+
+
+def test_maximum_matches_dense_search():
+    efficiency = PchipModel().fit(X, [0, 40, 70, 78, 74, 50, 10])
+    flow, best = efficiency.maximum(0.5, 7.5)
+    x = np.linspace(0.5, 7.5, 700001)
+    assert best == pytest.approx(efficiency(x).max(), abs=1e-9)
+    assert efficiency(flow) == pytest.approx(best)
+
+
+def test_fits_are_cached_per_model(pump):
+    polynomial = pump.fit_curve()
+    pump.set_curve_model(PchipModel())
+    pchip = pump.fit_curve()
+    np.testing.assert_allclose(pchip(pump.flow), pump.head)
+    assert pump.set_curve_model(None).fit_curve() is polynomial
+    assert pump.fit_curve(deg=2).order == 2
+    assert pump.fit_cache_info()["Size"] == 3
+    assert repr(PolynomialModel(2)) == "PolynomialModel(deg=2)"
+
+
+def test_stacked_piecewise_matches_each_curve():
+    curves = [
+        PchipModel().fit(X, Y),
+        LinearModel().fit(X[:3], Y[:3]),
+        PchipModel().fit(X[2:], Y[2:] ** 2),
+    ]
+    breaks, coeffs = stack_piecewise(curves)
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        x = rng.uniform(-1, 9, len(curves))
+        np.testing.assert_allclose(
+            piecewise_rows(breaks, coeffs, x),
+            [curve(value) for curve, value in zip(curves, x)],
+        )
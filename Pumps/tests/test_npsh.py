@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from npsh import npsh_available, npsh_margin, vapour_pressure
+
+
+def test_vapour_pressure_reference_values():
+    assert vapour_pressure(20) == pytest.approx(2.34, abs=0.02)
+    assert vapour_pressure(100) == pytest.approx(101.3, abs=0.3)
+
+
+def test_npsh_available_broadcasts():
+    levels = np.array([2.0, 1.0, 0.0])
+    npsha = npsh_available(levels, temperature=[20, 20, 60], suction_losses=0.5)
+    expected = (101.325 - vapour_pressure(20)) * 1000 / 9810 + levels - 0.5
+    np.testing.assert_allclose(npsha[:2], expected[:2])
+    assert npsha[2] < expected[2]
+
+
+def test_margin_matches_per_sample_loop(pump):
+    rng = np.random.default_rng(0)
+    speeds = rng.uniform(50, 100, 500)
+    flows = rng.uniform(0, 1.1, 500) * pump.flow.max() * speeds / 100
+    levels = rng.uniform(-8, 2, 500)
+    result = npsh_margin(pump, flows, speeds, level=levels, min_ratio=1.1)
+    npshr_fit = pump.fit_curve("npshr_flow", "npshr")
+    for i in range(500):
+        ratio = speeds[i] / 100
+        reduced_flow = flows[i] / ratio
+        if not pump.npshr_flow.min() <= reduced_flow <= pump.npshr_flow.max():
+            assert result["Outside Data"][i] and not result["Violation"][i]
+            assert np.isnan(result["NPSHr"][i])
+            continue
+        npshr = ratio**2 * npshr_fit(reduced_flow)
+        npsha = npsh_available(levels[i])
+        assert result["NPSHr"][i] == pytest.approx(npshr)
+        assert result["Margin"][i] == pytest.approx(npsha - npshr)
+        assert result["Violation"][i] == (npsha - npshr < 0 or npsha / npshr < 1.1)
+    assert result["Violation"].any() and not result["Violation"].all()
+
+
+def test_margin_without_npshr_raises(system):
+    with pytest.raises(AttributeError):
+        npsh_margin(system, [1.0])
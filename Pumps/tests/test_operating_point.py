@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from operating_point import (
+    bisect_all_roots,
+    bisect_roots,
+    shaft_power,
+    solve_duty_point,
+    solve_speed,
+)
+from parameters import Pump, SystemCurve
+
+
+def brute_force_crossing(pump, system, speed, n=200001):
+    """highest flow where the affinity scaled pump curve crosses the system curve,
+    found by sampling a dense flow grid"""
+    ratio = speed / 100
+    pump_poly = pump.fit_curve("flow", "head")
+    system_poly = system.fit_curve("flow", "head")
+    flow = np.linspace(ratio * np.min(pump.flow), ratio * np.max(pump.flow), n)
+    difference = ratio**2 * pump_poly(flow / ratio) - system_poly(flow)
+    crossings = np.flatnonzero(np.diff(np.signbit(difference)))
+    if not len(crossings):
+        return np.nan
+    return flow[crossings[-1]]
+
+
+def test_bisect_roots_vectorised():
+    roots = bisect_roots(lambda x: x**2 - 2, [0, 0, 3], [2, 5, 4])
+    np.testing.assert_allclose(roots[:2], np.sqrt(2))
+    assert np.isnan(roots[2])
+
+
+def test_bisect_all_roots_highest_first():
+    roots = bisect_all_roots(lambda x: (x - 1) * (x - 3) * (x - 7), 0, 10)
+    np.testing.assert_allclose(roots, [7, 3, 1], atol=1e-8)
+    none = bisect_all_roots(lambda x: x**2 + 1, [0, 1], [2, 3])
+    assert none.shape == (2, 1) and np.all(np.isnan(none))
+
+
+def test_duty_point_matches_brute_force(pump, system):
+    speeds = np.array([100, 95, 90, 85, 80, 75])
+    duty = solve_duty_point(pump, system, speeds)
+    tolerance = 1e-4 * np.max(pump.flow)
+    for speed, flow in zip(speeds, duty["Flow"]):
+        assert flow == pytest.approx(
+            brute_force_crossing(pump, system, speed), abs=tolerance
+        )
+    np.testing.assert_allclose(
+        duty["Head"], system.fit_curve("flow", "head")(duty["Flow"])
+    )
+
+
+def test_duty_point_without_crossing_is_nan(pump, system):
+    duty = solve_duty_point(pump, system, [100, 5])
+    assert np.isfinite(duty["Flow"][0])
+    assert np.isnan(duty["Flow"][1]) and not duty["In POR"][1]
+
+
+def test_drooping_curve_returns_stable_crossing():
+    flow = np.linspace(0, 100, 21)
+    pump = Pump("Test", "Drooping")
+    pump.define_pumpcurve(flow, 30 + 0.2 * flow - 0.004 * flow**2)
+    system = SystemCurve("Flat", flow, np.full_like(flow, 31.0))
+    duty = solve_duty_point(pump, system)
+    lower, upper = (0.2 - np.sqrt(0.024)) / 0.008, (0.2 + np.sqrt(0.024)) / 0.008
+    assert duty["Flow"][0] == pytest.approx(upper, abs=1e-6)
+    np.testing.assert_allclose(duty["All Flows"][0], [upper, lower], atol=1e-6)
+    assert np.isnan(duty["Efficiency"][0]) and not duty["In POR"][0]
+
+
+def test_solve_speed_inverts_duty_point(pump, system):
+    speeds = np.array([100, 92.5, 85, 80])
+    duty = solve_duty_point(pump, system, speeds)
+    result = solve_speed(pump, system, duty["Flow"])
+    np.testing.assert_allclose(result["Speed"], speeds, rtol=1e-6)
+    np.testing.assert_allclose(
+        result["Power"],
+        shaft_power(result["Flow"], result["Head"], result["Efficiency"]),
+    )
+
+
+def test_solve_speed_infeasible_demand_is_nan(pump, system):
+    too_high = 1.5 * solve_duty_point(pump, system)["Flow"][0]
+    result = solve_speed(pump, system, [too_high, 0.5 * too_high])
+    assert np.isnan(result["Speed"][0])
+    assert np.isfinite(result["Speed"][1])
+
+
+def test_solve_speed_keeps_demand_shape(pump, system):
+    flows = np.full((3, 4), solve_duty_point(pump, system, 90)["Flow"][0])
+    result = solve_speed(pump, system, flows)
+    assert result["Speed"].shape == (3, 4)
+    np.testing.assert_allclose(result["Speed"], 90, rtol=1e-6)
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from benchmarks import synthetic_pump, synthetic_system
+from ingest import CURVE_SERIES
+from models import PchipModel
+from npz_store import read_npz, write_npz
+from parameters import Pump
+from persistence import (
+    DERIVED_FIELDS,
+    PERSISTENCE_SCHEMA_VERSION,
+    load_derived,
+    load_pump,
+    load_pumps,
+    save_pump,
+    save_pumps,
+)
+from station import PumpStation
+
+
+@pytest.fixture
+def collection():
+    pumps = {
+        f"pump {seed}": synthetic_pump(n_points=10 + seed, seed=seed)
+        for seed in range(6)
+    }
+    pumps["pump 2"].set_curve_model(PchipModel())
+    no_efficiency = Pump("Test", "Head only", impeller="250 mm")
+    no_efficiency.define_pumpcurve([0, 10, 20, 30], [20, 19, 16, 11])
+    pumps[7] = no_efficiency
+    pumps["system"] = synthetic_system(pumps["pump 0"])
+    return pumps
+
+
+def test_round_trip(collection, tmp_path):
+    filepath = tmp_path / "pumps.npz"
+    save_pumps(filepath, collection)
+    loaded = load_pumps(filepath)
+    assert list(loaded) == list(collection)
+    for key, pump in collection.items():
+        restored = loaded[key]
+        assert type(restored) is type(pump)
+        assert repr(restored) == repr(pump)
+        assert repr(restored.curve_model) == repr(pump.curve_model)
+        for series in CURVE_SERIES:
+            assert hasattr(restored, series) == hasattr(pump, series)
+            if hasattr(pump, series) and getattr(pump, series) is not None:
+                np.testing.assert_array_equal(
+                    getattr(restored, series), getattr(pump, series)
+                )
+    assert loaded[7].impeller == "250 mm" and loaded["pump 1"].motor is None
+
+
+def test_fits_load_without_refitting(collection, tmp_path):
+    filepath = tmp_path / "pumps.npz"
+    save_pumps(filepath, collection)
+    loaded = load_pumps(filepath)
+    for key, pump in loaded.items():
+        if isinstance(pump.curve_model, PchipModel):
+            continue
+        assert pump.fit_cache_info()["Size"] > 0
+        np.testing.assert_array_equal(
+            pump.fit_curve().coeffs, collection[key].fit_curve().coeffs
+        )
+        if hasattr(pump, "efficiency"):
+            np.testing.assert_allclose(pump.BEP(), collection[key].BEP())
+            assert pump.POR() == pytest.approx(collection[key].POR())
+        assert pump.fit_cache_info()["Misses"] == 0
+    pchip = loaded["pump 2"]
+    np.testing.assert_allclose(pchip.fit_curve()(pchip.flow), pchip.head)
+
+
+def test_load_derived_matches_each_pump(collection, tmp_path):
+    filepath = tmp_path / "pumps.npz"
+    save_pumps(filepath, collection)
+    derived = load_derived(filepath)
+    assert derived["Keys"] == list(collection)
+    for i, (key, pump) in enumerate(collection.items()):
+        values = [derived[field][i] for field in DERIVED_FIELDS]
+        if not hasattr(pump, "efficiency") or key == "system":
+            assert np.all(np.isnan(values))
+            continue
+        POR = pump.POR()
+        expected = list(pump.BEP()) + [
+            POR["Upper Flow"],
+            POR["Upper Head"],
+            POR["Lower Flow"],
+            POR["Lower Head"],
+        ]
+        np.testing.assert_allclose(values, expected)
+
+
+def test_key_types_are_preserved(tmp_path):
+    pumps = [synthetic_pump(seed=1), synthetic_pump(seed=2)]
+    filepath = tmp_path / "pumps.npz"
+    save_pumps(filepath, pumps)
+    assert list(load_pumps(filepath)) == [0, 1]
+    save_pumps(filepath, {1: pumps[0], "1": pumps[1], np.int64(3): pumps[0]})
+    assert list(load_pumps(filepath)) == [1, "1", 3]
+    assert load_derived(filepath)["Keys"] == [1, "1", 3]
+
+
+def test_unsupported_objects_and_keys_are_rejected(pump, tmp_path):
+    filepath = tmp_path / "pumps.npz"
+    with pytest.raises(ValueError, match="PumpStation"):
+        save_pumps(filepath, {"station": PumpStation("Station", [pump, pump])})
+    with pytest.raises(ValueError, match="keys"):
+        save_pumps(filepath, {(1, 2): pump})
+    assert not filepath.exists()
+
+
+def test_single_pump_and_schema_check(pump, tmp_path):
+    filepath = tmp_path / "pump.npz"
+    save_pump(filepath, pump)
+    np.testing.assert_array_equal(load_pump(filepath).head, pump.head)
+    arrays = read_npz(filepath, PERSISTENCE_SCHEMA_VERSION)
+    del arrays["schema_version"]
+    write_npz(filepath, arrays, schema_version=1)
+    with pytest.raises(ValueError, match="schema version"):
+        load_pumps(filepath)
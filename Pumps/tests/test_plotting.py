@@ -0,0 +1,46 @@
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from matplotlib.collections import LineCollection
+
+from operating_point import solve_duty_point
+
+
+@pytest.fixture(autouse=True)
+def agg_backend():
+    backend = matplotlib.get_backend()
+    matplotlib.use("Agg")
+    yield
+    plt.close("all")
+    matplotlib.use(backend)
+
+
+def test_speed_curves_are_one_collection(pump):
+    speeds = [90, 80, 70, 60, 50, 40]
+    pump.generate_plot().plot_speeds(speeds, BEP=True, POR="line")
+    collections = [
+        artist for artist in pump.ax1.collections if isinstance(artist, LineCollection)
+    ]
+    assert len(collections) == 1
+    flows, heads = pump.generate_affinity_arrays(speeds)
+    segments = collections[0].get_segments()
+    assert len(segments) == len(speeds)
+    for segment, flow, head in zip(segments, flows, heads):
+        np.testing.assert_allclose(segment, np.column_stack([flow, head]))
+    assert collections[0].get_label() == "40-90% (6 speeds)"
+    pump.close_plot()
+
+
+def test_interactive_speed_updates_curve_and_duty(pump, system):
+    slider = pump.interactive_speed(speed=100, system=system)
+    pump.fig.canvas.draw()
+    slider.set_val(80)
+    lines = [line for line in pump.ax1.get_lines() if line.get_animated()]
+    speed_line, _, _, duty_marker = lines
+    flows, heads = pump.generate_affinity_arrays(80)
+    np.testing.assert_allclose(speed_line.get_xdata(), flows[0])
+    np.testing.assert_allclose(speed_line.get_ydata(), heads[0])
+    duty = solve_duty_point(pump, system, 80)
+    np.testing.assert_allclose(duty_marker.get_xdata(), duty["Flow"])
+    pump.close_plot()
@@ -0,0 +1,52 @@
+import matplotlib
+import matplotlib.pyplot as plt
+import pytest
+
+from benchmarks import synthetic_pump
+from parameters import Pump
+from reporting import render_report, render_reports
+
+
+@pytest.fixture
+def svg_backend():
+    backend = matplotlib.get_backend()
+    matplotlib.use("svg")
+    yield
+    matplotlib.use(backend)
+
+
+def test_render_report_saves_every_format(pump, tmp_path):
+    filepaths = render_report(
+        pump, tmp_path, name="a/b", formats=("png", "svg"), duty=(50, 20)
+    )
+    assert [path.name for path in filepaths] == ["a_b.png", "a_b.svg"]
+    assert all(path.stat().st_size > 0 for path in filepaths)
+    assert not plt.get_fignums()
+
+
+def test_render_reports_serial_keeps_backend(svg_backend, tmp_path):
+    pumps = [synthetic_pump(seed=1), synthetic_pump(seed=1), Pump("Broken", "Pump")]
+    reports = render_reports(pumps, tmp_path, workers=1, speeds=[80])
+    assert matplotlib.get_backend() == "svg"
+    assert list(reports["Results"]) == ["Synthetic Pump 1", "Synthetic Pump 1 (2)"]
+    assert list(reports["Errors"]) == ["Broken Pump"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "Synthetic Pump 1 _2_.png",
+        "Synthetic Pump 1.png",
+    ]
+    assert not plt.get_fignums()
+
+
+def test_render_reports_pool(tmp_path):
+    pumps = {"first": synthetic_pump(seed=1), "second": synthetic_pump(seed=2)}
+    duty = {"first": (40, 15)}
+    reports = render_reports(
+        pumps, tmp_path / "charts", workers=2, duty=duty, formats=("svg",)
+    )
+    assert not reports["Errors"]
+    assert {
+        key: [path.name for path in paths] for key, paths in reports["Results"].items()
+    } == {
+        "first": ["first.svg"],
+        "second": ["second.svg"],
+    }
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from benchmarks import synthetic_pump
+from models import PchipModel
+from selection import SelectionIndex
+
+MIN_SPEED, MAX_SPEED = 50, 100
+
+
+@pytest.fixture(scope="module")
+def pumps():
+    pumps = {f"pump {seed}": synthetic_pump(seed=seed) for seed in range(40)}
+    for seed in range(0, 40, 5):
+        pumps[f"pump {seed}"].set_curve_model(PchipModel())
+    return pumps
+
+
+def brute_force_query(pumps, duty_flow, duty_head, n_speeds=4001):
+    """checks every pump by sampling its affinity scaled head at the duty flow across
+    the speed range. Returns {key: speed} of the matching pumps and the keys too
+    close to a POR or speed limit to decide at the sampling resolution."""
+    ratios = np.linspace(MIN_SPEED / 100, MAX_SPEED / 100, n_speeds)
+    matches, undecided = {}, set()
+    for key, pump in pumps.items():
+        head_fit = pump.fit_curve("flow", "head")
+        POR = pump.POR()
+        flow_max = np.max(pump.flow)
+        difference = ratios**2 * head_fit(duty_flow / ratios) - duty_head
+        for i in np.flatnonzero(np.diff(np.signbit(difference))):
+            ratio = ratios[i]
+            flow_100 = duty_flow / ratio
+            margin = 1e-3 * flow_max
+            if (
+                abs(flow_100 - POR["Lower Flow"]) < margin
+                or abs(flow_100 - POR["Upper Flow"]) < margin
+                or i == 0
+                or i == n_speeds - 2
+            ):
+                undecided.add(key)
+            elif POR["Lower Flow"] <= flow_100 <= POR["Upper Flow"]:
+                matches[key] = 100 * ratio
+    return matches, undecided
+
+
+def duty_points(pumps, n, seed=0):
+    """duty points inside the POR of randomly chosen pumps at random speeds"""
+    rng = np.random.default_rng(seed)
+    keys = list(pumps)
+    points = []
+    for _ in range(n):
+        pump = pumps[keys[rng.integers(len(keys))]]
+        POR = pump.POR()
+        flow = rng.uniform(POR["Lower Flow"], POR["Upper Flow"])
+        ratio = rng.uniform(0.55, 1.0)
+        points.append((ratio * flow, ratio**2 * pump.fit_curve("flow", "head")(flow)))
+    return points
+
+
+def test_query_matches_brute_force(pumps):
+    index = SelectionIndex(pumps, min_speed=MIN_SPEED, max_speed=MAX_SPEED)
+    assert len(index) == len(pumps)
+    for duty_flow, duty_head in duty_points(pumps, 25):
+        result = index.query(duty_flow, duty_head)
+        matches, undecided = brute_force_query(pumps, duty_flow, duty_head)
+        assert set(result["Pumps"]) - undecided == set(matches) - undecided
+        assert matches or undecided
+        for key, speed in zip(result["Pumps"], result["Speed"]):
+            if key in matches:
+                assert speed == pytest.approx(matches[key], abs=0.05)
+        assert np.all(np.diff(result["Efficiency"]) <= 0)
+
+
+def test_query_efficiency_uses_each_pump_curve(pumps):
+    index = SelectionIndex(pumps, min_speed=MIN_SPEED, max_speed=MAX_SPEED)
+    duty_flow, duty_head = duty_points(pumps, 1, seed=3)[0]
+    result = index.query(duty_flow, duty_head)
+    for key, speed, efficiency in zip(*result.values()):
+        pump = pumps[key]
+        flow_100 = duty_flow * 100 / speed
+        expected = pump.fit_curve("efficiency_flow", "efficiency")(flow_100)
+        assert efficiency == pytest.approx(expected, rel=1e-6)
+
+
+def test_candidates_cover_matches(pumps):
+    index = SelectionIndex(pumps, grid_size=8)
+    for duty_flow, duty_head in duty_points(pumps, 10, seed=1):
+        candidates = {index.keys[i] for i in index.candidates(duty_flow, duty_head)}
+        assert set(index.query(duty_flow, duty_head)["Pumps"]) <= candidates
+
+
+def test_empty_index():
+    index = SelectionIndex([])
+    assert len(index) == 0
+    assert index.query(10.0, 10.0)["Pumps"] == []
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from benchmarks import synthetic_pump
+from operating_point import solve_duty_point
+from parameters import Pump
+from station import PumpStation, invert_head_curve
+
+
+def test_invert_head_curve_matches_fitted_curve(pump):
+    flows = np.linspace(0.1, 0.9, 9) * pump.flow.max()
+    for speed in (100, 80):
+        ratio = speed / 100
+        heads = ratio**2 * pump.fit_curve("flow", "head")(flows)
+        np.testing.assert_allclose(
+            invert_head_curve(pump, heads, speed, n_samples=4096),
+            ratio * flows,
+            rtol=1e-3,
+        )
+    assert np.isnan(invert_head_curve(pump, 10 * pump.head.max()))
+
+
+def test_identical_pumps_in_parallel_double_the_flow(pump):
+    station = PumpStation("Station", [pump, pump])
+    heads = np.linspace(station.head.min(), station.head.max(), 7)[1:-1]
+    station_flows = np.interp(heads, station.head[::-1], station.flow[::-1])
+    np.testing.assert_allclose(
+        station_flows, 2 * invert_head_curve(pump, heads), rtol=1e-3
+    )
+    # identical pumps share the load, so the station is as efficient as one pump
+    points = station.pump_operating_points(station_flows)
+    np.testing.assert_allclose(points["Flow"].sum(axis=0), station_flows, rtol=1e-3)
+    efficiency = pump.fit_curve("efficiency_flow", "efficiency")(station_flows / 2)
+    np.testing.assert_allclose(
+        np.interp(station_flows, station.efficiency_flow, station.efficiency),
+        efficiency,
+        rtol=1e-2,
+    )
+
+
+def test_identical_pumps_in_series_double_the_head(pump):
+    station = PumpStation(
+        "Station", [pump, pump], speeds=[90, 90], arrangement="series"
+    )
+    np.testing.assert_allclose(
+        station.head, 2 * 0.81 * pump.fit_curve("flow", "head")(station.flow / 0.9)
+    )
+    points = station.pump_operating_points(station.flow[10:20])
+    np.testing.assert_allclose(points["Head"].sum(axis=0), station.head[10:20])
+
+
+def test_standby_pump_is_left_out():
+    pumps = [synthetic_pump(seed=1), synthetic_pump(seed=2)]
+    station = PumpStation("Station", pumps, speeds=[100, 0])
+    np.testing.assert_array_equal(station.running, [0])
+    np.testing.assert_allclose(
+        station.head, pumps[0].fit_curve("flow", "head")(station.flow), rtol=1e-3
+    )
+    with pytest.raises(ValueError, match="running"):
+        station.set_speeds(0)
+    with pytest.raises(ValueError, match="arrangement"):
+        PumpStation("Station", pumps, arrangement="diagonal")
+
+
+def test_efficiency_cleared_when_a_pump_has_none(pump):
+    no_efficiency = Pump("Test", "No efficiency")
+    no_efficiency.define_pumpcurve(pump.flow, pump.head)
+    station = PumpStation("Station", [pump, no_efficiency], speeds=[100, 0])
+    station.fit_curve("efficiency_flow", "efficiency")
+    station.set_speeds([100, 100])
+    assert not hasattr(station, "efficiency")
+    assert all(key[0] != "efficiency_flow" for key in station._fit_cache)
+
+
+def test_station_duty_point(pump, system):
+    station = PumpStation("Station", [pump, pump])
+    single = solve_duty_point(pump, system)["Flow"][0]
+    assert solve_duty_point(station, system)["Flow"][0] > single
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from operating_point import shaft_power
+from telemetry import (
+    TELEMETRY_FIELDS,
+    _rolling_mean,
+    curve_deviation,
+    monitor_telemetry,
+    read_telemetry,
+)
+
+
+@pytest.fixture
+def telemetry(pump):
+    """on curve telemetry where the pump loses 10% of its head halfway through"""
+    rng = np.random.default_rng(0)
+    n = 3000
+    speed = rng.uniform(70, 100, n)
+    ratio = speed / 100
+    flow = rng.uniform(0.3, 0.9, n) * pump.flow.max() * ratio
+    head = ratio**2 * pump.fit_curve("flow", "head")(flow / ratio)
+    efficiency = pump.fit_curve("efficiency_flow", "efficiency")(flow / ratio)
+    head[n // 2 :] *= 0.9
+    return {
+        "Timestamp": np.arange(n),
+        "Speed": speed,
+        "Flow": flow,
+        "Head": head,
+        "Power": shaft_power(flow, head, efficiency),
+    }
+
+
+def split(telemetry, n_chunks):
+    return [
+        {field: values[index] for field, values in telemetry.items()}
+        for index in np.array_split(np.arange(len(telemetry["Speed"])), n_chunks)
+    ]
+
+
+def test_on_curve_samples_have_no_deviation(pump, telemetry):
+    deviation = curve_deviation(pump, telemetry)
+    half = len(telemetry["Speed"]) // 2
+    np.testing.assert_allclose(deviation["Head Deviation"][:half], 0, atol=1e-9)
+    np.testing.assert_allclose(deviation["Head Deviation"][half:], -10)
+    np.testing.assert_allclose(deviation["Efficiency Deviation"], 0, atol=1e-9)
+
+
+def test_rolling_mean_matches_brute_force():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=200)
+    values[rng.random(200) < 0.2] = np.nan
+    window = 7
+    means, carry = [], np.empty(0)
+    for chunk in np.array_split(values, 9):
+        chunk_means, carry = _rolling_mean(chunk, carry, window)
+        means.append(chunk_means)
+    means = np.concatenate(means)
+    for i in range(200):
+        expected = values[max(i - window + 1, 0) : i + 1]
+        if np.all(np.isnan(expected)):
+            assert np.isnan(means[i])
+        else:
+            assert means[i] == pytest.approx(np.nanmean(expected))
+
+
+def test_chunked_monitoring_matches_single_chunk(pump, telemetry):
+    whole = next(monitor_telemetry(pump, [telemetry], window=200))
+    chunks = list(monitor_telemetry(pump, split(telemetry, 7), window=200))
+    for field in ("Rolling Head Deviation", "Degraded"):
+        np.testing.assert_allclose(
+            np.concatenate([chunk[field] for chunk in chunks]), whole[field]
+        )
+    alerts = [alert for chunk in chunks for alert in chunk["Alerts"]]
+    assert alerts == whole["Alerts"]
+    assert len(alerts) == 1
+    # the rolling head deviation passes -5% halfway through the window
+    assert alerts[0][0] == len(telemetry["Speed"]) // 2 + 100
+
+
+def test_alert_clears_on_recovery(pump, telemetry):
+    telemetry["Head"][2500:] /= 0.9
+    results = list(monitor_telemetry(pump, split(telemetry, 3), window=100))
+    messages = [message for result in results for _, message in result["Alerts"]]
+    assert len(messages) == 2
+    assert messages[0].startswith("Degradation alert:")
+    assert messages[1] == "Degradation alert cleared"
+
+
+def test_read_csv_in_chunks(pump, telemetry, tmp_path):
+    pd = pytest.importorskip("pandas")
+    filepath = tmp_path / "telemetry.csv"
+    frame = pd.DataFrame({field.lower(): values for field, values in telemetry.items()})
+    frame["extra"] = 0
+    frame.to_csv(filepath, index=False)
+    chunks = list(read_telemetry(filepath, chunksize=1000))
+    assert len(chunks) == 3 and list(chunks[0]) == list(TELEMETRY_FIELDS)
+    for field in TELEMETRY_FIELDS:
+        np.testing.assert_allclose(
+            np.concatenate([chunk[field] for chunk in chunks]), telemetry[field]
+        )
+
+
+def test_read_parquet_in_chunks(telemetry, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    filepath = tmp_path / "telemetry.parquet"
+    table = pa.table({field.lower(): values for field, values in telemetry.items()})
+    pq.write_table(table, filepath)
+    chunks = list(read_telemetry(filepath, chunksize=1000))
+    for field in TELEMETRY_FIELDS:
+        np.testing.assert_allclose(
+            np.concatenate([chunk[field] for chunk in chunks]), telemetry[field]
+        )
+
+
+def test_unknown_file_type(tmp_path):
+    with pytest.raises(ValueError, match="csv or .parquet"):
+        next(read_telemetry(tmp_path / "telemetry.txt"))
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from operating_point import solve_duty_point
+from parameters import Pump, SystemCurve
+from uncertainty import ISO_9906_GRADES, monte_carlo_duty_point
+
+
+def scaled_pump(pump, flow_error, head_error):
+    """pump with its curve data scaled by fixed flow and head errors"""
+    scaled = Pump(pump.make, pump.model)
+    scaled.define_pumpcurve(pump.flow * (1 + flow_error), pump.head * (1 + head_error))
+    scaled.define_efficiency(pump.efficiency, pump.efficiency_flow * (1 + flow_error))
+    return scaled
+
+
+def fixed_grade(flow_error, head_error, efficiency_error=0.0):
+    return {
+        "Flow": (flow_error, flow_error),
+        "Head": (head_error, head_error),
+        "Efficiency": (efficiency_error, efficiency_error),
+    }
+
+
+def test_no_tolerance_matches_duty_point(pump, system):
+    result = monte_carlo_duty_point(pump, system, speed=90, n_samples=50, grade=None)
+    duty = solve_duty_point(pump, system, 90)
+    np.testing.assert_allclose(result["Flow"], duty["Flow"][0], atol=1e-5)
+    np.testing.assert_allclose(result["Efficiency"], duty["Efficiency"][0], rtol=1e-5)
+    assert result["Summary"]["POR Compliance"] == float(duty["In POR"][0])
+
+
+@pytest.mark.parametrize("flow_error, head_error", [(0.08, 0.05), (-0.08, -0.05)])
+def test_fixed_errors_match_scaled_curve(pump, system, flow_error, head_error):
+    result = monte_carlo_duty_point(
+        pump,
+        system,
+        n_samples=10,
+        grade=fixed_grade(flow_error, head_error, -0.05),
+    )
+    scaled = scaled_pump(pump, flow_error, head_error)
+    duty = solve_duty_point(scaled, system)
+    np.testing.assert_allclose(result["Flow"], duty["Flow"][0], atol=1e-5)
+    np.testing.assert_allclose(
+        result["Efficiency"], 0.95 * duty["Efficiency"][0], rtol=1e-5
+    )
+
+
+def test_samples_lie_within_the_grade_corners(pump, system):
+    result = monte_carlo_duty_point(pump, system, n_samples=20000, seed=0)
+    lowest = solve_duty_point(scaled_pump(pump, -0.08, -0.05), system)["Flow"][0]
+    highest = solve_duty_point(scaled_pump(pump, 0.08, 0.05), system)["Flow"][0]
+    assert np.all(result["Flow"] >= lowest - 1e-5)
+    assert np.all(result["Flow"] <= highest + 1e-5)
+    summary = result["Summary"]
+    assert summary["Flow"][5] < summary["Flow"][50] < summary["Flow"][95]
+    assert summary["POR Compliance"] == pytest.approx(np.mean(result["In POR"]))
+    assert summary["Unsolved"] == 0
+
+
+def test_system_tolerances_move_the_duty_point(pump, system):
+    result = monte_carlo_duty_point(
+        pump,
+        system,
+        n_samples=2000,
+        grade=None,
+        static_head_tolerance=1.0,
+        friction_tolerance=0.1,
+        distribution="normal",
+        seed=1,
+    )
+    duty_flow = solve_duty_point(pump, system)["Flow"][0]
+    assert np.ptp(result["Flow"]) > 0
+    assert result["Summary"]["Flow"][50] == pytest.approx(duty_flow, rel=1e-2)
+    np.testing.assert_allclose(
+        result["Head"], pump.fit_curve("flow", "head")(result["Flow"]), atol=1e-4
+    )
+
+
+def test_seed_is_reproducible(pump, system):
+    first = monte_carlo_duty_point(pump, system, n_samples=100, seed=5)
+    second = monte_carlo_duty_point(pump, system, n_samples=100, seed=5)
+    np.testing.assert_array_equal(first["Flow"], second["Flow"])
+
+
+def test_unsolved_samples(pump):
+    flow = np.linspace(0, pump.flow.max(), 10)
+    high = SystemCurve("High", flow, np.full_like(flow, 10 * pump.head.max()))
+    result = monte_carlo_duty_point(pump, high, n_samples=10)
+    assert result["Summary"]["Unsolved"] == 10
+    assert np.isnan(result["Summary"]["POR Compliance"])
+
+
+def test_unknown_grade_and_distribution(pump, system):
+    assert "2B" in ISO_9906_GRADES
+    with pytest.raises(ValueError, match="grade"):
+        monte_carlo_duty_point(pump, system, grade="4X")
+    with pytest.raises(ValueError, match="distribution"):
+        monte_carlo_duty_point(pump, system, distribution="triangular")
@@ -0,0 +1,166 @@
+import numpy as np
+
+from instrumentation import instrument
+from operating_point import bisect_all_roots
+
+# ISO 9906:2012 acceptance grade tolerances as (lower, upper) fractions of the
+# guaranteed flow, head and efficiency. Grades with no negative efficiency tolerance
+# are sampled at the guaranteed efficiency.
+ISO_9906_GRADES = {
+    "1U": {"Flow": (0.0, 0.10), "Head": (0.0, 0.06), "Efficiency": (0.0, 0.0)},
+    "1E": {"Flow": (-0.05, 0.05), "Head": (-0.03, 0.03), "Efficiency": (0.0, 0.0)},
+    "1B": {"Flow": (-0.05, 0.05), "Head": (-0.03, 0.03), "Efficiency": (-0.03, 0.0)},
+    "2B": {"Flow": (-0.08, 0.08), "Head": (-0.05, 0.05), "Efficiency": (-0.05, 0.0)},
+    "2U": {"Flow": (0.0, 0.16), "Head": (0.0, 0.10), "Efficiency": (-0.05, 0.0)},
+    "3B": {"Flow": (-0.09, 0.09), "Head": (-0.07, 0.07), "Efficiency": (-0.07, 0.0)},
+}
+DISTRIBUTIONS = ("uniform", "normal")
+
+
+def _sample(rng, lower, upper, n_samples, distribution):
+    """samples within a tolerance band. Normal samples treat the band as +/- 2
+    standard deviations about its centre and are clipped to it."""
+    if distribution == "uniform":
+        return rng.uniform(lower, upper, n_samples)
+    centre, half_width = (lower + upper) / 2, (upper - lower) / 2
+    return np.clip(rng.normal(centre, half_width / 2, n_samples), lower, upper)
+
+
+@instrument
+def monte_carlo_duty_point(
+    pump,
+    system,
+    speed=100,
+    n_samples=100000,
+    grade="2B",
+    static_head_tolerance=0.0,
+    friction_tolerance=0.0,
+    distribution="uniform",
+    seed=None,
+    percentiles=(5, 50, 95),
+):
+    """samples the duty point of a pump and system curve within their tolerances.
+    Each sample scales the pump curve by flow and head factors within the tolerance
+    grade, H'(Q) = (1 + e_H) * H(Q / (1 + e_Q)), and the efficiency by an efficiency
+    factor. The system curve is split into its static head (the fitted head at zero
+    flow) and friction, which are perturbed separately. Every sample's duty point is
+    solved together with one vectorised bisection. Where the curves cross more than
+    once the highest flow, stable, crossing is used.
+
+    Args:
+        pump (Pump): pump object with a pump curve and efficiency at 100% speed
+        system (SystemCurve): system curve the pump operates against
+        speed (float, optional): pump speed (%). Defaults to 100.
+        n_samples (int, optional): number of samples. Defaults to 100000.
+        grade (str or dict, optional): ISO 9906 acceptance grade, a key of
+        ISO_9906_GRADES, or a dict with the same structure. If None, the pump
+        curves aren't perturbed. Defaults to "2B".
+        static_head_tolerance (float, optional): +/- tolerance on the static head
+        (m). Defaults to 0.0.
+        friction_tolerance (float, optional): +/- tolerance on the friction head as
+        a fraction, e.g. 0.1 for +/- 10%. Defaults to 0.0.
+        distribution (str, optional): "uniform" or "normal", see _sample.
+        Defaults to "uniform".
+        seed (int, optional): random seed. Defaults to None.
+        percentiles (tuple, optional): percentiles reported in the summary.
+        Defaults to (5, 50, 95).
+
+    Raises:
+        ValueError: Raises error for an unknown grade or distribution
+
+    Returns:
+        dict: dictionary of per sample arrays and a summary. Structure:
+        {"Flow": [], "Head": [], "Efficiency": [], "In POR": [],
+        "Summary": {"Flow": {percentile: float}, "Head": {...}, "Efficiency": {...},
+        "POR Compliance": float, "Unsolved": int}}
+        Samples where the curves don't cross within the pump data are NaN, not in
+        the POR and left out of the percentiles and POR compliance.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(
+            f"Error: distribution must be one of {DISTRIBUTIONS}, got {distribution}"
+        )
+    if grade is None:
+        tolerances = {"Flow": (0.0, 0.0), "Head": (0.0, 0.0), "Efficiency": (0.0, 0.0)}
+    elif isinstance(grade, dict):
+        tolerances = grade
+    elif grade in ISO_9906_GRADES:
+        tolerances = ISO_9906_GRADES[grade]
+    else:
+        raise ValueError(
+            f"Error: grade must be one of {tuple(ISO_9906_GRADES)}, got {grade}"
+        )
+
+    rng = np.random.default_rng(seed)
+    flow_factor = 1 + _sample(rng, *tolerances["Flow"], n_samples, distribution)
+    head_factor = 1 + _sample(rng, *tolerances["Head"], n_samples, distribution)
+    efficiency_factor = 1 + _sample(
+        rng, *tolerances["Efficiency"], n_samples, distribution
+    )
+    static_offset = _sample(
+        rng, -static_head_tolerance, static_head_tolerance, n_samples, distribution
+    )
+    friction_factor = 1 + _sample(
+        rng, -friction_tolerance, friction_tolerance, n_samples, distribution
+    )
+
+    flow_multiplier, head_multiplier = pump.affinity_ratio(speed)
+    flow_multiplier = flow_multiplier * flow_factor
+    head_multiplier = head_multiplier * head_factor
+    pump_poly = pump.fit_curve("flow", "head")
+    system_poly = system.fit_curve("flow", "head")
+    static_head = system_poly(0.0)
+
+    def system_head(flow):
+        return (
+            static_head
+            + static_offset
+            + friction_factor * (system_poly(flow) - static_head)
+        )
+
+    def head_difference(flow):
+        return head_multiplier * pump_poly(flow / flow_multiplier) - system_head(flow)
+
+    # a drooping pump curve can cross the system curve twice, the highest flow
+    # crossing is the stable duty point
+    duty_flow = bisect_all_roots(
+        head_difference,
+        lower=flow_multiplier * np.min(pump.flow),
+        upper=flow_multiplier * np.max(pump.flow),
+        xtol=1e-6,
+    )[:, 0]
+    duty_head = system_head(duty_flow)
+    reduced_flow = duty_flow / flow_multiplier  # equivalent flow on the 100% curve
+    duty_efficiency = efficiency_factor * pump.fit_curve(
+        "efficiency_flow", "efficiency"
+    )(reduced_flow)
+    # the efficiency factor doesn't move the BEP, so the POR scales with the flow
+    POR_dict = pump.POR()
+    in_POR = (reduced_flow >= POR_dict["Lower Flow"]) & (
+        reduced_flow <= POR_dict["Upper Flow"]
+    )
+
+    solved = np.isfinite(duty_flow)
+    summary = {
+        name: (
+            dict(zip(percentiles, np.percentile(values[solved], percentiles).tolist()))
+            if np.any(solved)
+            else dict.fromkeys(percentiles, np.nan)
+        )
+        for name, values in (
+            ("Flow", duty_flow),
+            ("Head", duty_head),
+            ("Efficiency", duty_efficiency),
+        )
+    }
+    summary["POR Compliance"] = (
+        float(np.mean(in_POR[solved])) if np.any(solved) else np.nan
+    )
+    summary["Unsolved"] = int(np.count_nonzero(~solved))
+    return {
+        "Flow": duty_flow,
+        "Head": duty_head,
+        "Efficiency": duty_efficiency,
+        "In POR": in_POR,
+        "Summary": summary,
+    }